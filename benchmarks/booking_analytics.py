@@ -0,0 +1,125 @@
+"""
+Booking analytics: rollup reads vs ad-hoc GROUP BY scans over the bookings table.
+
+Seeds a scratch SQLite database with --rows bookings (default 10M), rebuilds
+the rollup tables, and times the same reports two ways:
+- `database.rollups.summarize`, which is what the booking_analytics tool runs;
+- a GROUP BY over the bookings table, the query it replaces.
+
+The GROUP BY baseline attributes every room night to the check-in month,
+which is cheaper than the rollups' exact per-month nights, so it understates
+the cost of answering from raw rows. Revenue and booking counts are checked
+to match between the two.
+
+It also reports the cost of keeping the rollups current: the time per
+booking insert with and without `record_created` in the write transaction.
+
+Usage:
+    python benchmarks/booking_analytics.py [--rows 10000000] [--writes 500] [--db PATH]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+# (label, summarize kwargs, GROUP BY columns, WHERE clause)
+REPORTS = [
+    ("revenue by city", {"dimensions": ("city",)}, ["hotel_city"], ""),
+    ("by city and month", {"dimensions": ("city", "month")}, ["hotel_city", "month"], ""),
+    ("one city by month", {"dimensions": ("month",), "city": "Lisbon"}, ["month"], "hotel_city = 'Lisbon'"),
+    ("one city, one quarter, by hotel",
+     {"dimensions": ("hotel",), "city": "Lisbon", "month_from": "2023-01", "month_to": "2023-03"},
+     ["hotel_name"], "hotel_city = 'Lisbon' AND checkin_date >= '2023-01-01' AND checkin_date < '2023-04-01'"),
+    ("one hotel by month", {"dimensions": ("month",), "hotel": "Hotel 42"}, ["month"], "hotel_name = 'Hotel 42'"),
+]
+
+
+def timed(fn, repeat: int = 5):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000, result
+
+
+def group_by_sql(columns, where: str) -> str:
+    keys = ", ".join(columns)
+    return f"""
+        SELECT {keys}, COUNT(*) AS bookings, SUM(booking_price) AS revenue,
+               SUM(CASE WHEN is_paid THEN 0 ELSE booking_price END) AS unpaid,
+               SUM(julianday(checkout_date) - julianday(checkin_date)) AS room_nights
+        FROM (SELECT *, strftime('%Y-%m', checkin_date) AS month FROM bookings) AS b
+        {'WHERE ' + where if where else ''}
+        GROUP BY {keys} ORDER BY {keys}
+    """
+
+
+def time_writes(count: int, with_rollups: bool) -> float:
+    """Average ms per single-booking write transaction."""
+    import tools.booking_tool as booking_tool
+    from database.database import Booking
+    from database.rollups import record_created
+    from database.write_queue import run_write
+
+    booking_tool.record_created = record_created if with_rollups else (lambda session, bookings: None)
+    started = time.perf_counter()
+    for i in range(count):
+        checkin = date(2027, 1, 1) + timedelta(days=i % 300)
+        run_write(booking_tool._insert_booking(Booking(
+            created_date=date.today(), checkin_date=checkin, checkout_date=checkin + timedelta(days=3),
+            hotel_name=f"Bench Hotel {i % 20}", hotel_city="Lisbon", hotel_country="Portugal",
+            booking_price=300.0, is_paid=False,
+        )))
+    booking_tool.record_created = record_created
+    return (time.perf_counter() - started) * 1000 / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--writes", type=int, default=500, help="Booking inserts per write-overhead sample")
+    parser.add_argument("--db", help="Reuse a seeded database file instead of a scratch one")
+    args = parser.parse_args()
+
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix="analytics-"), "bookings.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    # Bench hotels must never fill up, or inserts would be rejected instead of timed
+    os.environ.setdefault("HOTEL_DEFAULT_ROOMS", "100000")
+
+    from sqlalchemy import text
+    from benchmarks.booking_pagination import seed
+    from database.database import session_scope
+    from database.rollups import rebuild, summarize
+
+    seed(args.rows)
+    started = time.perf_counter()
+    with session_scope(write=True) as session:
+        built = rebuild(session)
+    print(f"Rebuilt rollups from {built['bookings']:,} bookings in {time.perf_counter() - started:.1f}s "
+          f"({built['hotel_rows']:,} hotel-month rows, {built['city_rows']:,} city-month rows)\n")
+
+    print(f"{'report':<34} | {'groups':>6} | {'rollup ms':>10} | {'GROUP BY ms':>11} | {'speedup':>8} | match")
+    print("-" * 88)
+    with session_scope() as session:
+        for label, options, columns, where in REPORTS:
+            rollup_ms, report = timed(lambda: summarize(session, **options))
+            scan_ms, rows = timed(lambda: session.execute(text(group_by_sql(columns, where))).all(), repeat=1)
+            match = (sum(entry["bookings"] for entry in report) == sum(row.bookings for row in rows)
+                     and abs(sum(entry["revenue"] for entry in report) - sum(row.revenue for row in rows)) < 0.01)
+            print(f"{label:<34} | {len(report):>6} | {rollup_ms:>10.2f} | {scan_ms:>11.1f} | "
+                  f"{scan_ms / rollup_ms if rollup_ms else float('inf'):>7.0f}x | {'yes' if match else 'NO'}")
+
+    plain = time_writes(args.writes, with_rollups=False)
+    maintained = time_writes(args.writes, with_rollups=True)
+    print(f"\nBooking insert: {plain:.2f} ms without rollups, {maintained:.2f} ms with "
+          f"({maintained - plain:+.2f} ms per write)")
+
+
+if __name__ == "__main__":
+    main()
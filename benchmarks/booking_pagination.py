@@ -0,0 +1,109 @@
+"""
+Deep-page latency of booking listing: keyset pagination vs LIMIT/OFFSET.
+
+Seeds a scratch SQLite database with --rows bookings (default 1M), then times
+fetching one page at increasing depths with the keyset query used by
+`search_bookings` and with the equivalent OFFSET query. Keyset latency should
+stay flat while OFFSET grows with depth.
+
+Usage:
+    python benchmarks/booking_pagination.py [--rows 1000000] [--page-size 20] [--db PATH]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+CITIES = ["Lisbon", "Porto", "Madrid", "Paris", "Rome", "Berlin", "Vienna", "Prague", "Athens", "Dublin"]
+
+
+def seed(rows: int, batch: int = 50_000):
+    from sqlalchemy import insert, func, select
+    from database.database import get_engine, init_db, Booking
+
+    init_db()
+    engine = get_engine()
+    with engine.connect() as conn:
+        existing = conn.execute(select(func.count()).select_from(Booking)).scalar_one()
+    if existing >= rows:
+        return
+
+    rng = random.Random(42)
+    start = date(2020, 1, 1)
+    print(f"Seeding {rows - existing:,} bookings...")
+    started = time.perf_counter()
+    for offset in range(existing, rows, batch):
+        chunk = []
+        for n in range(offset, min(rows, offset + batch)):
+            checkin = start + timedelta(days=rng.randrange(2000))
+            chunk.append({
+                "created_date": checkin - timedelta(days=rng.randrange(1, 120)),
+                "checkin_date": checkin,
+                "checkout_date": checkin + timedelta(days=rng.randrange(1, 14)),
+                "hotel_name": f"Hotel {n % 5000}",
+                "hotel_city": rng.choice(CITIES),
+                "hotel_country": "Europe",
+                "booking_price": round(rng.uniform(60, 900), 2),
+                "is_paid": rng.random() < 0.7,
+            })
+        with engine.begin() as conn:
+            conn.execute(insert(Booking), chunk)
+    print(f"Seeded in {time.perf_counter() - started:.1f}s")
+
+
+def timed(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--db", help="Reuse a seeded database file instead of a scratch one")
+    args = parser.parse_args()
+
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix="pagination-"), "bookings.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+
+    from database.database import session_scope, Booking
+    from tools.booking_tool import _booking_search_query, _encode_cursor
+
+    seed(args.rows)
+
+    order = (Booking.created_date.desc(), Booking.booking_id.desc())
+    depths = [d for d in (0, 1_000, 10_000, 100_000, 500_000, args.rows - args.page_size - 1) if d < args.rows]
+
+    print(f"\n{'depth':>10} | {'keyset ms':>10} | {'offset ms':>10} | {'keyset+city ms':>14}")
+    print("-" * 54)
+    with session_scope() as session:
+        for depth in depths:
+            # Locate the cursor for this depth once (setup, not timed)
+            cursor = None
+            if depth:
+                anchor = session.query(Booking).order_by(*order).offset(depth - 1).limit(1).one()
+                cursor = _encode_cursor(anchor)
+
+            keyset = timed(lambda: session.scalars(
+                _booking_search_query(cursor=cursor, limit=args.page_size)).all())
+            offset = timed(lambda: session.query(Booking).order_by(*order)
+                           .offset(depth).limit(args.page_size).all())
+            filtered = timed(lambda: session.scalars(
+                _booking_search_query(hotel_city="Lisbon", cursor=cursor, limit=args.page_size)).all())
+            print(f"{depth:>10,} | {keyset:>10.2f} | {offset:>10.2f} | {filtered:>14.2f}")
+
+    print(f"\nDatabase: {db_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Memory soak test for the graph checkpointer.
+
+Drives thousands of short sessions through a minimal LangGraph graph (same
+AgentState and message reducer as the agent, no LLM) and samples process
+memory as sessions accumulate. With the retention-bounded SQLite saver the
+resident heap should plateau; with --backend memory it grows with every turn.
+
+Usage:
+    python benchmarks/checkpointer_soak.py [--sessions 5000] [--turns 6] [--backend sqlite|memory]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def build_app(checkpointer):
+    from langchain_core.messages import AIMessage
+    from langgraph.graph import START, END, StateGraph
+    from state.state import AgentState
+
+    def echo(state):
+        text = state["messages"][-1].content
+        return {"messages": [AIMessage(content=f"Echo: {text} " + "details " * 40)]}
+
+    graph = StateGraph(AgentState)
+    graph.add_node("echo", echo)
+    graph.add_edge(START, "echo")
+    graph.add_edge("echo", END)
+    return graph.compile(checkpointer=checkpointer)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=5000)
+    parser.add_argument("--turns", type=int, default=6, help="Turns per session")
+    parser.add_argument("--backend", choices=["sqlite", "memory"], default="sqlite")
+    parser.add_argument("--keep-last", type=int, default=4)
+    parser.add_argument("--idle-ttl", type=float, default=2.0, help="Seconds before an idle session is evicted")
+    parser.add_argument("--samples", type=int, default=10)
+    args = parser.parse_args()
+
+    from langchain_core.messages import HumanMessage
+    from persistence.checkpointer import RetainingSqliteSaver, make_checkpointer
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix="checkpoint-soak-"), "checkpoints.db")
+    if args.backend == "memory":
+        saver = make_checkpointer("memory")
+    else:
+        saver = RetainingSqliteSaver.from_path(db_path, keep_last=args.keep_last, idle_ttl=args.idle_ttl)
+        saver.setup()
+    app = build_app(saver)
+
+    tracemalloc.start()
+    every = max(1, args.sessions // args.samples)
+    started = time.perf_counter()
+    print(f"{'sessions':>9} | {'heap MB':>8} | {'rss MB':>8} | {'db MB':>7} | compaction")
+    print("-" * 60)
+    for n in range(1, args.sessions + 1):
+        config = {"configurable": {"thread_id": f"soak-{n}"}}
+        for turn in range(args.turns):
+            app.invoke({"messages": [HumanMessage(content=f"session {n} turn {turn}")]}, config=config)
+
+        if n % every == 0:
+            note = ""
+            if isinstance(saver, RetainingSqliteSaver):
+                note = str(saver.compact())
+            heap = tracemalloc.get_traced_memory()[0] / 2**20
+            db_size = sum(os.path.getsize(p) for p in (db_path, db_path + "-wal") if os.path.exists(p)) / 2**20
+            print(f"{n:>9} | {heap:>8.1f} | {rss_mb():>8.1f} | {db_size:>7.1f} | {note}")
+
+    elapsed = time.perf_counter() - started
+    turns = args.sessions * args.turns
+    print(f"\n{turns:,} turns in {elapsed:.1f}s ({turns / elapsed:.0f} turns/s), backend={args.backend}")
+
+
+if __name__ == "__main__":
+    main()
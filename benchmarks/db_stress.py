@@ -0,0 +1,132 @@
+"""
+Concurrent-writer stress test for the booking database layer.
+
+Starts several writer threads (and optionally processes) that create bookings
+and flip payment status through `session_scope(write=True)`, alongside reader
+threads, against a scratch SQLite database. Reports throughput and fails if
+any operation hit "database is locked" or a writer made no progress.
+
+Usage:
+    python benchmarks/db_stress.py [--writers 16] [--readers 4] [--ops 200] [--processes 1]
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+
+def _worker(writers: int, readers: int, ops: int, results):
+    # Imported here so DATABASE_URL from the parent is picked up in child processes
+    from sqlalchemy.exc import OperationalError
+    from database.database import session_scope, init_db, Booking
+
+    init_db()
+    stop = threading.Event()
+    counts = {"writes": 0, "reads": 0, "locked": 0, "errors": 0}
+    per_writer = [0] * writers
+    lock = threading.Lock()
+
+    def record(key):
+        with lock:
+            counts[key] += 1
+
+    def write(i):
+        for n in range(ops):
+            try:
+                with session_scope(write=True) as session:
+                    booking = Booking(
+                        hotel_name=f"Stress Hotel {i}", hotel_city="Lisbon", hotel_country="Portugal",
+                        checkin_date=date.today() + timedelta(days=n % 300 + 1),
+                        checkout_date=date.today() + timedelta(days=n % 300 + 3),
+                        booking_price=100.0 + n, created_date=date.today(), is_paid=False,
+                    )
+                    session.add(booking)
+                    session.flush()
+                    if n % 2:
+                        booking.is_paid = True
+                per_writer[i] += 1
+                record("writes")
+            except OperationalError as e:
+                record("locked" if "locked" in str(e) else "errors")
+
+    def read():
+        while not stop.is_set():
+            try:
+                with session_scope() as session:
+                    session.query(Booking).order_by(Booking.booking_id.desc()).limit(10).all()
+                record("reads")
+            except OperationalError as e:
+                record("locked" if "locked" in str(e) else "errors")
+
+    threads = [threading.Thread(target=write, args=(i,)) for i in range(writers)]
+    reader_threads = [threading.Thread(target=read) for _ in range(readers)]
+    for t in threads + reader_threads:
+        t.start()
+    for t in threads:
+        t.join()
+    stop.set()
+    for t in reader_threads:
+        t.join()
+
+    counts["stalled_writers"] = sum(1 for n in per_writer if n == 0)
+    results.put(counts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, default=16, help="Writer threads per process")
+    parser.add_argument("--readers", type=int, default=4, help="Reader threads per process")
+    parser.add_argument("--ops", type=int, default=200, help="Transactions per writer")
+    parser.add_argument("--processes", type=int, default=1)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="db-stress-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bookings.db')}"
+
+    # Create and seed the schema once, before any worker races to do it
+    from database.database import init_db, get_engine
+    init_db()
+    get_engine().dispose()
+
+    results = multiprocessing.Queue()
+    started = time.perf_counter()
+    if args.processes == 1:
+        _worker(args.writers, args.readers, args.ops, results)
+    else:
+        procs = [multiprocessing.Process(target=_worker, args=(args.writers, args.readers, args.ops, results))
+                 for _ in range(args.processes)]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+    elapsed = time.perf_counter() - started
+
+    totals = {"writes": 0, "reads": 0, "locked": 0, "errors": 0, "stalled_writers": 0}
+    for _ in range(args.processes):
+        for key, value in results.get().items():
+            totals[key] += value
+
+    expected = args.writers * args.ops * args.processes
+    print(f"Database:          {os.environ['DATABASE_URL']}")
+    print(f"Elapsed:           {elapsed:.2f}s")
+    print(f"Writes committed:  {totals['writes']}/{expected} ({totals['writes'] / elapsed:.0f}/s)")
+    print(f"Reads:             {totals['reads']} ({totals['reads'] / elapsed:.0f}/s)")
+    print(f"'database is locked' errors: {totals['locked']}")
+    print(f"Other errors:      {totals['errors']}")
+    print(f"Stalled writers:   {totals['stalled_writers']}")
+
+    if totals["locked"] or totals["errors"] or totals["stalled_writers"] or totals["writes"] != expected:
+        print("❌ Concurrent writers did not all make progress cleanly.")
+        sys.exit(1)
+    print("✅ All writers made progress without lock errors.")
+
+
+if __name__ == "__main__":
+    main()
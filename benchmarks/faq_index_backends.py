@@ -0,0 +1,135 @@
+"""
+FAQ index backends: recall@k vs latency vs memory against the flat baseline.
+
+Builds every index layout in CONFIGS from the same vectors and measures:
+- recall@k against exact flat search;
+- single-query search latency, which is how the FAQ tool searches;
+- serialized index size, a proxy for resident memory per worker.
+
+Use this table to pick FAQ_INDEX_BACKEND, FAQ_INDEX_PCA_DIM, FAQ_INDEX_FP16,
+FAQ_INDEX_NPROBE and FAQ_INDEX_PQ_M.
+
+The vectors come from a saved FAQ index (--index, e.g. a directory under
+.faq_index or .faq_index/shards) or are synthetic. Synthetic vectors are
+clustered unit vectors shaped like text-embedding-3-large output. Queries
+are stored vectors plus noise.
+
+Usage:
+    python benchmarks/faq_index_backends.py [--vectors 50000] [--dim 3072] [--k 3]
+    python benchmarks/faq_index_backends.py --index .faq_index/hotel_faq_document-text-embedding-3-large
+"""
+import argparse
+import os
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+# (label, IndexSpec kwargs, nprobe values to sweep)
+CONFIGS = [
+    ("flat fp16", {"backend": "flat", "fp16": True}, [None]),
+    ("pca512 flat", {"backend": "flat", "pca_dim": 512}, [None]),
+    ("ivf_flat", {"backend": "ivf_flat"}, [1, 4, 8, 16, 32]),
+    ("ivf_flat fp16", {"backend": "ivf_flat", "fp16": True}, [8, 16]),
+    ("ivf_pq m64", {"backend": "ivf_pq", "pq_m": 64}, [4, 8, 16, 32]),
+    ("ivf_pq m128", {"backend": "ivf_pq", "pq_m": 128}, [8, 16, 32]),
+    ("pca512 ivf_pq m64", {"backend": "ivf_pq", "pca_dim": 512, "pq_m": 64}, [8, 16, 32]),
+]
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+
+def synthetic_vectors(n: int, dim: int, clusters: int, seed: int):
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype("float32")
+    vectors = centers[rng.integers(0, clusters, n)] + 0.6 * rng.standard_normal((n, dim)).astype("float32")
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def make_queries(vectors, count: int, seed: int):
+    import numpy as np
+
+    rng = np.random.default_rng(seed + 1)
+    picks = vectors[rng.integers(0, len(vectors), count)]
+    queries = picks + 0.05 * rng.standard_normal(picks.shape).astype("float32")
+    return (queries / np.linalg.norm(queries, axis=1, keepdims=True)).astype("float32")
+
+
+def measure(index, queries, truth, k: int) -> dict:
+    latencies, overlap = [], 0
+    for query, expected in zip(queries, truth):
+        started = time.perf_counter()
+        _, ids = index.search(query[None, :], k)
+        latencies.append((time.perf_counter() - started) * 1000)
+        overlap += len(set(ids[0]) & set(expected))
+    return {
+        "recall": overlap / (len(queries) * k),
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--index", help="Saved FAQ index directory to take vectors from")
+    parser.add_argument("--vectors", type=int, default=50_000, help="Synthetic corpus size")
+    parser.add_argument("--dim", type=int, default=3072, help="Synthetic vector dimensions")
+    parser.add_argument("--clusters", type=int, default=200, help="Synthetic topic clusters")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    import faiss
+    from rag.compression import IndexSpec, compress_index, index_bytes, set_nprobe
+
+    if args.index:
+        flat = faiss.read_index(os.path.join(args.index, "index.faiss"))
+        vectors = flat.reconstruct_n(0, flat.ntotal)
+    else:
+        vectors = synthetic_vectors(args.vectors, args.dim, args.clusters, args.seed)
+        flat = faiss.IndexFlatL2(vectors.shape[1])
+        flat.add(vectors)
+    queries = make_queries(vectors, args.queries, args.seed)
+    _, truth = flat.search(queries, args.k)
+
+    n, dim = flat.ntotal, flat.d
+    baseline = measure(flat, queries, truth, args.k)
+    baseline_bytes = index_bytes(flat)
+    print(f"{n:,} vectors x {dim} dims, {args.queries} queries, recall@{args.k} vs exact flat search\n")
+    print(f"{'layout':<44} | {'nprobe':>6} | {'recall':>7} | {'p50 ms':>7} | {'p95 ms':>7} | "
+          f"{'MB':>8} | {'B/vec':>7} | {'build s':>7}")
+    print("-" * 112)
+
+    def row(label, nprobe, result, size, build_s):
+        print(f"{label:<44} | {nprobe if nprobe is not None else '-':>6} | {result['recall']:>7.1%} | "
+              f"{result['p50_ms']:>7.3f} | {result['p95_ms']:>7.3f} | {size / 2 ** 20:>8.1f} | "
+              f"{size / n:>7.0f} | {build_s:>7.1f}")
+
+    row("flat (baseline)", None, baseline, baseline_bytes, 0.0)
+    for label, options, nprobes in CONFIGS:
+        spec = IndexSpec(**options)
+        started = time.perf_counter()
+        index = compress_index(flat, spec)
+        build_s = time.perf_counter() - started
+        if index is None:
+            print(f"{label:<44} | corpus too small for this layout, the FAQ tool keeps the flat index")
+            continue
+        size = index_bytes(index)
+        label = f"{label} [{spec.factory_string(dim, n)}]"
+        for nprobe in nprobes:
+            if nprobe is not None:
+                set_nprobe(index, nprobe)
+            row(label, nprobe, measure(index, queries, truth, args.k), size, build_s)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+FAQ retrieval benchmark: vector-only vs BM25 vs hybrid (reciprocal rank fusion).
+
+Builds the FAQ store from the PDF, then runs a query set whose ground truth is
+a single chunk ID. By default the queries are generated from the chunks
+themselves: a keyword query (the chunk's most distinctive terms, like "pet
+policy") and a sentence query (a chunk sentence with its words shuffled) per
+chunk. Pass --queries with a JSONL file of {"query": ..., "chunk_id": ...}
+to use a hand-labelled set instead.
+
+Reports recall@k for each retriever, how often the lexical fast path fires
+and how often its answer contains the right chunk, and the fraction of
+queries that would be served without a network embedding call.
+Needs OPENAI_API_KEY unless --fake is given.
+
+Usage:
+    python benchmarks/faq_retrieval.py [--fake] [--k 3] [--queries labelled.jsonl]
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+CANDIDATES = 10
+
+
+def generate_queries(chunks: dict, lexical, seed: int = 0) -> list:
+    """Keyword and shuffled-sentence queries per chunk, labelled with the chunk ID."""
+    from rag.lexical import tokenize
+
+    rng = random.Random(seed)
+    queries = []
+    for cid, doc in chunks.items():
+        terms = sorted(set(tokenize(doc.page_content)), key=lexical.idf, reverse=True)
+        if terms:
+            queries.append({"query": " ".join(terms[:2]), "chunk_id": cid, "kind": "keyword"})
+        sentences = [s for s in re.split(r"(?<=[.?!])\s+", doc.page_content) if len(s.split()) >= 6]
+        if sentences:
+            words = rng.choice(sentences).split()
+            rng.shuffle(words)
+            queries.append({"query": " ".join(words[:12]), "chunk_id": cid, "kind": "sentence"})
+    return queries
+
+
+def load_queries(path: str) -> list:
+    with open(path) as f:
+        return [dict(json.loads(line), kind="labelled") for line in f if line.strip()]
+
+
+def evaluate(vectorstore, lexical, queries: list, k: int) -> dict:
+    from rag.lexical import reciprocal_rank_fusion
+
+    totals = {name: {"hits": 0, "ms": 0.0} for name in ("vector", "lexical", "hybrid")}
+    fast_path = fast_path_correct = 0
+
+    for item in queries:
+        query, truth = item["query"], item["chunk_id"]
+
+        started = time.perf_counter()
+        hits = lexical.search(query, CANDIDATES)
+        lexical_ms = (time.perf_counter() - started) * 1000
+        lexical_ids = [cid for cid, _ in hits]
+
+        started = time.perf_counter()
+        embedding = vectorstore.embeddings.embed_query(query)
+        docs = vectorstore.similarity_search_by_vector(embedding, k=CANDIDATES)
+        vector_ms = (time.perf_counter() - started) * 1000
+        vector_ids = [doc.metadata.get("chunk_id") for doc in docs]
+
+        started = time.perf_counter()
+        hybrid_ids = [cid for cid, _ in reciprocal_rank_fusion([vector_ids, lexical_ids], limit=k)]
+        fusion_ms = (time.perf_counter() - started) * 1000
+
+        for name, ranking, ms in (("vector", vector_ids, vector_ms), ("lexical", lexical_ids, lexical_ms),
+                                  ("hybrid", hybrid_ids, vector_ms + lexical_ms + fusion_ms)):
+            totals[name]["hits"] += truth in ranking[:k]
+            totals[name]["ms"] += ms
+
+        if lexical.confident(query, hits):
+            fast_path += 1
+            fast_path_correct += truth in lexical_ids[:k]
+
+    n = len(queries) or 1
+    return {
+        "queries": len(queries),
+        "recall": {name: t["hits"] / n for name, t in totals.items()},
+        "avg_ms": {name: t["ms"] / n for name, t in totals.items()},
+        "fast_path_rate": fast_path / n,
+        "fast_path_precision": fast_path_correct / fast_path if fast_path else 0.0,
+        "served_without_network": fast_path / n,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pdf", default="./document/hotel_faq_document.pdf")
+    parser.add_argument("--queries", help="JSONL file of {query, chunk_id}")
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--fake", action="store_true", help="Use offline hashed embeddings instead of OpenAI")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    from rag.lexical import BM25Index
+    from rag.rag import build_vectorstore, chunk_documents, load_documents
+
+    embeddings = None
+    if args.fake:
+        from benchmarks.offline.fakes import FakeEmbeddings
+        embeddings = FakeEmbeddings(latency_ms=0, per_text_ms=0)
+
+    chunks = chunk_documents(load_documents(args.pdf))
+    vectorstore = build_vectorstore(args.pdf, embeddings)
+    lexical = BM25Index.from_vectorstore(vectorstore)
+
+    queries = load_queries(args.queries) if args.queries else generate_queries(chunks, lexical, args.seed)
+    groups = {"all": queries}
+    for item in queries:
+        groups.setdefault(item["kind"], []).append(item)
+
+    print(f"{len(chunks)} chunks, k={args.k}\n")
+    print(f"{'queries':<10} | {'n':>4} | {'vector':>7} | {'lexical':>7} | {'hybrid':>7} | "
+          f"{'fast path':>9} | {'fp prec':>7} | {'no network':>10}")
+    print("-" * 86)
+    for name, group in groups.items():
+        report = evaluate(vectorstore, lexical, group, args.k)
+        recall = report["recall"]
+        print(f"{name:<10} | {report['queries']:>4} | {recall['vector']:>7.1%} | {recall['lexical']:>7.1%} | "
+              f"{recall['hybrid']:>7.1%} | {report['fast_path_rate']:>9.1%} | "
+              f"{report['fast_path_precision']:>7.1%} | {report['served_without_network']:>10.1%}")
+        if name == "all":
+            latency = report["avg_ms"]
+            summary = (f"avg retrieval ms: vector={latency['vector']:.2f} lexical={latency['lexical']:.3f} "
+                       f"hybrid={latency['hybrid']:.2f}")
+    print(f"\n{summary}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Sharded FAQ benchmark: ingestion throughput and query latency as properties grow.
+
+For each corpus size, builds a scratch directory with that many properties,
+ingests it with `rag.ingest` and reports pages/sec. It then times
+`search_hotel_faq` scoped to one hotel (one shard) and unscoped (fan-out
+across every shard and merge).
+
+Without --source-dir, every property is a copy of the demo FAQ PDF under a
+different hotel name. With --source-dir, the first N properties found there
+are used. The semantic result cache is disabled so every query searches.
+Needs OPENAI_API_KEY unless --fake is given.
+
+Usage:
+    python benchmarks/faq_sharding.py [--fake] [--sizes 1,10,50,100] [--queries 50]
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+QUESTIONS = [
+    "What time is check-in?",
+    "Is breakfast included?",
+    "Do you allow pets?",
+    "Is there parking at the hotel?",
+    "How do I cancel my reservation?",
+    "Is wifi free?",
+]
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+
+def build_corpus(target: str, size: int, source_dir: str = None, pdf: str = None) -> None:
+    """Lay out `size` properties under `target`, one directory of PDFs each."""
+    if source_dir:
+        from rag.ingest import discover
+
+        for name, (_, paths) in list(discover(source_dir).items())[:size]:
+            os.makedirs(os.path.join(target, name))
+            for path in paths:
+                shutil.copy(path, os.path.join(target, name, os.path.basename(path)))
+        return
+    for i in range(size):
+        directory = os.path.join(target, f"Hotel {i:04d}")
+        os.makedirs(directory)
+        shutil.copy(pdf, os.path.join(directory, "faq.pdf"))
+
+
+def time_queries(count: int, hotels: list) -> dict:
+    from tools.faq_tool import search_hotel_faq
+
+    scoped, fanned_out = [], []
+    for i in range(count):
+        question = QUESTIONS[i % len(QUESTIONS)]
+        started = time.perf_counter()
+        search_hotel_faq.invoke({"query": question, "hotel": hotels[i % len(hotels)]})
+        scoped.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        search_hotel_faq.invoke({"query": question})
+        fanned_out.append((time.perf_counter() - started) * 1000)
+    return {"scoped": scoped, "fan_out": fanned_out}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1,10,50,100", help="Comma-separated property counts")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--pdf", default=os.path.join(REPO_ROOT, "document", "hotel_faq_document.pdf"))
+    parser.add_argument("--source-dir", help="Directory of real property PDFs to sample from")
+    parser.add_argument("--fake", action="store_true", help="Use offline hashed embeddings instead of OpenAI")
+    parser.add_argument("--embedding-latency-ms", type=float, default=40.0, help="Latency of each fake call")
+    args = parser.parse_args()
+
+    # Every query must reach the shards
+    os.environ["FAQ_SEMANTIC_THRESHOLD"] = "2"
+
+    import tools.faq_tool as faq_tool
+    from rag.ingest import aingest_directory
+    from rag.shards import ShardedFAQIndex
+
+    embeddings = None
+    if args.fake:
+        from benchmarks.offline.fakes import FakeEmbeddings
+        embeddings = FakeEmbeddings(latency_ms=args.embedding_latency_ms)
+
+    print(f"{'properties':>10} | {'pages':>6} | {'ingest s':>8} | {'pages/s':>8} | "
+          f"{'scoped p50':>10} | {'scoped p95':>10} | {'fan-out p50':>11} | {'fan-out p95':>11}")
+    print("-" * 94)
+    for size in [int(s) for s in args.sizes.split(",")]:
+        workdir = tempfile.mkdtemp(prefix="faq-shards-")
+        try:
+            corpus, index_dir = os.path.join(workdir, "docs"), os.path.join(workdir, "index")
+            build_corpus(corpus, size, args.source_dir, args.pdf)
+
+            report = asyncio.run(aingest_directory(corpus, index_dir=index_dir, workers=args.workers,
+                                                   concurrency=args.concurrency, embeddings=embeddings))
+
+            shards = ShardedFAQIndex(index_dir=index_dir, embeddings=embeddings)
+            faq_tool._shards = shards
+            faq_tool._query_embeddings.clear()
+            latencies = time_queries(args.queries, list(shards.hotels().values()))
+
+            print(f"{size:>10} | {report['pages']:>6} | {report['seconds']:>8.1f} | {report['pages_per_sec']:>8.1f} | "
+                  f"{percentile(latencies['scoped'], 50):>8.1f}ms | {percentile(latencies['scoped'], 95):>8.1f}ms | "
+                  f"{percentile(latencies['fan_out'], 50):>9.1f}ms | {percentile(latencies['fan_out'], 95):>9.1f}ms")
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
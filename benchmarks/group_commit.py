@@ -0,0 +1,97 @@
+"""
+Booking write throughput with and without group commit.
+
+Runs concurrent booking inserts and payment updates through
+`database.write_queue.run_write` against a scratch SQLite database, first
+with one transaction per write and then with the group-commit writer, and
+prints throughput plus the writer's batch size histogram and commit latency.
+
+Usage:
+    python benchmarks/group_commit.py [--threads 32] [--ops 100] [--window-ms 5]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+
+def run(threads: int, ops: int) -> float:
+    from database.database import Booking
+    from database import write_queue
+
+    def insert(n):
+        def op(session):
+            booking = Booking(
+                hotel_name="Bench Hotel", hotel_city="Lisbon", hotel_country="Portugal",
+                checkin_date=date.today() + timedelta(days=1 + n % 200),
+                checkout_date=date.today() + timedelta(days=3 + n % 200),
+                booking_price=150.0, created_date=date.today(), is_paid=False,
+            )
+            session.add(booking)
+            session.flush()
+            return booking.booking_id
+        return op
+
+    def pay(booking_id):
+        def op(session):
+            booking = session.get(Booking, booking_id)
+            booking.is_paid = True
+            return booking_id
+        return op
+
+    def worker():
+        for n in range(ops):
+            booking_id = write_queue.run_write(insert(n))
+            write_queue.run_write(pay(booking_id))
+
+    started = time.perf_counter()
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--ops", type=int, default=100, help="Bookings created (and paid) per thread")
+    parser.add_argument("--window-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="group-commit-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bookings.db')}"
+
+    from database import write_queue
+    from database.database import init_db
+    init_db()
+
+    writes = args.threads * args.ops * 2
+
+    write_queue.GROUP_COMMIT_ENABLED = False
+    elapsed = run(args.threads, args.ops)
+    print(f"Per-call commits: {writes} writes in {elapsed:.2f}s ({writes / elapsed:.0f} writes/s)")
+
+    write_queue.GROUP_COMMIT_ENABLED = True
+    write_queue._writer = write_queue.GroupCommitWriter(window_ms=args.window_ms)
+    elapsed = run(args.threads, args.ops)
+    print(f"Group commit:     {writes} writes in {elapsed:.2f}s ({writes / elapsed:.0f} writes/s)")
+
+    stats = write_queue.write_stats()
+    write_queue._writer.close()
+    print(f"\nBatches: {stats['batches']}  avg size: {stats['avg_batch_size']:.1f}  max size: {stats['max_batch_size']}")
+    print("Commit latency (ms): " + ", ".join(f"{k}={v:.2f}" for k, v in stats["commit_latency_ms"].items()))
+    print("Batch size histogram:")
+    for size, count in stats["batch_size_histogram"].items():
+        print(f"  {size:4d}: {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Import-time budget check for the agent entry point.
+
+Runs `python -X importtime -c "import main"` in a scratch working directory,
+reports the slowest imports and exits non-zero when:
+- the cumulative import time of `main` exceeds the budget, or the report
+  has no row for it to measure;
+- a module that is only needed on first use (numpy, faiss by default) was
+  imported;
+- importing left files behind (database, FAQ index), which would mean side
+  effects crept back into import time.
+
+Usage:
+    python benchmarks/import_time.py [--budget 1.0] [--module main] [--top 15] [--deferred numpy,faiss]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(module: str):
+    """Import `module` in a fresh interpreter and parse the -X importtime report."""
+    with tempfile.TemporaryDirectory() as workdir:
+        env = dict(os.environ, PYTHONPATH=REPO_ROOT, PYTHONDONTWRITEBYTECODE="1")
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=workdir, env=env, capture_output=True, text=True,
+        )
+        leftovers = sorted(os.listdir(workdir))
+
+    if proc.returncode != 0:
+        raise SystemExit(f"❌ import {module} failed:\n{proc.stderr[-2000:]}")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append((int(cumulative_us), int(self_us), name.rstrip()))
+    return rows, leftovers
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget", type=float, default=float(os.getenv("IMPORT_TIME_BUDGET", "1.0")),
+                        help="Maximum cumulative import time in seconds")
+    parser.add_argument("--deferred", default=os.getenv("IMPORT_TIME_DEFERRED", "numpy,faiss"),
+                        help="Comma-separated modules that importing must not load")
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    rows, leftovers = measure(args.module)
+    total = next((cum for cum, _, name in reversed(rows) if name.strip() == args.module), None)
+    if total is None:
+        raise SystemExit(f"❌ No import time reported for `{args.module}`; cannot check the budget.")
+    total /= 1e6
+    deferred = {name.strip() for name in args.deferred.split(",") if name.strip()}
+    loaded = sorted(deferred & {name.strip() for _, _, name in rows})
+
+    print(f"Slowest imports for `{args.module}` (cumulative):")
+    for cumulative, self_time, name in sorted(rows, reverse=True)[:args.top]:
+        print(f"  {cumulative / 1000:8.1f} ms  (self {self_time / 1000:6.1f} ms)  {name.strip()}")
+    print(f"\nTotal: {total:.3f}s (budget {args.budget:.3f}s)")
+
+    failed = False
+    if total > args.budget:
+        print("❌ Import time budget exceeded.")
+        failed = True
+    if loaded:
+        print(f"❌ Importing {args.module} loaded {', '.join(loaded)}, which should be imported on first use.")
+        failed = True
+    if leftovers:
+        print(f"❌ Importing {args.module} created files: {', '.join(leftovers)}")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print("✅ Import time within budget and free of side effects.")
+
+
+if __name__ == "__main__":
+    main()
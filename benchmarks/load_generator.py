@@ -0,0 +1,95 @@
+"""
+Load generator for the agent HTTP server (`python main.py serve`).
+
+Simulates --sessions concurrent users, each sending --turns messages one after
+another on its own session, and reports turn latency percentiles, turns/sec,
+completed sessions/sec and how many turns were rejected with 503.
+
+Usage:
+    python benchmarks/load_generator.py [--url http://127.0.0.1:8080] [--sessions 100] [--turns 4]
+"""
+import argparse
+import asyncio
+import random
+import time
+import uuid
+
+import aiohttp
+
+SCRIPT = [
+    "Show me booking 3",
+    "What time is check-in?",
+    "Is breakfast included?",
+    "Mark booking 4 as paid",
+    "List my recent bookings",
+    "Find hotels in Lisbon",
+]
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+
+async def run_session(http, url, turns, latencies, counters, max_retries):
+    session_id = uuid.uuid4().hex[:12]
+    for turn in range(turns):
+        message = SCRIPT[(turn + random.randrange(len(SCRIPT))) % len(SCRIPT)]
+        for attempt in range(max_retries + 1):
+            started = time.perf_counter()
+            async with http.post(f"{url}/sessions/{session_id}/messages", json={"message": message}) as response:
+                await response.read()
+                if response.status == 503:
+                    counters["rejected"] += 1
+                    await asyncio.sleep(float(response.headers.get("Retry-After", "1")) * (attempt + 1))
+                    continue
+                if response.status != 200:
+                    counters["errors"] += 1
+                    break
+                latencies.append((time.perf_counter() - started) * 1000)
+                counters["turns"] += 1
+                break
+        else:
+            counters["gave_up"] += 1
+            return
+    counters["sessions"] += 1
+
+
+async def main_async(args):
+    latencies = []
+    counters = {"turns": 0, "sessions": 0, "rejected": 0, "errors": 0, "gave_up": 0}
+    connector = aiohttp.TCPConnector(limit=args.connections)
+    timeout = aiohttp.ClientTimeout(total=args.timeout)
+
+    started = time.perf_counter()
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as http:
+        await asyncio.gather(*(
+            run_session(http, args.url, args.turns, latencies, counters, args.retries)
+            for _ in range(args.sessions)
+        ))
+    elapsed = time.perf_counter() - started
+
+    print(f"Sessions: {counters['sessions']}/{args.sessions} completed in {elapsed:.1f}s "
+          f"({counters['sessions'] / elapsed:.2f} sessions/s)")
+    print(f"Turns:    {counters['turns']} ({counters['turns'] / elapsed:.2f} turns/s)")
+    print(f"Latency:  p50={percentile(latencies, 50):.0f} ms  p95={percentile(latencies, 95):.0f} ms  "
+          f"p99={percentile(latencies, 99):.0f} ms  max={max(latencies, default=0):.0f} ms")
+    print(f"Rejected (503): {counters['rejected']}  errors: {counters['errors']}  gave up: {counters['gave_up']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8080")
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--turns", type=int, default=4)
+    parser.add_argument("--connections", type=int, default=200)
+    parser.add_argument("--retries", type=int, default=5, help="Retries per turn after a 503")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
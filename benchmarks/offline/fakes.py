@@ -0,0 +1,270 @@
+"""
+Deterministic local stand-ins for OpenAI chat, OpenAI embeddings and SerpAPI.
+
+Each fake sleeps for a configurable latency so the graph's scheduling,
+caching and I/O behave as they would against the real services, but every
+answer is a pure function of its input: two runs of the same script issue the
+same tool calls and produce the same output.
+"""
+import asyncio
+import hashlib
+import json
+import math
+import re
+import time
+from typing import Any, List, Optional, Sequence
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+FAQ_WORDS = ("check-in", "check in", "check-out", "checkout", "breakfast", "pet", "parking", "wifi",
+             "wi-fi", "cancel", "pool", "gym", "spa", "airport", "luggage", "smoking")
+
+# (pattern on the lowercased user message, tool name, args builder)
+INTENTS = [
+    (re.compile(r"booking\s*#?(\d+)\b.*\b(paid|unpaid)\b"), "update_payment_status",
+     lambda m, text: {"booking_id": m.group(1), "is_paid": m.group(2) == "paid"}),
+    (re.compile(r"bookings\s+((?:\d+\s*(?:,|and)\s*)+\d+)"), "lookup_bookings",
+     lambda m, text: {"booking_ids": re.findall(r"\d+", m.group(1))}),
+    (re.compile(r"booking\s*#?(\d+)"), "lookup_booking",
+     lambda m, text: {"booking_id": m.group(1)}),
+    (re.compile(r"book (.+?) in (\w+) from (\d{4}-\d\d-\d\d) to (\d{4}-\d\d-\d\d)(?: for (\d+))?"), "create_booking",
+     lambda m, text: {"hotel_name": m.group(1).title(), "hotel_city": m.group(2).title(),
+                      "hotel_country": "Portugal", "checkin_date": m.group(3), "checkout_date": m.group(4),
+                      "booking_price": float(m.group(5) or 250)}),
+    (re.compile(r"bookings in (\w+)"), "search_bookings",
+     lambda m, text: {"hotel_city": m.group(1).title(), "limit": 10}),
+    (re.compile(r"(?:recent|my) bookings"), "list_user_bookings",
+     lambda m, text: {"limit": 10}),
+    (re.compile(r"hotels? in (\w+)"), "search_hotels",
+     lambda m, text: {"location": m.group(1).title()}),
+    (re.compile(r"flights? from (\w+) to (\w+)"), "search_flights",
+     lambda m, text: {"origin": m.group(1).title(), "destination": m.group(2).title()}),
+]
+
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def _call_id(*parts) -> str:
+    return "call_" + hashlib.sha1("|".join(map(str, parts)).encode()).hexdigest()[:16]
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Rule-based chat model that picks tools like the agent's LLM would.
+
+    A user message matching one of INTENTS (or an FAQ keyword) produces a
+    tool call; tool results are answered with a short summary of them; an
+    unbound model (the history summarizer) returns a truncated summary.
+    Latency is `latency_ms` before the first token plus `per_token_ms` per
+    output token, for both blocking and streaming calls.
+    """
+
+    latency_ms: float = 300.0
+    per_token_ms: float = 5.0
+    model_name: str = "fake-chat"
+    tool_names: tuple = ()
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs):
+        names = tuple(t.name if hasattr(t, "name") else t["name"] for t in tools)
+        return self.model_copy(update={"tool_names": names})
+
+    def _respond(self, messages) -> AIMessage:
+        last = messages[-1]
+        if isinstance(last, ToolMessage):
+            results = []
+            for message in reversed(messages):
+                if not isinstance(message, ToolMessage):
+                    break
+                results.append(f"{message.name}: {message.content[:300]}")
+            return AIMessage(content="Here is what I found.\n" + "\n".join(reversed(results)))
+
+        text = last.content if isinstance(last.content, str) else str(last.content)
+        if not self.tool_names:
+            return AIMessage(content="Summary: " + " ".join(text.split())[-400:])
+
+        lowered = text.lower()
+        for pattern, name, build in INTENTS:
+            match = pattern.search(lowered)
+            if match and name in self.tool_names:
+                return self._tool_call(name, build(match, text), len(messages))
+        if any(word in lowered for word in FAQ_WORDS) and "search_hotel_faq" in self.tool_names:
+            return self._tool_call("search_hotel_faq", {"query": text}, len(messages))
+        if lowered.rstrip().endswith("?") and "search_travel_info" in self.tool_names:
+            return self._tool_call("search_travel_info", {"query": text}, len(messages))
+        return AIMessage(content="Happy to help with your trip! You can ask me about bookings, hotels, "
+                                 "flights or hotel policies.")
+
+    @staticmethod
+    def _tool_call(name: str, args: dict, position: int) -> AIMessage:
+        return AIMessage(content="", tool_calls=[{"name": name, "args": args, "id": _call_id(name, args, position)}])
+
+    def _usage(self, messages, response: AIMessage) -> dict:
+        prompt = sum(_tokens(m.content if isinstance(m.content, str) else str(m.content)) + 4 for m in messages)
+        completion = _tokens(response.content + json.dumps(response.tool_calls))
+        return {"input_tokens": prompt, "output_tokens": completion, "total_tokens": prompt + completion}
+
+    def _delay(self, response: AIMessage) -> float:
+        return (self.latency_ms + self.per_token_ms * _tokens(response.content or "x")) / 1000
+
+    def _generate(self, messages, stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> ChatResult:
+        response = self._respond(messages)
+        time.sleep(self._delay(response))
+        response = response.model_copy(update={"usage_metadata": self._usage(messages, response)})
+        return ChatResult(generations=[ChatGeneration(message=response)])
+
+    async def _agenerate(self, messages, stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> ChatResult:
+        response = self._respond(messages)
+        await asyncio.sleep(self._delay(response))
+        response = response.model_copy(update={"usage_metadata": self._usage(messages, response)})
+        return ChatResult(generations=[ChatGeneration(message=response)])
+
+    def _chunks(self, messages):
+        response = self._respond(messages)
+        words = re.findall(r"\S+\s*", response.content)
+        chunks = [AIMessageChunk(content=word) for word in words]
+        if response.tool_calls:
+            chunks.append(AIMessageChunk(content="", tool_call_chunks=[
+                {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": i}
+                for i, call in enumerate(response.tool_calls)
+            ]))
+        chunks.append(AIMessageChunk(content="", usage_metadata=self._usage(messages, response)))
+        return chunks
+
+    # BaseChatModel reports each yielded chunk to the callbacks (astream_events)
+
+    def _stream(self, messages, stop: Optional[List[str]] = None, run_manager=None, **kwargs):
+        time.sleep(self.latency_ms / 1000)
+        for chunk in self._chunks(messages):
+            if chunk.content:
+                time.sleep(self.per_token_ms * _tokens(chunk.content) / 1000)
+            yield ChatGenerationChunk(message=chunk)
+
+    async def _astream(self, messages, stop: Optional[List[str]] = None, run_manager=None, **kwargs):
+        await asyncio.sleep(self.latency_ms / 1000)
+        for chunk in self._chunks(messages):
+            if chunk.content:
+                await asyncio.sleep(self.per_token_ms * _tokens(chunk.content) / 1000)
+            yield ChatGenerationChunk(message=chunk)
+
+
+class FakeEmbeddings(Embeddings):
+    """
+    Hashed bag-of-words embeddings: texts sharing words get similar vectors,
+    so FAQ retrieval and the semantic cache behave sensibly offline.
+    """
+
+    def __init__(self, dim: int = 256, latency_ms: float = 40.0, per_text_ms: float = 0.5):
+        self.dim = dim
+        self.latency_ms = latency_ms
+        self.per_text_ms = per_text_ms
+
+    def _vector(self, text: str) -> List[float]:
+        vector = [0.0] * self.dim
+        for word in re.findall(r"[a-z0-9]+", text.lower()):
+            digest = hashlib.md5(word.encode()).digest()
+            vector[int.from_bytes(digest[:4], "little") % self.dim] += 1.0 if digest[4] & 1 else -1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def _delay(self, count: int) -> float:
+        return (self.latency_ms + self.per_text_ms * count) / 1000
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        time.sleep(self._delay(len(texts)))
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        time.sleep(self._delay(1))
+        return self._vector(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        await asyncio.sleep(self._delay(len(texts)))
+        return [self._vector(text) for text in texts]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        await asyncio.sleep(self._delay(1))
+        return self._vector(text)
+
+
+def fake_serpapi_response(params: dict) -> dict:
+    """Deterministic SerpAPI-shaped payload for a request's parameters."""
+    query = params.get("q", "")
+    seed = hashlib.sha1(query.encode()).hexdigest()
+    slug = re.sub(r"[^a-z0-9]+", "-", query.lower()).strip("-")
+    return {
+        "search_metadata": {"status": "Success", "id": seed[:12]},
+        "organic_results": [{
+            "position": i,
+            "title": f"{query.title()} — result {i}",
+            "link": f"https://example.com/{slug}/{seed[i:i + 6]}",
+            "snippet": f"Offline result {i} for '{query}'. " + "Useful travel details. " * 6,
+        } for i in range(1, int(params.get("num") or 5) + 1)],
+    }
+
+
+class _FakeResponse:
+    def __init__(self, payload: dict):
+        self._payload = payload
+        self.status_code = 200
+
+    def raise_for_status(self) -> None:
+        pass
+
+    def json(self) -> dict:
+        return self._payload
+
+
+class FakeSearchClient:
+    """Stands in for the pooled httpx clients used by `search.google_search`."""
+
+    def __init__(self, latency_ms: float = 400.0):
+        self.latency_ms = latency_ms
+        self.requests = 0
+
+    def get(self, url: str, params: dict = None) -> _FakeResponse:
+        self.requests += 1
+        time.sleep(self.latency_ms / 1000)
+        return _FakeResponse(fake_serpapi_response(params or {}))
+
+    def close(self) -> None:
+        pass
+
+
+class FakeAsyncSearchClient(FakeSearchClient):
+    async def get(self, url: str, params: dict = None) -> _FakeResponse:
+        self.requests += 1
+        await asyncio.sleep(self.latency_ms / 1000)
+        return _FakeResponse(fake_serpapi_response(params or {}))
+
+    async def aclose(self) -> None:
+        pass
+
+
+def install(llm_latency_ms: float = 300.0, per_token_ms: float = 5.0, embedding_latency_ms: float = 40.0,
+            search_latency_ms: float = 400.0) -> dict:
+    """
+    Point the agent at the fakes. Call after the environment is configured
+    and before the graph, vectorstore or search clients are first used.
+    """
+    import main
+    import rag.rag
+    import search.google_search as google_search
+
+    embeddings = FakeEmbeddings(latency_ms=embedding_latency_ms)
+    search_client = FakeSearchClient(search_latency_ms)
+    async_search_client = FakeAsyncSearchClient(search_latency_ms)
+
+    main._llm = FakeChatModel(latency_ms=llm_latency_ms, per_token_ms=per_token_ms)
+    rag.rag.get_embeddings = lambda model=rag.rag.EMBEDDING_MODEL: embeddings
+    google_search.get_client = lambda: search_client
+    google_search.get_async_client = lambda: async_search_client
+    return {"embeddings": embeddings, "search": search_client, "async_search": async_search_client}
@@ -0,0 +1,375 @@
+"""
+Offline end-to-end benchmark of the agent graph.
+
+Replaces the OpenAI chat model, OpenAI embeddings and SerpAPI with the
+deterministic fakes in `benchmarks/offline/fakes.py` (each with configurable
+latency), seeds a scratch bookings database at scale, and drives scripted
+multi-turn conversations through the compiled `app` concurrently. Reports
+throughput, turn latency percentiles, memory, DB query timings and lock
+errors, and writes everything to a JSON file. Pass --baseline with an earlier
+result file to compare versions; the exit status is 1 if any tracked metric
+regressed by more than --tolerance.
+
+No network access or API keys are needed.
+
+Usage:
+    python benchmarks/offline/run.py [--sessions 200] [--turns 4] [--concurrency 32] [--bookings 100000]
+        [--llm-latency-ms 300] [--search-latency-ms 400] [--embedding-latency-ms 40]
+        [--mode async|sync] [--label NAME] [--output PATH] [--baseline PATH] [--tolerance 0.1]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, REPO_ROOT)
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+CITIES = ["Lisbon", "Porto", "Madrid", "Paris", "Rome", "Berlin", "Vienna", "Prague", "Athens", "Dublin"]
+
+# Conversation scripts; {id}, {id2}, {id3}, {city}, {checkin} and {checkout} are filled per session
+SCRIPTS = {
+    "lookup_and_pay": [
+        "Show me booking {id}",
+        "Mark booking {id} as paid",
+        "Look up bookings {id}, {id2} and {id3}",
+        "Thanks, that's all!",
+    ],
+    "faq": [
+        "What time is check-in?",
+        "Is breakfast included in the price?",
+        "Do you allow pets in the rooms?",
+        "Is there parking at the hotel?",
+    ],
+    "trip_planning": [
+        "Find hotels in {city}",
+        "Flights from Lisbon to {city}",
+        "What should I see in {city}?",
+        "Book Hotel Central in {city} from {checkin} to {checkout} for 420",
+    ],
+    "history": [
+        "List my recent bookings",
+        "Any bookings in {city}?",
+        "Show me the details of booking {id}",
+        "Great, thank you",
+    ],
+}
+
+# (path in the result, True if higher is better)
+TRACKED = [
+    ("summary.turns_per_s", True),
+    ("summary.latency_ms.p50", False),
+    ("summary.latency_ms.p95", False),
+    ("summary.latency_ms.p99", False),
+    ("summary.peak_heap_mb", False),
+    ("db.query_p95_ms", False),
+    ("summary.errors", False),
+]
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def git_version() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def session_turns(index: int, turns: int, max_booking_id: int) -> tuple:
+    """Deterministic (script name, messages) for session `index`."""
+    name = list(SCRIPTS)[index % len(SCRIPTS)]
+    rng = random.Random(index)
+    values = {
+        "id": rng.randint(1, max_booking_id),
+        "id2": rng.randint(1, max_booking_id),
+        "id3": rng.randint(1, max_booking_id),
+        "city": rng.choice(CITIES),
+        # Relative to today, so the booking is never rejected as being in the past
+        "checkin": date.today() + timedelta(days=30),
+        "checkout": date.today() + timedelta(days=33),
+    }
+    script = SCRIPTS[name]
+    return name, [script[turn % len(script)].format(**values) for turn in range(turns)]
+
+
+def configure_environment(args, workdir: str) -> None:
+    """Point every store at the scratch directory before the agent modules are imported."""
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bookings.db')}"
+    os.environ["CHECKPOINT_URL"] = ("memory" if args.checkpointer == "memory"
+                                    else f"sqlite:///{os.path.join(workdir, 'checkpoints.db')}")
+    os.environ["FAQ_INDEX_DIR"] = os.path.join(workdir, "faq_index")
+    os.environ["METRICS_ENABLED"] = "1"
+    # Never reach the real services, even if a fake is bypassed by mistake
+    os.environ["OPENAI_API_KEY"] = "offline"
+    os.environ["SERPAPI_API_KEY"] = "offline"
+    os.environ.pop("SEARCH_CACHE_PATH", None)
+    # Every session books the same stay; keep the hotels from filling up mid-run
+    os.environ.setdefault("HOTEL_DEFAULT_ROOMS", "100000")
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = []
+        self.by_script = {}
+        self.errors = 0
+        self.locked = 0
+
+    def record(self, script: str, elapsed_ms: float, messages=None, error: Exception = None) -> None:
+        """Record one turn; `messages` is the thread's message list after the turn."""
+        from tools.output import is_error
+
+        self.latencies.append(elapsed_ms)
+        self.by_script.setdefault(script, []).append(elapsed_ms)
+        if error is not None:
+            self.errors += 1
+            texts = [str(error)]
+        else:
+            results = turn_tool_results(messages or [])
+            if any(is_error(content) or status == "error" for content, status in results):
+                self.errors += 1
+            texts = [content for content, _ in results] + [messages[-1].content if messages else ""]
+        if any("locked" in text for text in texts):
+            self.locked += 1
+
+
+def turn_tool_results(messages) -> list:
+    """(content, status) of the tool results since the last user message."""
+    from langchain_core.messages import HumanMessage, ToolMessage
+
+    results = []
+    for message in reversed(messages):
+        if isinstance(message, HumanMessage):
+            break
+        if isinstance(message, ToolMessage) and isinstance(message.content, str):
+            results.append((message.content, message.status))
+    return results
+
+
+async def run_async(app, sessions, concurrency: int, recorder: Recorder) -> None:
+    from langchain_core.messages import HumanMessage
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_session(index, script, messages):
+        async with semaphore:
+            config = {"configurable": {"thread_id": f"offline-{index}"}}
+            for message in messages:
+                started = time.perf_counter()
+                try:
+                    result = await app.ainvoke({"messages": [HumanMessage(content=message)]}, config=config)
+                    recorder.record(script, (time.perf_counter() - started) * 1000,
+                                    messages=result["messages"])
+                except Exception as e:
+                    recorder.record(script, (time.perf_counter() - started) * 1000, error=e)
+
+    await asyncio.gather(*(run_session(i, script, messages) for i, (script, messages) in enumerate(sessions)))
+
+
+def run_sync(app, sessions, concurrency: int, recorder: Recorder) -> None:
+    from langchain_core.messages import HumanMessage
+
+    def run_session(index, script, messages):
+        config = {"configurable": {"thread_id": f"offline-{index}"}}
+        for message in messages:
+            started = time.perf_counter()
+            try:
+                result = app.invoke({"messages": [HumanMessage(content=message)]}, config=config)
+                recorder.record(script, (time.perf_counter() - started) * 1000,
+                                messages=result["messages"])
+            except Exception as e:
+                recorder.record(script, (time.perf_counter() - started) * 1000, error=e)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(run_session, i, script, messages)
+                       for i, (script, messages) in enumerate(sessions)]:
+            future.result()
+
+
+def latency_summary(values) -> dict:
+    return {
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": max(values, default=0.0),
+        "mean": sum(values) / len(values) if values else 0.0,
+    }
+
+
+def db_summary(metrics: dict, recorder: Recorder) -> dict:
+    queries = [h for h in metrics["histograms"] if h["name"] == "db_query_latency_ms"]
+    count = sum(h["count"] for h in queries)
+    return {
+        "queries": count,
+        "query_avg_ms": sum(h["sum_ms"] for h in queries) / count if count else 0.0,
+        "query_p95_ms": max((h["p95_ms"] for h in queries), default=0.0),
+        "by_op": {h["labels"].get("op"): {k: h[k] for k in ("count", "avg_ms", "p95_ms", "p99_ms")}
+                  for h in queries},
+        "locked_errors": recorder.locked,
+    }
+
+
+def lookup(result: dict, path: str):
+    for part in path.split("."):
+        if not isinstance(result, dict) or part not in result:
+            return None
+        result = result[part]
+    return result
+
+
+def compare(result: dict, baseline: dict, tolerance: float) -> bool:
+    """Print tracked metrics against the baseline; return True if any regressed."""
+    print(f"\nComparison with {baseline.get('label')} ({baseline.get('version')}):")
+    print(f"{'metric':<28} | {'baseline':>10} | {'current':>10} | {'change':>8}")
+    print("-" * 66)
+    regressed = False
+    for path, higher_is_better in TRACKED:
+        old, new = lookup(baseline, path), lookup(result, path)
+        if old is None or new is None:
+            continue
+        change = (new - old) / old if old else (0.0 if new == old else float("inf"))
+        worse = -change if higher_is_better else change
+        flag = ""
+        if worse > tolerance:
+            flag = "  ❌ regression"
+            regressed = True
+        print(f"{path:<28} | {old:>10.2f} | {new:>10.2f} | {change:>+7.1%}{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=4, help="Turns per session")
+    parser.add_argument("--concurrency", type=int, default=32, help="Sessions in flight at once")
+    parser.add_argument("--bookings", type=int, default=100_000, help="Rows to seed in the bookings table")
+    parser.add_argument("--llm-latency-ms", type=float, default=300.0)
+    parser.add_argument("--per-token-ms", type=float, default=5.0)
+    parser.add_argument("--embedding-latency-ms", type=float, default=40.0)
+    parser.add_argument("--search-latency-ms", type=float, default=400.0)
+    parser.add_argument("--mode", choices=["async", "sync"], default="async",
+                        help="async: app.ainvoke on one event loop; sync: app.invoke on a thread pool")
+    parser.add_argument("--checkpointer", choices=["sqlite", "memory"], default="sqlite")
+    parser.add_argument("--workdir", help="Reuse a scratch directory (keeps the seeded database)")
+    parser.add_argument("--label", default=None, help="Name for this run (default: git revision)")
+    parser.add_argument("--output", help="Result JSON path (default: benchmarks/offline/results/<label>.json)")
+    parser.add_argument("--baseline", help="Earlier result JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed relative regression")
+    args = parser.parse_args()
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="offline-bench-")
+    os.makedirs(workdir, exist_ok=True)
+    configure_environment(args, workdir)
+
+    from benchmarks.booking_pagination import seed
+    from benchmarks.offline import fakes
+    from metrics.instrumentation import registry
+
+    services = fakes.install(args.llm_latency_ms, args.per_token_ms, args.embedding_latency_ms,
+                             args.search_latency_ms)
+
+    import main as agent
+    from tools.faq_tool import _initialize_vectorstore
+
+    seed(args.bookings)
+    setup_started = time.perf_counter()
+    _initialize_vectorstore()
+    app = agent.get_app()
+    print(f"Setup (index build with fake embeddings, graph compile): {time.perf_counter() - setup_started:.1f}s")
+    # Measure the conversations only
+    registry.reset()
+
+    sessions = [session_turns(i, args.turns, args.bookings) for i in range(args.sessions)]
+    recorder = Recorder()
+    tracemalloc.start()
+    started = time.perf_counter()
+    if args.mode == "async":
+        asyncio.run(run_async(app, sessions, args.concurrency, recorder))
+    else:
+        run_sync(app, sessions, args.concurrency, recorder)
+    elapsed = time.perf_counter() - started
+    peak_heap = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+
+    metrics = registry.to_json()
+    turns = len(recorder.latencies)
+    label = args.label or git_version() or datetime.now().strftime("%Y%m%d-%H%M%S")
+    result = {
+        "label": label,
+        "version": git_version(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "config": {k: v for k, v in vars(args).items() if k not in ("output", "baseline", "workdir")},
+        "summary": {
+            "sessions": args.sessions,
+            "turns": turns,
+            "elapsed_s": elapsed,
+            "turns_per_s": turns / elapsed if elapsed else 0.0,
+            "sessions_per_s": args.sessions / elapsed if elapsed else 0.0,
+            "latency_ms": latency_summary(recorder.latencies),
+            "errors": recorder.errors,
+            "peak_heap_mb": peak_heap,
+            "rss_mb": rss_mb(),
+        },
+        "by_script": {name: latency_summary(values) for name, values in recorder.by_script.items()},
+        "db": db_summary(metrics, recorder),
+        "services": {
+            "search_requests": services["search"].requests + services["async_search"].requests,
+        },
+        "metrics": metrics,
+    }
+
+    summary = result["summary"]
+    latency = summary["latency_ms"]
+    print(f"\nMode: {args.mode}  sessions: {args.sessions}  turns/session: {args.turns}  "
+          f"concurrency: {args.concurrency}  bookings: {args.bookings:,}")
+    print(f"Turns:     {turns} in {elapsed:.1f}s ({summary['turns_per_s']:.1f} turns/s, "
+          f"{summary['sessions_per_s']:.2f} sessions/s)")
+    print(f"Latency:   p50={latency['p50']:.0f} ms  p95={latency['p95']:.0f} ms  "
+          f"p99={latency['p99']:.0f} ms  max={latency['max']:.0f} ms")
+    for name, values in result["by_script"].items():
+        print(f"  {name:<16} p50={values['p50']:.0f} ms  p95={values['p95']:.0f} ms")
+    print(f"Memory:    peak heap {peak_heap:.1f} MB, RSS {summary['rss_mb']:.1f} MB")
+    print(f"Database:  {result['db']['queries']} queries, p95 {result['db']['query_p95_ms']:.1f} ms, "
+          f"{result['db']['locked_errors']} lock errors")
+    print(f"Errors:    {recorder.errors}  search requests: {result['services']['search_requests']}")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{label}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(result, f, indent=2, default=str)
+    print(f"\nResults written to {output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if compare(result, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
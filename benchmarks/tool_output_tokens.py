@@ -0,0 +1,132 @@
+"""
+Tool output size: prompt tokens with compact vs pretty tool results.
+
+Runs the offline benchmark's scripted conversations once per
+TOOL_OUTPUT_MODE against the same seeded database and fakes, and reports:
+- tool-result tokens per tool call, by tool, counted from the ToolMessages
+  that end up in the conversation history;
+- prompt tokens per LLM call and per turn, from the llm_prompt_tokens_total
+  and llm_calls_total counters.
+
+Tokens are counted with tiktoken when it is installed (len/4 otherwise), the
+same way the history manager budgets prompts. No network access or API keys
+are needed.
+
+Usage:
+    python benchmarks/tool_output_tokens.py [--sessions 40] [--turns 4] [--bookings 10000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+from collections import defaultdict
+from types import SimpleNamespace
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+MODES = ("pretty", "compact")
+
+
+def counter_total(metrics: dict, name: str) -> float:
+    return sum(c["value"] for c in metrics["counters"] if c["name"] == name and c["labels"].get("purpose") == "chat")
+
+
+def run_mode(app, sessions, mode: str, count_tokens) -> dict:
+    from langchain_core.messages import HumanMessage, ToolMessage
+    from metrics.instrumentation import registry
+    from tools.output import set_output_mode
+
+    set_output_mode(mode)
+    registry.reset()
+    tool_tokens = defaultdict(list)
+    by_script = defaultdict(lambda: {"turns": 0, "tool_tokens": 0})
+    turns = 0
+    for index, (script, messages) in enumerate(sessions):
+        config = {"configurable": {"thread_id": f"tokens-{mode}-{index}"}}
+        for message in messages:
+            app.invoke({"messages": [HumanMessage(content=message)]}, config=config)
+            turns += 1
+        by_script[script]["turns"] += len(messages)
+        for message in app.get_state(config).values["messages"]:
+            if isinstance(message, ToolMessage):
+                tokens = count_tokens([message])
+                tool_tokens[message.name].append(tokens)
+                by_script[script]["tool_tokens"] += tokens
+
+    metrics = registry.to_json()
+    prompt_tokens = counter_total(metrics, "llm_prompt_tokens_total")
+    calls = counter_total(metrics, "llm_calls_total")
+    return {
+        "turns": turns,
+        "llm_calls": calls,
+        "prompt_per_call": prompt_tokens / calls if calls else 0.0,
+        "prompt_per_turn": prompt_tokens / turns if turns else 0.0,
+        "tool_tokens": tool_tokens,
+        "by_script": by_script,
+    }
+
+
+def reduction(before: float, after: float) -> str:
+    return f"{(before - after) / before:>+8.1%}" if before else f"{'-':>8}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=40)
+    parser.add_argument("--turns", type=int, default=4, help="Turns per session")
+    parser.add_argument("--bookings", type=int, default=10_000, help="Rows to seed in the bookings table")
+    args = parser.parse_args()
+
+    from benchmarks.offline.run import configure_environment, session_turns
+
+    workdir = tempfile.mkdtemp(prefix="tool-tokens-")
+    configure_environment(SimpleNamespace(checkpointer="memory"), workdir)
+    # Keep the full tool results in the prompt, so the difference is not hidden by history trimming
+    os.environ.setdefault("HISTORY_TOKEN_BUDGET", "1000000")
+
+    from benchmarks.booking_pagination import seed
+    from benchmarks.offline import fakes
+
+    fakes.install(llm_latency_ms=0, per_token_ms=0, embedding_latency_ms=0, search_latency_ms=0)
+
+    import main as agent
+    from state.history import HistoryManager
+    from tools.faq_tool import _initialize_vectorstore
+
+    seed(args.bookings)
+    _initialize_vectorstore()
+    app = agent.get_app()
+    count_tokens = HistoryManager().count_tokens
+
+    sessions = [session_turns(i, args.turns, args.bookings) for i in range(args.sessions)]
+    results = {mode: run_mode(app, sessions, mode, count_tokens) for mode in MODES}
+    pretty, compact = results["pretty"], results["compact"]
+
+    print(f"{args.sessions} sessions x {args.turns} turns, tokens per tool result\n")
+    print(f"{'tool':<26} | {'calls':>5} | {'pretty':>8} | {'compact':>8} | {'change':>8}")
+    print("-" * 66)
+    for tool in sorted(set(pretty["tool_tokens"]) | set(compact["tool_tokens"])):
+        before, after = pretty["tool_tokens"].get(tool, []), compact["tool_tokens"].get(tool, [])
+        before_avg = sum(before) / len(before) if before else 0.0
+        after_avg = sum(after) / len(after) if after else 0.0
+        print(f"{tool:<26} | {len(after):>5} | {before_avg:>8.0f} | {after_avg:>8.0f} | "
+              f"{reduction(before_avg, after_avg)}")
+
+    print(f"\n{'script':<26} | {'pretty':>8} | {'compact':>8} | {'change':>8}   (tool tokens per turn)")
+    print("-" * 66)
+    for script, before in pretty["by_script"].items():
+        after = compact["by_script"][script]
+        before_avg = before["tool_tokens"] / before["turns"]
+        after_avg = after["tool_tokens"] / after["turns"]
+        print(f"{script:<26} | {before_avg:>8.0f} | {after_avg:>8.0f} | {reduction(before_avg, after_avg)}")
+
+    print(f"\n{'prompt tokens':<26} | {'pretty':>8} | {'compact':>8} | {'change':>8}")
+    print("-" * 66)
+    for key, label in (("prompt_per_call", "per LLM call"), ("prompt_per_turn", "per turn")):
+        print(f"{label:<26} | {pretty[key]:>8.0f} | {compact[key]:>8.0f} | {reduction(pretty[key], compact[key])}")
+    print(f"{'LLM calls':<26} | {pretty['llm_calls']:>8.0f} | {compact['llm_calls']:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
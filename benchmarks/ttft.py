@@ -0,0 +1,97 @@
+"""
+Time-to-first-token benchmark: blocking `app.ainvoke` vs streaming.
+
+Runs each scripted prompt on a fresh thread through both paths and reports
+when the user first sees output. On the blocking path that is when the whole
+graph run returns; on the streaming path it is the first token (or tool
+event) yielded by `stream_turn`. Needs OPENAI_API_KEY (and SERPAPI_API_KEY
+for the search prompts) since it exercises the real agent.
+
+Usage:
+    python benchmarks/ttft.py [--rounds 3]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+PROMPTS = [
+    "Hi! What can you help me with?",
+    "Show me booking 3",
+    "What time is check-in?",
+    "Find hotels in Lisbon",
+]
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+
+def _config():
+    return {"configurable": {"thread_id": f"ttft-{uuid.uuid4().hex[:12]}"}}
+
+
+async def blocking(app, prompt):
+    from langchain_core.messages import HumanMessage
+
+    started = time.perf_counter()
+    await app.ainvoke({"messages": [HumanMessage(content=prompt)]}, config=_config())
+    elapsed = (time.perf_counter() - started) * 1000
+    return elapsed, elapsed
+
+
+async def streaming(app, prompt):
+    from streaming.events import stream_turn
+
+    started = time.perf_counter()
+    first_token = first_event = None
+    async for event in stream_turn(app, prompt, _config()):
+        now = (time.perf_counter() - started) * 1000
+        if first_event is None and event["type"] != "done":
+            first_event = now
+        if first_token is None and event["type"] == "token":
+            first_token = now
+    total = (time.perf_counter() - started) * 1000
+    return first_token if first_token is not None else total, first_event if first_event is not None else total, total
+
+
+async def main_async(args):
+    from main import get_app
+
+    app = get_app()
+    results = {"blocking": [], "first_token": [], "first_event": [], "stream_total": []}
+
+    print(f"{'prompt':<40} | {'blocking':>9} | {'1st tok':>8} | {'1st evt':>8} | {'stream':>8}")
+    print("-" * 86)
+    for _ in range(args.rounds):
+        for prompt in PROMPTS:
+            block_ms, _ = await blocking(app, prompt)
+            token_ms, event_ms, total_ms = await streaming(app, prompt)
+            results["blocking"].append(block_ms)
+            results["first_token"].append(token_ms)
+            results["first_event"].append(event_ms)
+            results["stream_total"].append(total_ms)
+            print(f"{prompt[:40]:<40} | {block_ms:>7.0f}ms | {token_ms:>6.0f}ms | {event_ms:>6.0f}ms | {total_ms:>6.0f}ms")
+
+    print("\nTime until the user sees output (ms):")
+    for name, values in results.items():
+        print(f"  {name:<13} p50={percentile(values, 50):>7.0f}  p95={percentile(values, 95):>7.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
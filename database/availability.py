@@ -0,0 +1,297 @@
+"""
+Per-hotel room availability and double-booking detection.
+
+Each hotel has a room count in `hotel_inventory` and its stays are half-open
+[checkin, checkout) intervals. A stay can be booked while, on every night of
+it, fewer bookings overlap than there are rooms.
+
+Reads (the check_availability tool, and the pre-check before a create) go
+through an in-memory interval tree per hotel, loaded from the DB on first
+use and refreshed every AVAILABILITY_REFRESH_SECONDS. That catches bookings
+made by other processes. The authoritative check runs inside the write
+transaction via `reserve`, which locks the hotel's inventory row and reads
+only the overlapping stays through the ix_bookings_hotel_stay index. Two
+concurrent creates therefore cannot both take the last room.
+
+Stays are at most STAY_MAX_NIGHTS long, which bounds that index range scan
+from below: a stay that overlaps [checkin, checkout) must start after
+checkin - STAY_MAX_NIGHTS. Without that bound, every booking would scan all
+of its hotel's earlier stays. Bulk loads that bypass `reserve` must respect
+the limit too.
+"""
+import os
+import random
+import threading
+import time
+from collections import namedtuple
+from datetime import timedelta
+
+from sqlalchemy import select
+from database.database import Booking, HotelInventory, async_session_scope, session_scope
+from metrics.instrumentation import register_collector
+
+HOTEL_DEFAULT_ROOMS = int(os.getenv("HOTEL_DEFAULT_ROOMS", "10"))
+AVAILABILITY_REFRESH_SECONDS = float(os.getenv("AVAILABILITY_REFRESH_SECONDS", "30"))
+STAY_MAX_NIGHTS = int(os.getenv("STAY_MAX_NIGHTS", "90"))
+
+Availability = namedtuple("Availability", "rooms booked available")
+
+
+class RoomUnavailable(Exception):
+    """Raised inside a write transaction when a stay would overbook the hotel."""
+
+
+class _Node:
+    __slots__ = ("key", "start", "end", "priority", "max_end", "left", "right")
+
+    def __init__(self, start, end, key):
+        self.key = (start, end, key)
+        self.start = start
+        self.end = end
+        self.priority = random.random()
+        self.max_end = end
+        self.left = None
+        self.right = None
+
+
+def _update(node):
+    node.max_end = node.end
+    if node.left is not None and node.left.max_end > node.max_end:
+        node.max_end = node.left.max_end
+    if node.right is not None and node.right.max_end > node.max_end:
+        node.max_end = node.right.max_end
+    return node
+
+
+def _split(node, key, inclusive=False):
+    """Split into (keys < key, keys >= key), or (keys <= key, keys > key) if inclusive."""
+    if node is None:
+        return None, None
+    if node.key < key or (inclusive and node.key == key):
+        node.right, right = _split(node.right, key, inclusive)
+        return _update(node), right
+    left, node.left = _split(node.left, key, inclusive)
+    return left, _update(node)
+
+
+def _merge(left, right):
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        return _update(left)
+    right.left = _merge(left, right.left)
+    return _update(right)
+
+
+class IntervalTree:
+    """
+    Augmented interval tree over half-open [start, end) intervals.
+
+    A treap ordered by (start, end, key) in which every node also stores the
+    largest end in its subtree. Insert and remove take O(log n) expected
+    time. Listing the m intervals that overlap a range takes O(log n + m),
+    because a subtree whose max end is at or before the range start is
+    skipped.
+    """
+
+    def __init__(self):
+        self._root = None
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, start, end, key) -> None:
+        left, right = _split(self._root, (start, end, key))
+        middle, right = _split(right, (start, end, key), inclusive=True)
+        if middle is None:
+            self._size += 1
+        self._root = _merge(_merge(left, _Node(start, end, key)), right)
+
+    def remove(self, start, end, key) -> bool:
+        left, right = _split(self._root, (start, end, key))
+        middle, right = _split(right, (start, end, key), inclusive=True)
+        self._root = _merge(left, right)
+        if middle is None:
+            return False
+        self._size -= 1
+        return True
+
+    def overlapping(self, start, end) -> list:
+        """(start, end, key) of every interval overlapping [start, end)."""
+        found = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node is None or node.max_end <= start:
+                continue
+            stack.append(node.left)
+            # Right subtree starts no earlier than this node
+            if node.start < end:
+                if node.end > start:
+                    found.append(node.key)
+                stack.append(node.right)
+        return found
+
+
+def peak_occupancy(intervals, start, end) -> int:
+    """Most stays in `intervals` overlapping any single night of [start, end)."""
+    events = []
+    for s, e in intervals:
+        s, e = max(s, start), min(e, end)
+        if s < e:
+            events.append((s, 1))
+            events.append((e, -1))
+    # At equal dates a checkout (-1) sorts before a checkin (+1): the room is free that night
+    events.sort()
+    peak = current = 0
+    for _, delta in events:
+        current += delta
+        peak = max(peak, current)
+    return peak
+
+
+def _stays_query(hotel_name, hotel_city):
+    return select(Booking.booking_id, Booking.checkin_date, Booking.checkout_date).where(
+        Booking.hotel_name == hotel_name, Booking.hotel_city == hotel_city
+    )
+
+
+def _rooms(session, hotel_name, hotel_city) -> int:
+    rooms = session.scalar(select(HotelInventory.rooms).where(
+        HotelInventory.hotel_name == hotel_name, HotelInventory.hotel_city == hotel_city
+    ))
+    return rooms if rooms is not None else HOTEL_DEFAULT_ROOMS
+
+
+def reserve(session, booking, pending=()) -> None:
+    """
+    Check, inside the write transaction that inserts `booking`, that its
+    hotel still has a free room on every night of the stay.
+
+    Locks the hotel's inventory row (creating it with HOTEL_DEFAULT_ROOMS if
+    the hotel is new), so concurrent reservations for one hotel serialize.
+    On SQLite the IMMEDIATE write transaction already does this. `pending`
+    holds bookings accepted earlier in the same transaction that are not
+    inserted yet.
+
+    Raises:
+        RoomUnavailable: if the stay would exceed the hotel's rooms, or is
+            longer than STAY_MAX_NIGHTS
+    """
+    if (booking.checkout_date - booking.checkin_date).days > STAY_MAX_NIGHTS:
+        raise RoomUnavailable(f"Stays longer than {STAY_MAX_NIGHTS} nights cannot be booked.")
+
+    inventory = session.scalars(select(HotelInventory).where(
+        HotelInventory.hotel_name == booking.hotel_name, HotelInventory.hotel_city == booking.hotel_city
+    ).with_for_update()).first()
+    if inventory is None:
+        inventory = HotelInventory(hotel_name=booking.hotel_name, hotel_city=booking.hotel_city,
+                                   rooms=HOTEL_DEFAULT_ROOMS)
+        session.add(inventory)
+        session.flush()
+
+    # Bounded on both sides of checkin_date, so the index scan does not grow with the hotel's history
+    rows = session.execute(_stays_query(booking.hotel_name, booking.hotel_city).where(
+        Booking.checkin_date > booking.checkin_date - timedelta(days=STAY_MAX_NIGHTS),
+        Booking.checkin_date < booking.checkout_date,
+        Booking.checkout_date > booking.checkin_date,
+    )).all()
+    intervals = [(row.checkin_date, row.checkout_date) for row in rows]
+    intervals += [(b.checkin_date, b.checkout_date) for b in pending
+                  if b.hotel_name == booking.hotel_name and b.hotel_city == booking.hotel_city]
+
+    if peak_occupancy(intervals, booking.checkin_date, booking.checkout_date) >= inventory.rooms:
+        raise RoomUnavailable(
+            f"{booking.hotel_name} ({booking.hotel_city}) is fully booked on some nights between "
+            f"{booking.checkin_date} and {booking.checkout_date}."
+        )
+
+
+class AvailabilityIndex:
+    """
+    In-memory interval trees of every loaded hotel's stays, plus its room count.
+
+    Hotels are loaded lazily with one indexed query, and reloaded after
+    `refresh_seconds` so bookings made by other workers show up. Bookings
+    created by this process are added as soon as their transaction commits.
+    """
+
+    def __init__(self, refresh_seconds: float = AVAILABILITY_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self._hotels = {}
+        self._lock = threading.Lock()
+
+    def _load(self, session, hotel_name, hotel_city):
+        tree = IntervalTree()
+        for row in session.execute(_stays_query(hotel_name, hotel_city)):
+            if row.checkin_date and row.checkout_date:
+                tree.add(row.checkin_date, row.checkout_date, row.booking_id)
+        return tree, _rooms(session, hotel_name, hotel_city), time.monotonic()
+
+    def _fresh(self, hotel_name, hotel_city):
+        entry = self._hotels.get((hotel_name, hotel_city))
+        if entry is not None and time.monotonic() - entry[2] < self.refresh_seconds:
+            return entry
+        return None
+
+    def _check(self, entry, checkin, checkout) -> Availability:
+        tree, rooms, _ = entry
+        with self._lock:
+            overlapping = tree.overlapping(checkin, checkout)
+        booked = peak_occupancy([(s, e) for s, e, _ in overlapping], checkin, checkout)
+        return Availability(rooms, booked, max(0, rooms - booked))
+
+    def check(self, hotel_name, hotel_city, checkin, checkout) -> Availability:
+        """Rooms, peak rooms booked, and rooms free on every night of [checkin, checkout)."""
+        entry = self._fresh(hotel_name, hotel_city)
+        if entry is None:
+            with session_scope() as session:
+                entry = self._load(session, hotel_name, hotel_city)
+            self._hotels[(hotel_name, hotel_city)] = entry
+        return self._check(entry, checkin, checkout)
+
+    async def acheck(self, hotel_name, hotel_city, checkin, checkout) -> Availability:
+        entry = self._fresh(hotel_name, hotel_city)
+        if entry is None:
+            async with async_session_scope() as session:
+                entry = await session.run_sync(self._load, hotel_name, hotel_city)
+            self._hotels[(hotel_name, hotel_city)] = entry
+        return self._check(entry, checkin, checkout)
+
+    def add(self, booking) -> None:
+        """Record a committed booking in its hotel's tree, if that hotel is loaded."""
+        entry = self._hotels.get((booking.hotel_name, booking.hotel_city))
+        if entry is not None:
+            with self._lock:
+                entry[0].add(booking.checkin_date, booking.checkout_date, booking.booking_id)
+
+    def invalidate(self, hotel_name=None, hotel_city=None) -> None:
+        """Drop one hotel's tree (or all of them), e.g. after its inventory changes."""
+        if hotel_name is None:
+            self._hotels.clear()
+        else:
+            self._hotels.pop((hotel_name, hotel_city), None)
+
+    def stats(self) -> dict:
+        return {
+            "hotels": len(self._hotels),
+            "stays": sum(len(entry[0]) for entry in list(self._hotels.values())),
+        }
+
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_availability_index() -> AvailabilityIndex:
+    """Return the process-wide availability index."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = AvailabilityIndex()
+                register_collector("availability", _index.stats)
+    return _index
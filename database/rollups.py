@@ -0,0 +1,262 @@
+"""
+Booking analytics from incrementally maintained rollup tables.
+
+Two summary tables hold additive totals (bookings, revenue, unpaid balance,
+unpaid bookings and room nights): one row per hotel and month, and one per
+city and month. Revenue and booking counts are attributed to the check-in
+month. Room nights are counted in the month each night falls in.
+
+Every booking write updates the rollups inside its own transaction:
+`record_created` when a booking is inserted, and `record_payment` when its
+payment status changes. Reports therefore read a few rollup rows per hotel
+or city and month, however many bookings there are. Bookings inserted
+outside the tools (bulk loads, other services) are picked up by `rebuild`,
+which recomputes both tables from the bookings table. `init_db` runs it
+when the tables are empty, and `python main.py rebuild-rollups` runs it on
+demand.
+
+Occupancy is room nights over rooms x days, with rooms taken from
+`hotel_inventory`.
+"""
+import calendar
+import os
+from collections import defaultdict
+from datetime import date
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from database.database import Booking, CityMonthRollup, HotelInventory, HotelMonthRollup
+from database.availability import HOTEL_DEFAULT_ROOMS
+
+ROLLUP_REBUILD_BATCH = int(os.getenv("ROLLUP_REBUILD_BATCH", "50000"))
+
+TOTALS = ("bookings", "revenue", "unpaid", "unpaid_bookings", "room_nights")
+DIMENSIONS = ("city", "hotel", "month")
+
+
+def month_key(day: date) -> str:
+    return f"{day.year:04d}-{day.month:02d}"
+
+
+def _next_month(day: date) -> date:
+    return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+
+
+def _nights_by_month(checkin: date, checkout: date):
+    """(month, nights) for each month the half-open stay [checkin, checkout) has nights in."""
+    current = checkin
+    while current < checkout:
+        end = min(checkout, _next_month(current))
+        yield month_key(current), (end - current).days
+        current = end
+
+
+def _contributions(booking):
+    """(month, totals) the booking adds to its hotel's and city's rollups; nothing without dates."""
+    if booking.checkin_date is None:
+        return []
+    price = float(booking.booking_price or 0.0)
+    unpaid = not booking.is_paid
+    first = month_key(booking.checkin_date)
+    out = {first: [1, price, price if unpaid else 0.0, int(unpaid), 0]}
+    if booking.checkout_date is not None:
+        for month, nights in _nights_by_month(booking.checkin_date, booking.checkout_date):
+            out.setdefault(month, [0, 0.0, 0.0, 0, 0])[4] += nights
+    return list(out.items())
+
+
+def _accumulate(hotels, cities, booking, totals_for):
+    for month, totals in totals_for(booking):
+        for table, key in ((hotels, (booking.hotel_name, booking.hotel_city, month)),
+                           (cities, (booking.hotel_city, month))):
+            current = table.get(key)
+            if current is None:
+                table[key] = list(totals)
+            else:
+                for i, amount in enumerate(totals):
+                    current[i] += amount
+
+
+def _hotel_key(key):
+    return {"hotel_name": key[0], "hotel_city": key[1], "month": key[2]}
+
+
+def _city_key(key):
+    return {"hotel_city": key[0], "month": key[1]}
+
+
+def _add(session, model, key: dict, totals) -> None:
+    """Add `totals` to one rollup row, creating it if this is its first booking."""
+    where = [getattr(model, column) == v for column, v in key.items()]
+    increments = {name: getattr(model, name) + amount for name, amount in zip(TOTALS, totals) if amount}
+    if not increments:
+        return
+    statement = update(model).where(*where).values(**increments).execution_options(synchronize_session=False)
+    if session.execute(statement).rowcount:
+        return
+    try:
+        # A savepoint, so losing the insert race to another writer does not abort the transaction
+        with session.begin_nested():
+            session.execute(insert(model).values(**key, **dict(zip(TOTALS, totals))))
+    except IntegrityError:
+        session.execute(statement)
+
+
+def _apply(session, hotels: dict, cities: dict) -> None:
+    # Fixed key order, so concurrent writers lock rollup rows in the same order
+    for key in sorted(hotels):
+        _add(session, HotelMonthRollup, _hotel_key(key), hotels[key])
+    for key in sorted(cities):
+        _add(session, CityMonthRollup, _city_key(key), cities[key])
+
+
+def record_created(session, bookings) -> None:
+    """Add newly inserted bookings to the rollups, in the transaction that inserts them."""
+    hotels, cities = {}, {}
+    for booking in bookings:
+        _accumulate(hotels, cities, booking, _contributions)
+    _apply(session, hotels, cities)
+
+
+def record_payment(session, bookings, is_paid: bool) -> None:
+    """
+    Move bookings whose payment status is changing to `is_paid` between the
+    paid and unpaid totals. Pass the rows as they were before the update;
+    rows already in that state are skipped, so retried updates are no-ops.
+    """
+    def payment_delta(booking):
+        if booking.checkin_date is None or bool(booking.is_paid) == is_paid:
+            return []
+        sign = -1 if is_paid else 1
+        return [(month_key(booking.checkin_date),
+                 [0, 0.0, sign * float(booking.booking_price or 0.0), sign, 0])]
+
+    hotels, cities = {}, {}
+    for booking in bookings:
+        _accumulate(hotels, cities, booking, payment_delta)
+    _apply(session, hotels, cities)
+
+
+def rebuild(session, batch: int = ROLLUP_REBUILD_BATCH) -> dict:
+    """
+    Recompute both rollup tables from the bookings table in one streaming pass.
+
+    Hotels with bookings but no inventory row get one with
+    HOTEL_DEFAULT_ROOMS, as `reserve` would on their first booking, so
+    occupancy has a room count for every hotel. Run it in a write
+    transaction. On databases other than SQLite, writes made while it runs
+    may be lost from the rollups, so run it while bookings are quiet.
+
+    Returns:
+        dict: bookings scanned and rollup rows written per table
+    """
+    hotels, cities = {}, {}
+    scanned = 0
+    rows = session.execute(
+        select(Booking.hotel_name, Booking.hotel_city, Booking.checkin_date, Booking.checkout_date,
+               Booking.booking_price, Booking.is_paid).execution_options(yield_per=batch)
+    )
+    for row in rows:
+        _accumulate(hotels, cities, row, _contributions)
+        scanned += 1
+
+    session.execute(delete(HotelMonthRollup))
+    session.execute(delete(CityMonthRollup))
+    for table, model, key_of in ((hotels, HotelMonthRollup, _hotel_key), (cities, CityMonthRollup, _city_key)):
+        items = list(table.items())
+        for offset in range(0, len(items), batch):
+            session.execute(insert(model), [{**key_of(key), **dict(zip(TOTALS, totals))}
+                                            for key, totals in items[offset:offset + batch]])
+
+    known = set(session.execute(select(HotelInventory.hotel_name, HotelInventory.hotel_city)).tuples())
+    missing = {(name, city) for name, city, _ in hotels} - known
+    if missing:
+        session.execute(insert(HotelInventory), [{"hotel_name": name, "hotel_city": city, "rooms": HOTEL_DEFAULT_ROOMS}
+                                                 for name, city in sorted(missing)])
+    return {"bookings": scanned, "hotel_rows": len(hotels), "city_rows": len(cities)}
+
+
+def _months_between(first: str, last: str) -> list:
+    year, month = map(int, first.split("-"))
+    months = []
+    while f"{year:04d}-{month:02d}" <= last:
+        months.append(f"{year:04d}-{month:02d}")
+        year, month = year + month // 12, month % 12 + 1
+    return months
+
+
+def _days(month: str) -> int:
+    year, month = map(int, month.split("-"))
+    return calendar.monthrange(year, month)[1]
+
+
+def summarize(session, dimensions=("city",), city: str = None, hotel: str = None,
+              month_from: str = None, month_to: str = None) -> list:
+    """
+    Revenue, unpaid balance and occupancy grouped by `dimensions` (any of
+    "city", "hotel", "month"), read from the rollups only.
+
+    Reports that do not group or filter by hotel read the city rollup.
+    Months are YYYY-MM and both bounds are inclusive.
+
+    Returns:
+        list: one dict per group, ordered by its dimension values, with the
+            dimension values, the TOTALS, paid revenue and occupancy (None
+            when the rooms are unknown)
+    """
+    unknown = set(dimensions) - set(DIMENSIONS)
+    if unknown:
+        raise ValueError(f"Unknown dimension {', '.join(sorted(unknown))}, use {', '.join(DIMENSIONS)}")
+    by_hotel = "hotel" in dimensions or hotel is not None
+    model = HotelMonthRollup if by_hotel else CityMonthRollup
+
+    statement = select(model)
+    if city is not None:
+        statement = statement.where(model.hotel_city == city)
+    if hotel is not None:
+        statement = statement.where(model.hotel_name == hotel)
+    if month_from is not None:
+        statement = statement.where(model.month >= month_from)
+    if month_to is not None:
+        statement = statement.where(model.month <= month_to)
+    rows = session.scalars(statement).all()
+    if not rows:
+        return []
+
+    # Rooms per hotel, or per city summed over its hotels
+    if by_hotel:
+        inventory = select(HotelInventory.hotel_name, HotelInventory.hotel_city, HotelInventory.rooms)
+        if city is not None:
+            inventory = inventory.where(HotelInventory.hotel_city == city)
+        rooms = {(name, city_name): n for name, city_name, n in session.execute(inventory)}
+    else:
+        inventory = select(HotelInventory.hotel_city, func.sum(HotelInventory.rooms)).group_by(HotelInventory.hotel_city)
+        if city is not None:
+            inventory = inventory.where(HotelInventory.hotel_city == city)
+        rooms = {city_name: n for city_name, n in session.execute(inventory)}
+
+    # Groups that are not split by month cover every month in the report's range
+    span = _months_between(month_from or min(r.month for r in rows), month_to or max(r.month for r in rows))
+    span_days = sum(_days(m) for m in span)
+
+    values = {"city": lambda r: r.hotel_city, "hotel": lambda r: r.hotel_name, "month": lambda r: r.month}
+    groups = defaultdict(lambda: {"totals": [0, 0.0, 0.0, 0, 0], "rooms": {}})
+    for row in rows:
+        group = groups[tuple(values[d](row) for d in dimensions)]
+        for i, name in enumerate(TOTALS):
+            group["totals"][i] += getattr(row, name)
+        entity = (row.hotel_name, row.hotel_city) if by_hotel else row.hotel_city
+        group["rooms"][entity] = rooms.get(entity, HOTEL_DEFAULT_ROOMS if by_hotel else None)
+
+    report = []
+    for key in sorted(groups):
+        group = groups[key]
+        entry = dict(zip(dimensions, key))
+        entry.update(zip(TOTALS, group["totals"]))
+        entry["paid_revenue"] = entry["revenue"] - entry["unpaid"]
+        group_rooms = list(group["rooms"].values())
+        days = _days(entry["month"]) if "month" in dimensions else span_days
+        capacity = sum(group_rooms) * days if None not in group_rooms else 0
+        entry["occupancy"] = entry["room_nights"] / capacity if capacity else None
+        report.append(entry)
+    return report
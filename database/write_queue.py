@@ -0,0 +1,174 @@
+import asyncio
+import atexit
+import os
+import queue
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future
+
+from database.database import session_scope, async_session_scope
+from metrics.instrumentation import register_collector
+
+GROUP_COMMIT_ENABLED = os.getenv("BOOKING_GROUP_COMMIT", "0").lower() in ("1", "true", "yes")
+GROUP_COMMIT_WINDOW_MS = float(os.getenv("BOOKING_GROUP_COMMIT_WINDOW_MS", "5"))
+GROUP_COMMIT_MAX_BATCH = int(os.getenv("BOOKING_GROUP_COMMIT_MAX_BATCH", "256"))
+
+
+class GroupCommitWriter:
+    """
+    Write-behind queue that commits many callers' writes in one transaction.
+
+    Each submitted operation is a callable taking a SQLAlchemy session. A
+    background thread collects operations for up to `window_ms` (or until
+    `max_batch` are pending), runs each inside its own SAVEPOINT so one
+    failure does not abort its neighbours, and commits the batch once. Every
+    caller's future resolves with its operation's return value only after
+    the commit is durable.
+    """
+
+    def __init__(self, window_ms: float = GROUP_COMMIT_WINDOW_MS, max_batch: int = GROUP_COMMIT_MAX_BATCH):
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._closed = False
+        # Stats for tuning the window
+        self.batches = 0
+        self.operations = 0
+        self.batch_sizes = Counter()
+        self.commit_latencies = deque(maxlen=1000)
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="group-commit-writer", daemon=True)
+                    self._thread.start()
+
+    def submit(self, op) -> Future:
+        """Queue `op(session)` for the next batch and return a future for its result."""
+        if self._closed:
+            raise RuntimeError("Group commit writer is closed")
+        self._ensure_started()
+        future = Future()
+        self._queue.put((op, future))
+        return future
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._commit(batch)
+                    return
+                batch.append(item)
+            self._commit(batch)
+
+    def _commit(self, batch):
+        started = time.perf_counter()
+        outcomes = []
+        try:
+            with session_scope(write=True) as session:
+                for op, future in batch:
+                    try:
+                        with session.begin_nested():
+                            outcomes.append((future, op(session), None))
+                    except Exception as e:
+                        outcomes.append((future, None, e))
+        except Exception as e:
+            # The commit itself failed: nothing in this batch was written
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        latency = time.perf_counter() - started
+        with self._lock:
+            self.batches += 1
+            self.operations += len(batch)
+            self.batch_sizes[len(batch)] += 1
+            self.commit_latencies.append(latency)
+
+        for future, result, error in outcomes:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def close(self, timeout: float = 5.0):
+        """Flush pending writes and stop the background thread."""
+        self._closed = True
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout)
+
+    def stats(self) -> dict:
+        with self._lock:
+            latencies = sorted(self.commit_latencies)
+            sizes = dict(sorted(self.batch_sizes.items()))
+            batches, operations = self.batches, self.operations
+
+        def pct(p):
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000 if latencies else 0.0
+
+        return {
+            "window_ms": self.window * 1000,
+            "batches": batches,
+            "operations": operations,
+            "avg_batch_size": operations / batches if batches else 0.0,
+            "max_batch_size": max(sizes) if sizes else 0,
+            "batch_size_histogram": sizes,
+            "commit_latency_ms": {"p50": pct(0.5), "p95": pct(0.95), "max": pct(1.0)},
+            "pending": self._queue.qsize(),
+        }
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+def get_writer() -> GroupCommitWriter:
+    """Return the process-wide group commit writer, starting it on first use."""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = GroupCommitWriter()
+                atexit.register(_writer.close)
+    return _writer
+
+def run_write(op):
+    """
+    Run `op(session)` in a write transaction and return its result.
+
+    With BOOKING_GROUP_COMMIT enabled the operation joins the next group
+    commit; otherwise it gets its own unit of work.
+    """
+    if GROUP_COMMIT_ENABLED:
+        return get_writer().submit(op).result()
+    with session_scope(write=True) as session:
+        return op(session)
+
+async def arun_write(op):
+    """Async counterpart of `run_write`; never blocks the event loop."""
+    if GROUP_COMMIT_ENABLED:
+        return await asyncio.wrap_future(get_writer().submit(op))
+    async with async_session_scope(write=True) as session:
+        return await session.run_sync(op)
+
+def write_stats() -> dict:
+    """Batch size and commit latency stats, or None when group commit is off."""
+    return _writer.stats() if _writer is not None else None
+
+register_collector("group_commit", write_stats)
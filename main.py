@@ -1,42 +1,111 @@
-from langchain_openai import ChatOpenAI
+import argparse
+import asyncio
+import os
+import threading
+import time
 from typing import Annotated
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
-from langgraph.checkpoint.memory import MemorySaver
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import START, StateGraph, END
-from langgraph.prebuilt import ToolNode
-from IPython.display import Image, display
-from langchain_core.runnables.graph import MermaidDrawMethod
 from state.state import AgentState
+from state.history import HistoryManager, llm_summarizer
+from metrics.instrumentation import format_trace, instrumented, record_llm_usage, register_collector, span, trace
+from router.fast_path import FastPathRouter
+from tools.scheduler import ToolScheduler
+from tools.output import output_mode
 
 
 # Import your tools
-from tools.booking_tool import booking_lookup_tool, booking_create_tool, payment_update_tool
+from tools.booking_tool import (
+    booking_lookup_tool, booking_create_tool, payment_update_tool,
+    batch_lookup_tool, batch_create_tool, batch_payment_update_tool, booking_search_tool, availability_tool
+)
+from tools.analytics_tool import analytics_tool
 from tools.faq_tool import faq_tool
 from tools.search_tools import search_tool, hotel_search_tool, flight_search_tool
 
 
-# Initialize the LLM
-llm = ChatOpenAI(
-    model="gpt-3.5-turbo",
-    temperature=0.1
-)
-
-# Set up memory
-memory = MemorySaver()
-
 # Define all tools
 tools = [
     booking_lookup_tool,
     booking_create_tool, 
     payment_update_tool,
+    batch_lookup_tool,
+    batch_create_tool,
+    batch_payment_update_tool,
+    booking_search_tool,
+    availability_tool,
+    analytics_tool,
     faq_tool,
     search_tool,
     hotel_search_tool,
     flight_search_tool
 ]
 
+# The LLM client, compiled graph and checkpointer are built on first use so
+# that importing this module stays cheap and free of network or disk I/O.
+_llm = None
+_llm_with_tools = None
+_history_manager = None
+_fast_path_router = None
+_tool_scheduler = None
+_app = None
+_lock = threading.Lock()
+
+# Print per-turn prompt tokens before/after history management
+PROMPT_TOKEN_REPORT = os.getenv("PROMPT_TOKEN_REPORT", "0").lower() in ("1", "true", "yes")
+
+
+def get_llm():
+    """Return the chat model, creating the OpenAI client on first use."""
+    global _llm
+    if _llm is None:
+        from langchain_openai import ChatOpenAI
+
+        _llm = ChatOpenAI(
+            model="gpt-3.5-turbo",
+            temperature=0.1,
+            # Token usage is reported on streamed responses too
+            stream_usage=True
+        )
+    return _llm
+
+
+def get_llm_with_tools():
+    """Return the tool-bound LLM."""
+    global _llm_with_tools
+    if _llm_with_tools is None:
+        _llm_with_tools = get_llm().bind_tools(tools=tools)
+    return _llm_with_tools
+
 
-llm_with_tools = llm.bind_tools(tools=tools)
+def get_history_manager():
+    """Return the history manager that keeps prompts under the token budget."""
+    global _history_manager
+    if _history_manager is None:
+        _history_manager = HistoryManager(summarizer=llm_summarizer(get_llm()))
+    return _history_manager
+
+
+def get_fast_path_router():
+    """Return the router that answers simple lookup/payment requests without the LLM."""
+    global _fast_path_router
+    if _fast_path_router is None:
+        _fast_path_router = FastPathRouter(tools={
+            booking_lookup_tool.name: booking_lookup_tool,
+            payment_update_tool.name: payment_update_tool,
+        })
+        register_collector("fast_path", _fast_path_router.stats)
+    return _fast_path_router
+
+
+def get_tool_scheduler():
+    """Return the tool node that runs tool calls with deadlines, retries and hedging."""
+    global _tool_scheduler
+    if _tool_scheduler is None:
+        _tool_scheduler = ToolScheduler(tools)
+        register_collector("tools", _tool_scheduler.stats)
+    return _tool_scheduler
 
 
 # System message to define the agent's role
@@ -47,24 +116,62 @@ You are a helpful travel booking assistant. You can help users with:
 2. 📋 **Look up existing bookings** by booking ID
 3. 🏨 **Create new hotel bookings**
 4. 💳 **Update payment status** for bookings
-5. ❓ **Answer FAQ questions** about hotels and travel
+5. 🛏️ **Check room availability** at a hotel for given dates
+6. 📊 **Report booking analytics** (revenue, unpaid balance, occupancy) per city, hotel or month
+7. ❓ **Answer FAQ questions** about hotels and travel
 
 Always be polite, helpful, and provide clear information. When creating bookings, make sure to collect all necessary details (hotel name, location, dates, price).
+When a request involves several bookings, use the batch tools (lookup_bookings, create_bookings, update_payment_statuses) in a single call instead of one call per booking.
+For totals, revenue, unpaid balances or occupancy, use booking_analytics rather than listing bookings.
+When an FAQ question is about a specific hotel, pass its name as `hotel` to search_hotel_faq.
 """
 
+# How tool results look in each TOOL_OUTPUT_MODE, appended to the system message
+TOOL_RESULT_NOTES = {
+    "compact": "Tool results are compact `key=value` records (paid=yes/no, prices in EUR, dates as YYYY-MM-DD, "
+               "failures as error=...); present them to the user in friendly, readable form rather than repeating "
+               "the raw records.\n",
+    "pretty": "",
+}
+
+
+def system_message() -> str:
+    """The system message for the current tool output mode, which can change at runtime."""
+    return SYSTEM_MESSAGE + TOOL_RESULT_NOTES[output_mode()]
+
 
 def chatbot(state: AgentState):
     """Main agent function to handle user messages and invoke the LLM."""
-    messages = state["messages"]
+    # System prompt + running summary + recent turns, kept under the token budget
+    messages, summary_updates, report = get_history_manager().build_prompt(system_message(), state)
+    if PROMPT_TOKEN_REPORT:
+        print(f"📉 Prompt tokens: {report['tokens_before']} → {report['tokens_after']}")
     
-    if not messages or not isinstance(messages[0], SystemMessage):
-        messages = [
-            SystemMessage(content=SYSTEM_MESSAGE)
-        ] + messages
-    
-    response = llm_with_tools.invoke(messages)
-    print(f"🤖 Assistant: {response.content}")
-    return {"messages": [response]}
+    model = get_llm().model_name
+    started = time.perf_counter()
+    with span("llm", model=model):
+        response = get_llm_with_tools().invoke(messages)
+    get_fast_path_router().record_llm_call((time.perf_counter() - started) * 1000)
+    record_llm_usage(response, model)
+    return {"messages": [response], **summary_updates}
+
+
+async def achatbot(state: AgentState):
+    """Async chatbot used under app.ainvoke/astream, so the event loop is never blocked on the LLM."""
+    # Prompt building may call the summarizer LLM synchronously; keep it off the loop
+    messages, summary_updates, report = await asyncio.to_thread(
+        get_history_manager().build_prompt, system_message(), state
+    )
+    if PROMPT_TOKEN_REPORT:
+        print(f"📉 Prompt tokens: {report['tokens_before']} → {report['tokens_after']}")
+
+    model = get_llm().model_name
+    started = time.perf_counter()
+    with span("llm", model=model):
+        response = await get_llm_with_tools().ainvoke(messages)
+    get_fast_path_router().record_llm_call((time.perf_counter() - started) * 1000)
+    record_llm_usage(response, model)
+    return {"messages": [response], **summary_updates}
 
 
 def should_continue(state: AgentState):
@@ -80,44 +187,92 @@ def should_continue(state: AgentState):
 
 
 
-tool_node = ToolNode(tools=tools)
+def _node(name, func, afunc):
+    """Graph node with sync and async implementations, timed as node_latency_ms{node=name}."""
+    timed = instrumented("node", node=name)
+    return RunnableLambda(timed(func), afunc=timed(afunc), name=name)
+
 
+def build_graph():
+    """Define the state graph for the agent."""
+    # Per-tool timeouts, a turn budget, retries and hedged search calls (see tools/scheduler.py)
+    tool_node = get_tool_scheduler()
+    router = get_fast_path_router()
 
+    graph = StateGraph(AgentState)
+    graph.add_node("fast_path", _node("fast_path", router.__call__, router.acall))
+    graph.add_node("chatbot", _node("chatbot", chatbot, achatbot))
+    graph.add_node("tool_node", _node("tool_node", tool_node.__call__, tool_node.acall))
 
-# Define the state graph for the agent
-graph = StateGraph(AgentState)
-graph.add_node("chatbot", chatbot)
-graph.add_node("tool_node", tool_node)
+    # Simple structured requests are answered before the LLM is involved
+    graph.add_edge(START, "fast_path")
+    graph.add_conditional_edges(
+        "fast_path",
+        router.route,
+        {
+            "answered": END,
+            "chatbot": "chatbot"
+        })
 
-graph.add_edge(START, "chatbot")
+    graph.add_conditional_edges(
+        "chatbot",
+        should_continue,
+        {
+            "tool_node": "tool_node",
+            END: END
+        })
 
-graph.add_conditional_edges(
-    "chatbot",
-    should_continue,
-    {
-        "tool_node": "tool_node",
-        END: END
-    })
+    graph.add_edge("tool_node", "chatbot")
+    return graph
 
 
-graph.add_edge("tool_node", "chatbot")
+def get_app():
+    """Return the compiled agent, compiling the graph on first use."""
+    global _app
+    if _app is None:
+        with _lock:
+            if _app is None:
+                from persistence.checkpointer import make_checkpointer
 
+                # Durable, retention-bounded checkpoints (CHECKPOINT_URL, default ./checkpoints.db)
+                _app = build_graph().compile(checkpointer=make_checkpointer())
+    return _app
 
-app = graph.compile(checkpointer=memory)
+
+def __getattr__(name):
+    # `from main import app` compiles the graph lazily
+    if name == "app":
+        return get_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # Graph visualization
-def visualize_graph():
-    """Visualize the state graph using Mermaid."""
-    display(
-        Image(
-            app.get_graph().draw_mermaid_png(
-            draw_method=MermaidDrawMethod.API
-         )
-        )
+def visualize_graph(output_path=None):
+    """Visualize the state graph using Mermaid (network call to the Mermaid API)."""
+    from langchain_core.runnables.graph import MermaidDrawMethod
+
+    png = get_app().get_graph().draw_mermaid_png(
+        draw_method=MermaidDrawMethod.API
     )
+    if output_path:
+        with open(output_path, "wb") as f:
+            f.write(png)
+        print(f"🖼️ Graph written to {output_path}")
+        return
+
+    from IPython.display import Image, display
+    display(Image(png))
 
-visualize_graph()    
+
+def warmup():
+    """Eagerly build everything that is otherwise created on first use."""
+    from database.database import init_db
+    from tools.faq_tool import initialize_index
+
+    init_db()
+    initialize_index()
+    get_llm_with_tools()
+    get_app()
 
 
 def run_agent():
@@ -133,6 +288,8 @@ def run_agent():
         }
     }
     
+    app = get_app()
+
     while True:
         try:
             user_input = input("You: ").strip()
@@ -148,11 +305,14 @@ def run_agent():
             # Create message with system context
             user_message = HumanMessage(content=user_input)
             
-            # Get response from agent
-            response = app.invoke(
-                {"messages": [user_message]},
-                config=config
-            )
+            # Get response from agent (with METRICS_TRACE=1, print where the time went)
+            with trace("turn") as root:
+                response = app.invoke(
+                    {"messages": [user_message]},
+                    config=config
+                )
+            if root is not None:
+                print(format_trace(root))
             
             # Extract the assistant's response
             assistant_message = response["messages"][-1].content
@@ -165,5 +325,107 @@ def run_agent():
             print(f"❌ An error occurred: {str(e)}")
             print("Please try again or type 'bye' to exit.\n")
 
+
+async def arun_agent():
+    """Conversation loop that streams tokens and tool activity as they happen."""
+    from streaming.events import stream_turn
+
+    print("🌍 Travel Booking Assistant Online! 🌍")
+    print("I can help you search for travel info, manage bookings, and answer questions.")
+    print("Type 'bye', 'exit', or 'quit' to end the conversation.\n")
+
+    config = {
+        "configurable": {
+            "thread_id": "travel_session_1"
+        }
+    }
+
+    app = get_app()
+
+    while True:
+        try:
+            user_input = (await asyncio.to_thread(input, "You: ")).strip()
+
+            if user_input.lower() in ['bye', 'exit', 'quit']:
+                print("👋 Thanks for using Travel Booking Assistant! Have a great trip!")
+                break
+
+            if not user_input:
+                print("Please enter a message or type 'bye' to exit.")
+                continue
+
+            at_line_start = True
+            async for event in stream_turn(app, user_input, config):
+                if event["type"] == "token":
+                    if at_line_start:
+                        print("🤖 Assistant: ", end="", flush=True)
+                        at_line_start = False
+                    print(event["content"], end="", flush=True)
+                elif event["type"] == "tool_start":
+                    if not at_line_start:
+                        print()
+                        at_line_start = True
+                    print(f"🔧 {event['name']}...", flush=True)
+                elif event["type"] == "done":
+                    print("\n")
+
+        except (KeyboardInterrupt, EOFError):
+            print("\n👋 Goodbye!")
+            break
+        except Exception as e:
+            print(f"❌ An error occurred: {str(e)}")
+            print("Please try again or type 'bye' to exit.\n")
+
+def main():
+    parser = argparse.ArgumentParser(description="Travel booking assistant")
+    parser.add_argument(
+        "command", nargs="?", default="chat",
+        choices=["chat", "serve", "init-db", "rebuild-rollups", "build-index", "ingest-faq", "visualize", "warmup"],
+        help="chat (default), serve, init-db, rebuild-rollups, build-index, ingest-faq, visualize or warmup"
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address for the serve command")
+    parser.add_argument("--port", type=int, default=8080, help="Port for the serve command")
+    parser.add_argument("--output", help="PNG path for the visualize command")
+    parser.add_argument("--warm", action="store_true", help="Warm up all components before chatting")
+    parser.add_argument("--stream", action="store_true", help="Stream tokens and tool activity while chatting")
+    args = parser.parse_args()
+
+    if args.command == "init-db":
+        from database.database import init_db
+        init_db()
+        print("✅ Database initialized.")
+    elif args.command == "rebuild-rollups":
+        from database.database import session_scope
+        from database.rollups import rebuild
+        with session_scope(write=True) as session:
+            report = rebuild(session)
+        print(f"✅ Rebuilt booking rollups from {report['bookings']} bookings "
+              f"({report['hotel_rows']} hotel-month and {report['city_rows']} city-month rows).")
+    elif args.command == "build-index":
+        from tools.faq_tool import _initialize_vectorstore
+        _initialize_vectorstore()
+    elif args.command == "ingest-faq":
+        from rag.ingest import ingest_directory
+        report = ingest_directory()
+        print(f"✅ Ingested {report['properties']} properties, {report['pages']} pages "
+              f"({report['pages_per_sec']:.1f} pages/sec).")
+    elif args.command == "visualize":
+        visualize_graph(args.output)
+    elif args.command == "warmup":
+        warmup()
+    elif args.command == "serve":
+        from server.server import serve
+        if args.warm:
+            warmup()
+        serve(get_app(), args.host, args.port, fast_path=get_fast_path_router(), tools=get_tool_scheduler())
+    else:
+        if args.warm:
+            warmup()
+        if args.stream:
+            asyncio.run(arun_agent())
+        else:
+            run_agent()
+
+
 if __name__ == "__main__":
-    run_agent()
\ No newline at end of file
+    main()
\ No newline at end of file
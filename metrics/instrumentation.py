@@ -0,0 +1,363 @@
+"""
+Latency, token and cache instrumentation for the agent.
+
+Records per-node, per-tool, LLM, embedding and DB query latency histograms,
+LLM token counters and cache gauges, and exports them as Prometheus text or
+JSON. With tracing on, each request also gets a span tree that can be dumped.
+
+Everything is off unless METRICS_ENABLED is set (or `enable()` is called);
+disabled, every hook is a single flag check. Span trees additionally need
+METRICS_TRACE=1.
+
+Usage:
+    with span("node", node="chatbot"):
+        ...
+    with trace("turn", session="abc") as root:
+        app.invoke(...)
+    print(format_trace(root))
+"""
+import bisect
+import contextvars
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "0").lower() in ("1", "true", "yes")
+METRICS_TRACE = os.getenv("METRICS_TRACE", "0").lower() in ("1", "true", "yes")
+METRICS_PREFIX = os.getenv("METRICS_PREFIX", "agent_")
+METRICS_TRACE_HISTORY = int(os.getenv("METRICS_TRACE_HISTORY", "100"))
+
+# Latency bucket upper bounds in milliseconds
+BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+_enabled = METRICS_ENABLED
+_tracing = METRICS_ENABLED and METRICS_TRACE
+
+
+def enable(trace: bool = False) -> None:
+    """Turn metrics (and optionally span tracing) on at runtime."""
+    global _enabled, _tracing
+    _enabled = True
+    _tracing = trace
+
+
+def disable() -> None:
+    global _enabled, _tracing
+    _enabled = False
+    _tracing = False
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+class Histogram:
+    """Cumulative-bucket histogram, as Prometheus expects."""
+
+    def __init__(self, buckets=BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def percentile(self, p: float) -> float:
+        """Upper bound of the bucket holding the p-th percentile."""
+        if not self.count:
+            return 0.0
+        rank = p / 100 * self.count
+        seen = 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class Registry:
+    """Thread-safe store of counters, histograms and gauge collectors."""
+
+    def __init__(self):
+        self.counters = defaultdict(float)
+        self.histograms = {}
+        self.collectors = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name: str, labels: dict):
+        return name, tuple(sorted(labels.items()))
+
+    def inc(self, name: str, amount: float = 1, **labels) -> None:
+        key = self._key(name, labels)
+        with self._lock:
+            self.counters[key] += amount
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def register_collector(self, name: str, collect) -> None:
+        """Register `collect()` -> dict of numbers, exported as `<name>_<key>` gauges."""
+        self.collectors[name] = collect
+
+    def gauges(self) -> dict:
+        values = {}
+        for name, collect in list(self.collectors.items()):
+            try:
+                stats = collect()
+            except Exception:
+                continue
+            _flatten(name, stats, values)
+        return values
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def to_json(self) -> dict:
+        with self._lock:
+            counters = [{"name": n, "labels": dict(l), "value": v} for (n, l), v in self.counters.items()]
+            histograms = [{
+                "name": n, "labels": dict(l), "count": h.count, "sum_ms": h.total,
+                "avg_ms": h.total / h.count if h.count else 0.0,
+                "p50_ms": h.percentile(50), "p95_ms": h.percentile(95), "p99_ms": h.percentile(99),
+            } for (n, l), h in self.histograms.items()]
+        return {"counters": counters, "histograms": histograms, "gauges": self.gauges()}
+
+    def to_prometheus(self, prefix: str = METRICS_PREFIX) -> str:
+        lines = []
+        with self._lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted(self.histograms.items(), key=lambda item: item[0])
+
+        declared = set()
+        for (name, labels), value in counters:
+            metric = prefix + name
+            if metric not in declared:
+                lines.append(f"# TYPE {metric} counter")
+                declared.add(metric)
+            lines.append(f"{metric}{_labels(labels)} {_number(value)}")
+
+        for (name, labels), histogram in histograms:
+            metric = prefix + name
+            if metric not in declared:
+                lines.append(f"# TYPE {metric} histogram")
+                declared.add(metric)
+            cumulative = 0
+            for bound, n in zip(histogram.buckets, histogram.counts):
+                cumulative += n
+                lines.append(f"{metric}_bucket{_labels(labels + (('le', _number(bound)),))} {cumulative}")
+            lines.append(f"{metric}_bucket{_labels(labels + (('le', '+Inf'),))} {histogram.count}")
+            lines.append(f"{metric}_sum{_labels(labels)} {_number(histogram.total)}")
+            lines.append(f"{metric}_count{_labels(labels)} {histogram.count}")
+
+        for name, value in sorted(self.gauges().items()):
+            metric = prefix + name
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _flatten(prefix: str, stats, out: dict) -> None:
+    if isinstance(stats, bool):
+        out[prefix] = int(stats)
+    elif isinstance(stats, (int, float)):
+        out[prefix] = stats
+    elif isinstance(stats, dict):
+        for key, value in stats.items():
+            _flatten(f"{prefix}_{key}", value, out)
+
+
+def _labels(labels) -> str:
+    if not labels:
+        return ""
+    def escape(value) -> str:
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{escape(v)}"' for k, v in labels) + "}"
+
+
+def _number(value) -> str:
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+registry = Registry()
+_recent_traces = deque(maxlen=METRICS_TRACE_HISTORY)
+_current_span = contextvars.ContextVar("metrics_current_span", default=None)
+
+
+class Span:
+    """One timed operation in a request's trace tree."""
+
+    __slots__ = ("name", "labels", "start", "duration_ms", "children")
+
+    def __init__(self, name: str, labels: dict):
+        self.name = name
+        self.labels = labels
+        self.start = time.perf_counter()
+        self.duration_ms = None
+        self.children = []
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "labels": self.labels,
+            "duration_ms": self.duration_ms,
+            "children": [child.to_dict() for child in self.children],
+        }
+
+
+class _NullSpan:
+    # Yielded when metrics are off; label writes go to a per-span dict nobody reads
+    __slots__ = ("labels",)
+
+    def __init__(self):
+        self.labels = {}
+
+
+@contextmanager
+def span(kind: str, **labels):
+    """
+    Time a block as `<kind>_latency_ms{labels}`, adding it to the current
+    trace if one is active. Labels set on the yielded span before the block
+    ends (e.g. `status`) are included.
+    """
+    if not _enabled:
+        yield _NullSpan()
+        return
+
+    current = Span(kind, labels)
+    parent = _current_span.get() if _tracing else None
+    token = _current_span.set(current) if parent is not None else None
+    try:
+        yield current
+    finally:
+        current.duration_ms = (time.perf_counter() - current.start) * 1000
+        if token is not None:
+            _current_span.reset(token)
+            parent.children.append(current)
+        registry.observe(f"{kind}_latency_ms", current.duration_ms, **current.labels)
+
+
+@contextmanager
+def trace(name: str, **labels):
+    """Start a span tree for one request; yields the root span (or None when tracing is off)."""
+    if not _tracing:
+        yield None
+        return
+
+    root = Span(name, labels)
+    token = _current_span.set(root)
+    try:
+        yield root
+    finally:
+        root.duration_ms = (time.perf_counter() - root.start) * 1000
+        _current_span.reset(token)
+        _recent_traces.append(root)
+
+
+def recent_traces(limit: int = 20) -> list:
+    return [root.to_dict() for root in list(_recent_traces)[-limit:]]
+
+
+def format_trace(root: Span, indent: str = "") -> str:
+    """Render a span tree as indented text."""
+    if root is None:
+        return ""
+    parts = [root.name] + [f"{k}={v}" for k, v in root.labels.items()] + [f"{root.duration_ms or 0:.1f} ms"]
+    lines = [indent + " ".join(parts)]
+    for child in root.children:
+        lines.append(format_trace(child, indent + "  "))
+    return "\n".join(lines)
+
+
+def instrumented(kind: str, **labels):
+    """Decorator timing a sync or async function with `span(kind, **labels)`."""
+    def decorate(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def awrapper(*args, **kwargs):
+                if not _enabled:
+                    return await func(*args, **kwargs)
+                with span(kind, **labels):
+                    return await func(*args, **kwargs)
+            return awrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with span(kind, **labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def inc(name: str, amount: float = 1, **labels) -> None:
+    if _enabled:
+        registry.inc(name, amount, **labels)
+
+
+def observe(name: str, value: float, **labels) -> None:
+    if _enabled:
+        registry.observe(name, value, **labels)
+
+
+def record_llm_usage(response, model: str, purpose: str = "chat") -> None:
+    """Count prompt/completion tokens from a chat model response's usage metadata."""
+    if not _enabled:
+        return
+    usage = getattr(response, "usage_metadata", None) or {}
+    if usage:
+        registry.inc("llm_prompt_tokens_total", usage.get("input_tokens", 0), model=model, purpose=purpose)
+        registry.inc("llm_completion_tokens_total", usage.get("output_tokens", 0), model=model, purpose=purpose)
+    registry.inc("llm_calls_total", model=model, purpose=purpose)
+
+
+def instrument_engine(sync_engine) -> None:
+    """Time every SQL statement on `sync_engine` as `db_query_latency_ms{op=...}`."""
+    from sqlalchemy import event
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if _enabled:
+            conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("metrics_query_start")
+        if not starts:
+            return
+        elapsed_ms = (time.perf_counter() - starts.pop()) * 1000
+        op = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+        registry.observe("db_query_latency_ms", elapsed_ms, op=op)
+        current = _current_span.get() if _tracing else None
+        if current is not None:
+            child = Span("db_query", {"op": op})
+            child.duration_ms = elapsed_ms
+            current.children.append(child)
+
+
+def register_collector(name: str, collect) -> None:
+    registry.register_collector(name, collect)
+
+
+def export_prometheus() -> str:
+    return registry.to_prometheus()
+
+
+def export_json() -> str:
+    return json.dumps(registry.to_json(), indent=2, default=str)
@@ -0,0 +1,226 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+CHECKPOINT_URL = os.getenv("CHECKPOINT_URL", "sqlite:///checkpoints.db")
+CHECKPOINT_KEEP_LAST = int(os.getenv("CHECKPOINT_KEEP_LAST", "20"))
+CHECKPOINT_IDLE_TTL = float(os.getenv("CHECKPOINT_IDLE_TTL", str(7 * 24 * 3600)))
+CHECKPOINT_COMPACTION_INTERVAL = float(os.getenv("CHECKPOINT_COMPACTION_INTERVAL", "300"))
+
+
+class CompressedSerializer:
+    """
+    Serializer that zlib-compresses payloads of at least `min_size` bytes.
+
+    Compressed payloads are tagged by appending "+z" to the inner serializer's
+    type, so uncompressed checkpoints written earlier still load.
+    """
+
+    def __init__(self, inner=None, level: int = 6, min_size: int = 512):
+        self.inner = inner or JsonPlusSerializer()
+        self.level = level
+        self.min_size = min_size
+
+    def dumps_typed(self, obj):
+        type_, data = self.inner.dumps_typed(obj)
+        if len(data) >= self.min_size:
+            return f"{type_}+z", zlib.compress(data, self.level)
+        return type_, data
+
+    def loads_typed(self, data):
+        type_, payload = data
+        if type_.endswith("+z"):
+            return self.inner.loads_typed((type_[:-2], zlib.decompress(payload)))
+        return self.inner.loads_typed(data)
+
+    def dumps(self, obj):
+        return self.inner.dumps(obj)
+
+    def loads(self, data):
+        return self.inner.loads(data)
+
+
+class CheckpointRetention:
+    """
+    Bounded retention shared by the SQLite and Postgres savers.
+
+    Only the newest `keep_last` checkpoints of each thread are kept and
+    threads idle for longer than `idle_ttl` seconds are dropped. Both happen
+    in the saver's `compact()`, which `start_compaction()` runs periodically
+    on a background thread so the request path only pays for the insert.
+
+    The async checkpoint methods run the sync implementation in a worker
+    thread, so the same saver serves `app.invoke` and `app.ainvoke`.
+    """
+
+    # Database errors a failed compaction run may raise; the next run retries
+    compaction_errors = ()
+
+    def _init_retention(self, keep_last: int, idle_ttl: float) -> None:
+        self.keep_last = keep_last
+        self.idle_ttl = idle_ttl
+        self._compaction_thread = None
+        self._stop = threading.Event()
+
+    def start_compaction(self, interval: float = CHECKPOINT_COMPACTION_INTERVAL) -> None:
+        """Run `compact()` every `interval` seconds on a daemon thread."""
+        if self._compaction_thread is not None:
+            return
+
+        def loop():
+            while not self._stop.wait(interval):
+                try:
+                    self.compact()
+                except self.compaction_errors as e:
+                    print(f"⚠️ Checkpoint compaction failed: {e}")
+
+        self._compaction_thread = threading.Thread(target=loop, name="checkpoint-compaction", daemon=True)
+        self._compaction_thread.start()
+
+    def stop_compaction(self) -> None:
+        self._stop.set()
+        if self._compaction_thread is not None:
+            self._compaction_thread.join()
+            self._compaction_thread = None
+
+    async def aget_tuple(self, config):
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None):
+        items = await asyncio.to_thread(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        for item in items:
+            yield item
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, task_path: str = ""):
+        return await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+
+class RetainingSqliteSaver(CheckpointRetention, SqliteSaver):
+    """SQLite checkpointer with bounded retention (see `CheckpointRetention`)."""
+
+    compaction_errors = (sqlite3.Error,)
+
+    def __init__(self, conn, serde=None, keep_last: int = CHECKPOINT_KEEP_LAST,
+                 idle_ttl: float = CHECKPOINT_IDLE_TTL):
+        super().__init__(conn, serde=serde or CompressedSerializer())
+        self._init_retention(keep_last, idle_ttl)
+
+    @classmethod
+    def from_path(cls, path: str, **kwargs):
+        conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        # Must precede table creation to take effect on a new database
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA cache_size=-8000")
+        return cls(conn, **kwargs)
+
+    def setup(self) -> None:
+        if self.is_setup:
+            return
+        super().setup()
+        with self.lock:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS thread_activity (thread_id TEXT PRIMARY KEY, last_seen REAL NOT NULL)"
+            )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS ix_thread_activity_last_seen ON thread_activity (last_seen)")
+            self.conn.commit()
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        next_config = super().put(config, checkpoint, metadata, new_versions)
+        with self.cursor() as cur:
+            cur.execute(
+                "INSERT OR REPLACE INTO thread_activity (thread_id, last_seen) VALUES (?, ?)",
+                (str(config["configurable"]["thread_id"]), time.time()),
+            )
+        return next_config
+
+    def prune(self, keep_last: int = None) -> int:
+        """Delete all but the newest `keep_last` checkpoints of every thread."""
+        keep_last = self.keep_last if keep_last is None else keep_last
+        with self.cursor() as cur:
+            cur.execute(
+                """
+                DELETE FROM checkpoints WHERE rowid IN (
+                    SELECT rowid FROM (
+                        SELECT rowid, ROW_NUMBER() OVER (
+                            PARTITION BY thread_id, checkpoint_ns ORDER BY checkpoint_id DESC
+                        ) AS rn FROM checkpoints
+                    ) WHERE rn > ?
+                )
+                """,
+                (keep_last,),
+            )
+            deleted = cur.rowcount
+            cur.execute(
+                """
+                DELETE FROM writes WHERE NOT EXISTS (
+                    SELECT 1 FROM checkpoints c
+                    WHERE c.thread_id = writes.thread_id
+                      AND c.checkpoint_ns = writes.checkpoint_ns
+                      AND c.checkpoint_id = writes.checkpoint_id
+                )
+                """
+            )
+        return deleted
+
+    def evict_idle(self, idle_ttl: float = None) -> int:
+        """Drop every thread with no checkpoint in the last `idle_ttl` seconds."""
+        idle_ttl = self.idle_ttl if idle_ttl is None else idle_ttl
+        cutoff = time.time() - idle_ttl
+        with self.cursor() as cur:
+            cur.execute("SELECT thread_id FROM thread_activity WHERE last_seen < ?", (cutoff,))
+            thread_ids = [row[0] for row in cur.fetchall()]
+            for thread_id in thread_ids:
+                cur.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,))
+                cur.execute("DELETE FROM writes WHERE thread_id = ?", (thread_id,))
+                cur.execute("DELETE FROM thread_activity WHERE thread_id = ?", (thread_id,))
+        return len(thread_ids)
+
+    def compact(self) -> dict:
+        """Apply retention, then hand freed pages back to the filesystem."""
+        self.setup()
+        evicted = self.evict_idle()
+        pruned = self.prune()
+        with self.lock:
+            self.conn.execute("PRAGMA incremental_vacuum")
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return {"evicted_threads": evicted, "pruned_checkpoints": pruned}
+
+
+def make_checkpointer(url: str = CHECKPOINT_URL):
+    """
+    Build the graph checkpointer from a URL.
+
+    - "memory": in-process MemorySaver (lost on restart, unbounded)
+    - "sqlite:///path.db": RetainingSqliteSaver with background compaction
+    - "postgresql://...": shared RetainingPostgresSaver for multi-worker
+      deployments, with the same retention and compaction as SQLite
+    """
+    if url == "memory":
+        from langgraph.checkpoint.memory import MemorySaver
+        return MemorySaver()
+
+    if url.startswith("postgres"):
+        from psycopg import Connection
+        from psycopg.rows import dict_row
+        from persistence.postgres_saver import RetainingPostgresSaver
+
+        conn = Connection.connect(url, autocommit=True, prepare_threshold=0, row_factory=dict_row)
+        saver = RetainingPostgresSaver(conn)
+    else:
+        path = url.split("sqlite:///", 1)[1] if url.startswith("sqlite:///") else url
+        saver = RetainingSqliteSaver.from_path(path)
+    saver.setup()
+    if CHECKPOINT_COMPACTION_INTERVAL > 0:
+        saver.start_compaction()
+    return saver
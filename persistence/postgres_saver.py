@@ -0,0 +1,105 @@
+"""
+Postgres checkpointer with the retention of RetainingSqliteSaver.
+
+Imported by `make_checkpointer` only for postgresql:// URLs, so psycopg and
+langgraph-checkpoint-postgres stay optional.
+"""
+import time
+
+import psycopg
+from langgraph.checkpoint.postgres import PostgresSaver
+
+from persistence.checkpointer import CHECKPOINT_IDLE_TTL, CHECKPOINT_KEEP_LAST, CompressedSerializer, CheckpointRetention
+
+
+class RetainingPostgresSaver(CheckpointRetention, PostgresSaver):
+    """
+    Postgres checkpointer with the same bounded retention as
+    RetainingSqliteSaver (see `CheckpointRetention`). Every worker may run the
+    compaction; the deletes are idempotent. Space is reclaimed by
+    autovacuum.
+    """
+
+    compaction_errors = (psycopg.Error,)
+
+    def __init__(self, conn, serde=None, keep_last: int = CHECKPOINT_KEEP_LAST,
+                 idle_ttl: float = CHECKPOINT_IDLE_TTL):
+        super().__init__(conn, serde=serde or CompressedSerializer())
+        self._init_retention(keep_last, idle_ttl)
+
+    def setup(self) -> None:
+        super().setup()
+        with self._cursor() as cur:
+            cur.execute(
+                "CREATE TABLE IF NOT EXISTS thread_activity "
+                "(thread_id TEXT PRIMARY KEY, last_seen DOUBLE PRECISION NOT NULL)"
+            )
+            cur.execute("CREATE INDEX IF NOT EXISTS ix_thread_activity_last_seen ON thread_activity (last_seen)")
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        next_config = super().put(config, checkpoint, metadata, new_versions)
+        with self._cursor() as cur:
+            cur.execute(
+                "INSERT INTO thread_activity (thread_id, last_seen) VALUES (%s, %s) "
+                "ON CONFLICT (thread_id) DO UPDATE SET last_seen = EXCLUDED.last_seen",
+                (str(config["configurable"]["thread_id"]), time.time()),
+            )
+        return next_config
+
+    def prune(self, keep_last: int = None) -> int:
+        """Delete all but the newest `keep_last` checkpoints of every thread, and what only they used."""
+        keep_last = self.keep_last if keep_last is None else keep_last
+        with self._cursor() as cur:
+            cur.execute(
+                """
+                DELETE FROM checkpoints c USING (
+                    SELECT thread_id, checkpoint_ns, checkpoint_id, ROW_NUMBER() OVER (
+                        PARTITION BY thread_id, checkpoint_ns ORDER BY checkpoint_id DESC
+                    ) AS rn FROM checkpoints
+                ) old
+                WHERE old.rn > %s AND c.thread_id = old.thread_id
+                  AND c.checkpoint_ns = old.checkpoint_ns AND c.checkpoint_id = old.checkpoint_id
+                """,
+                (keep_last,),
+            )
+            deleted = cur.rowcount
+            cur.execute(
+                """
+                DELETE FROM checkpoint_writes w WHERE NOT EXISTS (
+                    SELECT 1 FROM checkpoints c
+                    WHERE c.thread_id = w.thread_id
+                      AND c.checkpoint_ns = w.checkpoint_ns
+                      AND c.checkpoint_id = w.checkpoint_id
+                )
+                """
+            )
+            # Channel values live in blobs keyed by version; drop those no kept checkpoint points at
+            cur.execute(
+                """
+                DELETE FROM checkpoint_blobs b WHERE NOT EXISTS (
+                    SELECT 1 FROM checkpoints c
+                    WHERE c.thread_id = b.thread_id
+                      AND c.checkpoint_ns = b.checkpoint_ns
+                      AND c.checkpoint -> 'channel_versions' ->> b.channel = b.version
+                )
+                """
+            )
+        return deleted
+
+    def evict_idle(self, idle_ttl: float = None) -> int:
+        """Drop every thread with no checkpoint in the last `idle_ttl` seconds."""
+        idle_ttl = self.idle_ttl if idle_ttl is None else idle_ttl
+        cutoff = time.time() - idle_ttl
+        with self._cursor() as cur:
+            cur.execute("SELECT thread_id FROM thread_activity WHERE last_seen < %s", (cutoff,))
+            thread_ids = [row["thread_id"] for row in cur.fetchall()]
+            if thread_ids:
+                for table in ("checkpoints", "checkpoint_writes", "checkpoint_blobs", "thread_activity"):
+                    cur.execute(f"DELETE FROM {table} WHERE thread_id = ANY(%s)", (thread_ids,))
+        return len(thread_ids)
+
+    def compact(self) -> dict:
+        """Apply retention; `setup()` must have run."""
+        evicted = self.evict_idle()
+        pruned = self.prune()
+        return {"evicted_threads": evicted, "pruned_checkpoints": pruned}
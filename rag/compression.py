@@ -0,0 +1,223 @@
+"""
+Compressed FAISS index backends for the FAQ vectorstore.
+
+The flat index stays the source of truth. Incremental updates, deletes and
+shard merges all work on it. When FAQ_INDEX_BACKEND is not "flat", a
+compressed copy is trained on the flat index's vectors and saved next to it,
+and workers serve queries from that copy instead:
+
+- flat: exact search over float32 vectors (about 12 KB per 3072-d chunk)
+- ivf_flat: inverted lists over k-means cells; a query scans `nprobe` cells
+- ivf_pq: IVF with product-quantized codes (`pq_m` bytes per vector at 8 bits)
+
+FAQ_INDEX_PCA_DIM reduces dimensionality before indexing, and FAQ_INDEX_FP16
+stores flat or IVF-Flat vectors as float16. Corpora too small to train a
+compressed index fall back to the flat layout.
+"""
+import os
+import re
+import threading
+
+FAQ_INDEX_BACKEND = os.getenv("FAQ_INDEX_BACKEND", "flat")
+FAQ_INDEX_PCA_DIM = int(os.getenv("FAQ_INDEX_PCA_DIM", "0"))
+FAQ_INDEX_FP16 = os.getenv("FAQ_INDEX_FP16", "0").lower() in ("1", "true", "yes")
+FAQ_INDEX_NLIST = int(os.getenv("FAQ_INDEX_NLIST", "0"))
+FAQ_INDEX_NPROBE = int(os.getenv("FAQ_INDEX_NPROBE", "8"))
+FAQ_INDEX_PQ_M = int(os.getenv("FAQ_INDEX_PQ_M", "64"))
+FAQ_INDEX_PQ_BITS = int(os.getenv("FAQ_INDEX_PQ_BITS", "8"))
+# Below this many vectors a flat scan is already fast and IVF training is unreliable
+FAQ_INDEX_MIN_VECTORS = int(os.getenv("FAQ_INDEX_MIN_VECTORS", "1000"))
+
+BACKENDS = ("flat", "ivf_flat", "ivf_pq")
+# k-means wants at least this many training points per cell
+MIN_POINTS_PER_CELL = 39
+
+_compress_lock = threading.Lock()
+
+
+class IndexSpec:
+    """
+    Which FAISS layout to serve FAQ queries from.
+
+    Args:
+        backend: "flat", "ivf_flat" or "ivf_pq"
+        pca_dim: Reduce vectors to this many dimensions first (0 = keep all)
+        fp16: Store flat / IVF-Flat vectors as float16
+        nlist: IVF cells (0 = about 4 * sqrt(n), capped by the training set)
+        nprobe: IVF cells scanned per query
+        pq_m: PQ sub-quantizers (code bytes per vector at 8 bits)
+        pq_bits: Bits per PQ sub-quantizer code
+    """
+
+    def __init__(self, backend: str = FAQ_INDEX_BACKEND, pca_dim: int = FAQ_INDEX_PCA_DIM,
+                 fp16: bool = FAQ_INDEX_FP16, nlist: int = FAQ_INDEX_NLIST, nprobe: int = FAQ_INDEX_NPROBE,
+                 pq_m: int = FAQ_INDEX_PQ_M, pq_bits: int = FAQ_INDEX_PQ_BITS):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown FAQ index backend {backend!r}, expected one of {', '.join(BACKENDS)}")
+        self.backend = backend
+        self.pca_dim = pca_dim
+        self.fp16 = fp16
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.pq_m = pq_m
+        self.pq_bits = pq_bits
+
+    @property
+    def exact(self) -> bool:
+        """Whether this spec is the plain float32 flat index itself."""
+        return self.backend == "flat" and not self.pca_dim and not self.fp16
+
+    @property
+    def key(self) -> str:
+        """Stable name for the compressed file; nprobe is a query-time setting and not part of it."""
+        parts = [self.backend]
+        if self.pca_dim:
+            parts.append(f"pca{self.pca_dim}")
+        if self.backend != "flat":
+            parts.append(f"nlist{self.nlist or 'auto'}")
+        if self.backend == "ivf_pq":
+            parts.append(f"pq{self.pq_m}x{self.pq_bits}")
+        elif self.fp16:
+            parts.append("fp16")
+        return "-".join(parts)
+
+    def factory_string(self, dim: int, n: int):
+        """
+        `faiss.index_factory` description for `n` vectors of `dim` dimensions,
+        or None when the corpus is too small to train this layout.
+        """
+        layers = []
+        if self.pca_dim and self.pca_dim < dim:
+            if n < self.pca_dim:
+                return None
+            layers.append(f"PCA{self.pca_dim}")
+            dim = self.pca_dim
+
+        storage = "SQfp16" if self.fp16 else "Flat"
+        if self.backend == "flat":
+            layers.append(storage)
+            return ",".join(layers)
+
+        if n < FAQ_INDEX_MIN_VECTORS:
+            return None
+        nlist = min(self.nlist or int(4 * n ** 0.5), n // MIN_POINTS_PER_CELL)
+        if nlist < 1:
+            return None
+        layers.append(f"IVF{nlist}")
+        if self.backend == "ivf_flat":
+            layers.append(storage)
+        else:
+            if n < 2 ** self.pq_bits:
+                return None
+            # Sub-quantizers must split the dimensions evenly
+            m = max(d for d in range(1, min(self.pq_m, dim) + 1) if dim % d == 0)
+            layers.append(f"PQ{m}x{self.pq_bits}")
+        return ",".join(layers)
+
+
+def add_spec_arguments(parser) -> None:
+    """Command-line flags for an IndexSpec, defaulting to the FAQ_INDEX_* settings."""
+    parser.add_argument("--backend", choices=BACKENDS, default=FAQ_INDEX_BACKEND, help="Serving index layout")
+    parser.add_argument("--pca-dim", type=int, default=FAQ_INDEX_PCA_DIM, help="Reduce vectors to this many dims")
+    parser.add_argument("--fp16", action="store_true", default=FAQ_INDEX_FP16, help="Store vectors as float16")
+    parser.add_argument("--nlist", type=int, default=FAQ_INDEX_NLIST, help="IVF cells (0 = automatic)")
+    parser.add_argument("--nprobe", type=int, default=FAQ_INDEX_NPROBE, help="IVF cells scanned per query")
+    parser.add_argument("--pq-m", type=int, default=FAQ_INDEX_PQ_M, help="PQ sub-quantizers")
+    parser.add_argument("--pq-bits", type=int, default=FAQ_INDEX_PQ_BITS, help="Bits per PQ code")
+
+
+def spec_from_args(args) -> IndexSpec:
+    return IndexSpec(backend=args.backend, pca_dim=args.pca_dim, fp16=args.fp16, nlist=args.nlist,
+                     nprobe=args.nprobe, pq_m=args.pq_m, pq_bits=args.pq_bits)
+
+
+def compressed_file(spec: IndexSpec) -> str:
+    return f"index.{re.sub(r'[^a-z0-9]+', '-', spec.key.lower())}.faiss"
+
+
+def compress_index(flat_index, spec: IndexSpec):
+    """
+    Train and fill a `spec` index from the vectors of a flat index.
+
+    Vectors keep their positions, so the flat store's index_to_docstore_id
+    mapping is valid for the result. Returns None when the corpus is too
+    small for `spec`; callers then keep serving the flat index.
+    """
+    import faiss
+
+    n, dim = flat_index.ntotal, flat_index.d
+    description = spec.factory_string(dim, n)
+    if description is None:
+        return None
+    vectors = flat_index.reconstruct_n(0, n)
+    index = faiss.index_factory(dim, description, faiss.METRIC_L2)
+    index.train(vectors)
+    index.add(vectors)
+    set_nprobe(index, spec.nprobe)
+    return index
+
+
+def set_nprobe(index, nprobe: int) -> None:
+    """Set the IVF cells scanned per query, looking through PCA wrappers; no-op for flat indexes."""
+    import faiss
+
+    try:
+        faiss.extract_index_ivf(index).nprobe = nprobe
+    except RuntimeError:
+        pass
+
+
+def ensure_compressed(index_path: str, spec: IndexSpec):
+    """
+    Path of the `spec` index for the flat index saved at `index_path`,
+    building it if it is missing (e.g. after the backend setting changed).
+
+    Returns None when `spec` is the exact flat index or the corpus is too
+    small to compress.
+    """
+    import faiss
+
+    if spec.exact:
+        return None
+    path = os.path.join(index_path, compressed_file(spec))
+    if os.path.exists(path):
+        return path
+    marker = path + ".skip"
+    if os.path.exists(marker):
+        return None
+
+    with _compress_lock:
+        if os.path.exists(path):
+            return path
+        flat = faiss.read_index(os.path.join(index_path, "index.faiss"))
+        index = compress_index(flat, spec)
+        if index is None:
+            # Remember that this corpus is too small, so workers do not retry on every load
+            open(marker, "w").close()
+            return None
+        tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        faiss.write_index(index, tmp_path)
+        os.replace(tmp_path, path)
+        return path
+
+
+def write_compressed(vectorstore, tmp_path: str, spec: IndexSpec) -> None:
+    """Write the `spec` index for a store being saved into `tmp_path` (see `save_vectorstore`)."""
+    import faiss
+
+    if spec.exact:
+        return
+    path = os.path.join(tmp_path, compressed_file(spec))
+    index = compress_index(vectorstore.index, spec)
+    if index is None:
+        open(path + ".skip", "w").close()
+    else:
+        faiss.write_index(index, path)
+
+
+def index_bytes(index) -> int:
+    """Serialized size of an index, a close proxy for its resident memory."""
+    import faiss
+
+    return int(faiss.serialize_index(index).nbytes)
+
@@ -0,0 +1,209 @@
+"""
+Ingest a directory of FAQ PDFs into per-property FAISS shards.
+
+Each property is either a PDF directly under the root (named after the
+file) or a subdirectory of PDFs (named after the directory). PDFs are parsed
+and chunked in a process pool. Embedding requests are batched and limited
+to FAQ_EMBED_CONCURRENCY at a time across all properties, so parsing of one
+property overlaps embedding of another. Each property's shard is then saved
+under <index dir>/shards with its BM25 index and a manifest.
+
+A shard whose PDFs and chunking are unchanged is skipped. A changed shard
+only embeds chunks it does not already hold, as `load_or_build_vectorstore`
+does for the single FAQ index.
+
+Usage:
+    python -m rag.ingest [--dir ./document] [--workers 4] [--concurrency 4]
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import rag.rag
+from rag.rag import (
+    CHUNK_OVERLAP, CHUNK_SIZE, EMBEDDING_MODEL, INDEX_DIR, _read_manifest, chunk_documents, index_key,
+    load_documents, load_vectorstore, save_vectorstore,
+)
+from rag.compression import IndexSpec, add_spec_arguments, spec_from_args
+from rag.shards import shard_path, slugify
+
+FAQ_DOCUMENT_DIR = os.getenv("FAQ_DOCUMENT_DIR", "./document")
+FAQ_INGEST_WORKERS = int(os.getenv("FAQ_INGEST_WORKERS", str(os.cpu_count() or 2)))
+FAQ_EMBED_BATCH = int(os.getenv("FAQ_EMBED_BATCH", "256"))
+FAQ_EMBED_CONCURRENCY = int(os.getenv("FAQ_EMBED_CONCURRENCY", "4"))
+
+
+def discover(root: str = FAQ_DOCUMENT_DIR) -> dict:
+    """
+    Group the PDFs under `root` by property.
+
+    Returns:
+        dict: property key -> (display name, sorted PDF paths)
+    """
+    properties = {}
+    for dirpath, _, filenames in os.walk(root):
+        for filename in sorted(filenames):
+            if not filename.lower().endswith(".pdf"):
+                continue
+            path = os.path.join(dirpath, filename)
+            parts = os.path.relpath(path, root).split(os.sep)
+            hotel = parts[0] if len(parts) > 1 else os.path.splitext(filename)[0]
+            hotel = hotel.replace("_", " ").replace("-", " ")
+            _, paths = properties.setdefault(slugify(hotel), (hotel, []))
+            paths.append(path)
+    return {name: (hotel, sorted(paths)) for name, (hotel, paths) in sorted(properties.items())}
+
+
+def _parse(path: str, hotel: str, chunk_size: int, chunk_overlap: int):
+    # Runs in a worker process: PDF parsing and splitting are CPU-bound
+    docs = load_documents(path)
+    chunks = chunk_documents(docs, chunk_size, chunk_overlap)
+    for doc in chunks.values():
+        doc.metadata["hotel"] = hotel
+    return len(docs), chunks
+
+
+def _shard_key(paths, model: str) -> str:
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(index_key(path, model).encode("ascii"))
+    return digest.hexdigest()[:32]
+
+
+async def _embed(embeddings, texts, semaphore, batch_size: int = FAQ_EMBED_BATCH) -> list:
+    """Embed `texts` in batches, each holding the shared concurrency semaphore."""
+    async def embed_batch(batch):
+        async with semaphore:
+            return await embeddings.aembed_documents(batch)
+
+    batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+    results = await asyncio.gather(*(embed_batch(batch) for batch in batches))
+    return [vector for batch in results for vector in batch]
+
+
+async def _ingest_property(name, hotel, paths, pool, semaphore, embeddings, model, index_dir, force, spec) -> dict:
+    chunking = {"chunk_size": CHUNK_SIZE, "chunk_overlap": CHUNK_OVERLAP}
+    index_path = shard_path(name, model, index_dir)
+    key = await asyncio.to_thread(_shard_key, paths, model)
+    manifest = {} if force else _read_manifest(index_path)
+    if manifest.get("key") == key and manifest.get("chunking") == chunking:
+        return {"property": name, "pages": 0, "chunks": manifest.get("vectors", 0), "embedded": 0, "skipped": True}
+
+    loop = asyncio.get_running_loop()
+    parsed = await asyncio.gather(*(
+        loop.run_in_executor(pool, _parse, path, hotel, CHUNK_SIZE, CHUNK_OVERLAP) for path in paths
+    ))
+    pages = sum(count for count, _ in parsed)
+    chunks = {}
+    for _, file_chunks in parsed:
+        for cid, doc in file_chunks.items():
+            chunks.setdefault(cid, doc)
+
+    vectorstore = None
+    if manifest:
+        vectorstore = await asyncio.to_thread(load_vectorstore, index_path, embeddings, False)
+        stale = [cid for cid in vectorstore.index_to_docstore_id.values() if cid not in chunks]
+        if stale:
+            vectorstore.delete(ids=stale)
+        stored = set(vectorstore.index_to_docstore_id.values())
+        new = [cid for cid in chunks if cid not in stored]
+    else:
+        new = list(chunks)
+
+    if vectorstore is None and not new:
+        # No extractable text (e.g. a scanned PDF): nothing to serve for this property
+        return {"property": name, "pages": pages, "chunks": 0, "embedded": 0, "skipped": False}
+
+    texts = [chunks[cid].page_content for cid in new]
+    vectors = await _embed(embeddings, texts, semaphore) if texts else []
+    metadatas = [chunks[cid].metadata for cid in new]
+    if vectorstore is None:
+        from langchain_community.vectorstores import FAISS
+
+        vectorstore = FAISS.from_embeddings(list(zip(texts, vectors)), embeddings, metadatas=metadatas, ids=new)
+    elif new:
+        vectorstore.add_embeddings(list(zip(texts, vectors)), metadatas=metadatas, ids=new)
+
+    def save():
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        save_vectorstore(vectorstore, index_path, {
+            "key": key,
+            "property": name,
+            "hotel": hotel,
+            "sources": [os.path.abspath(path) for path in paths],
+            "model": model,
+            "chunking": chunking,
+            "pages": pages,
+            "vectors": vectorstore.index.ntotal,
+        }, spec)
+
+    await asyncio.to_thread(save)
+    return {"property": name, "pages": pages, "chunks": len(chunks), "embedded": len(new), "skipped": False}
+
+
+async def aingest_directory(root: str = FAQ_DOCUMENT_DIR, model: str = EMBEDDING_MODEL, index_dir: str = INDEX_DIR,
+                            workers: int = FAQ_INGEST_WORKERS, concurrency: int = FAQ_EMBED_CONCURRENCY,
+                            force: bool = False, embeddings=None, spec: IndexSpec = None) -> dict:
+    """
+    Build or update the shard of every property under `root`, writing the
+    serving layout in `spec` (FAQ_INDEX_BACKEND by default) next to each.
+
+    Returns:
+        dict: totals (properties, pages, chunks, embedded, seconds,
+        pages_per_sec) and per-property results
+    """
+    started = time.perf_counter()
+    properties = discover(root)
+    embeddings = embeddings or rag.rag.get_embeddings(model)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as pool:
+        results = await asyncio.gather(*(
+            _ingest_property(name, hotel, paths, pool, semaphore, embeddings, model, index_dir, force, spec)
+            for name, (hotel, paths) in properties.items()
+        ))
+
+    seconds = time.perf_counter() - started
+    pages = sum(r["pages"] for r in results)
+    return {
+        "properties": len(results),
+        "skipped": sum(r["skipped"] for r in results),
+        "files": sum(len(paths) for _, paths in properties.values()),
+        "pages": pages,
+        "chunks": sum(r["chunks"] for r in results),
+        "embedded": sum(r["embedded"] for r in results),
+        "seconds": seconds,
+        "pages_per_sec": pages / seconds if seconds else 0.0,
+        "results": results,
+    }
+
+
+def ingest_directory(*args, **kwargs) -> dict:
+    """Sync wrapper around `aingest_directory` for scripts and deploy hooks."""
+    return asyncio.run(aingest_directory(*args, **kwargs))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest a directory of FAQ PDFs into per-property shards.")
+    parser.add_argument("--dir", default=FAQ_DOCUMENT_DIR, help="Directory of FAQ PDFs")
+    parser.add_argument("--model", default=EMBEDDING_MODEL, help="Embedding model name")
+    parser.add_argument("--index-dir", default=INDEX_DIR, help="Directory holding cached indexes")
+    parser.add_argument("--workers", type=int, default=FAQ_INGEST_WORKERS, help="PDF parsing processes")
+    parser.add_argument("--concurrency", type=int, default=FAQ_EMBED_CONCURRENCY,
+                        help="Embedding requests in flight")
+    parser.add_argument("--force", action="store_true", help="Re-embed every chunk from scratch")
+    add_spec_arguments(parser)
+    args = parser.parse_args()
+
+    report = ingest_directory(args.dir, args.model, args.index_dir, args.workers, args.concurrency, args.force,
+                              spec=spec_from_args(args))
+    print(f"Ingested {report['properties']} properties ({report['skipped']} unchanged), {report['files']} files, "
+          f"{report['pages']} pages, {report['chunks']} chunks ({report['embedded']} embedded) "
+          f"in {report['seconds']:.1f}s: {report['pages_per_sec']:.1f} pages/sec")
+
+
+if __name__ == "__main__":
+    main()
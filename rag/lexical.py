@@ -0,0 +1,157 @@
+import json
+import math
+import os
+import re
+from collections import Counter, defaultdict
+
+LEXICAL_CONFIDENCE = float(os.getenv("FAQ_LEXICAL_CONFIDENCE", "0.8"))
+LEXICAL_MARGIN = float(os.getenv("FAQ_LEXICAL_MARGIN", "1.3"))
+
+STOPWORDS = frozenset("""
+a about am an and any are as at be been but by can could do does did for from get got had has have
+how i if in into is it its me my no not of on or our please should so that the their them there
+these they this to us was we were what when where which who why will with would you your
+""".split())
+
+
+def _normalize(word: str) -> str:
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def tokenize(text: str) -> list:
+    """
+    Lowercased word tokens without stopwords, with plural 's' folded.
+    Hyphenated words also yield their joined form ("wi-fi" -> wi, fi, wifi).
+    """
+    tokens = []
+    for word in re.findall(r"[a-z0-9]+(?:-[a-z0-9]+)*", text.lower()):
+        parts = word.split("-")
+        if len(parts) > 1:
+            tokens.extend(_normalize(part) for part in parts if part not in STOPWORDS)
+            word = "".join(parts)
+        if word not in STOPWORDS:
+            tokens.append(_normalize(word))
+    return tokens
+
+
+class BM25Index:
+    """
+    Okapi BM25 inverted index over the FAQ chunks, keyed by chunk ID.
+
+    Small enough to rebuild from the docstore in milliseconds, and persisted
+    next to the FAISS index so workers load it with the vectors.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.ids = []
+        self.doc_lengths = []
+        self.postings = {}
+        self.avg_length = 0.0
+
+    @classmethod
+    def from_texts(cls, texts: dict, k1: float = 1.5, b: float = 0.75) -> "BM25Index":
+        """Build from a mapping of chunk ID -> text."""
+        index = cls(k1, b)
+        postings = defaultdict(list)
+        for position, (cid, text) in enumerate(texts.items()):
+            counts = Counter(tokenize(text))
+            index.ids.append(cid)
+            index.doc_lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                postings[term].append((position, tf))
+        index.postings = dict(postings)
+        index.avg_length = sum(index.doc_lengths) / len(index.doc_lengths) if index.doc_lengths else 0.0
+        return index
+
+    @classmethod
+    def from_vectorstore(cls, vectorstore) -> "BM25Index":
+        """Build from the chunks stored in a FAISS vectorstore."""
+        texts = {}
+        for cid in vectorstore.index_to_docstore_id.values():
+            doc = vectorstore.docstore.search(cid)
+            if doc is not None and not isinstance(doc, str):
+                texts[cid] = doc.page_content
+        return cls.from_texts(texts)
+
+    def idf(self, term: str) -> float:
+        df = len(self.postings.get(term, ()))
+        n = len(self.ids)
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, k: int = 10) -> list:
+        """Return up to k (chunk ID, score) pairs, best first."""
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            idf = self.idf(term)
+            for position, tf in self.postings.get(term, ()):
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[position] / (self.avg_length or 1))
+                scores[position] += idf * tf * (self.k1 + 1) / (tf + norm)
+        best = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [(self.ids[position], score) for position, score in best]
+
+    def reference_score(self, query: str) -> float:
+        """Score of an average-length chunk containing every query term once."""
+        return sum(self.idf(term) for term in set(tokenize(query)))
+
+    def confident(self, query: str, hits: list, threshold: float = LEXICAL_CONFIDENCE,
+                  margin: float = LEXICAL_MARGIN) -> bool:
+        """
+        Whether the top lexical hit is good enough to answer without embeddings:
+        it must reach `threshold` of `reference_score` (so most of the query's
+        term weight, including unknown terms, is matched) and beat the
+        runner-up by `margin`.
+        """
+        if not hits:
+            return False
+        reference = self.reference_score(query)
+        if reference <= 0:
+            return False
+        top = hits[0][1]
+        runner_up = hits[1][1] if len(hits) > 1 else 0.0
+        return top / reference >= threshold and (runner_up == 0 or top / runner_up >= margin)
+
+    def to_dict(self) -> dict:
+        return {
+            "k1": self.k1, "b": self.b, "ids": self.ids, "doc_lengths": self.doc_lengths,
+            "postings": self.postings,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "BM25Index":
+        index = cls(data["k1"], data["b"])
+        index.ids = data["ids"]
+        index.doc_lengths = data["doc_lengths"]
+        index.postings = {term: [tuple(p) for p in plist] for term, plist in data["postings"].items()}
+        index.avg_length = sum(index.doc_lengths) / len(index.doc_lengths) if index.doc_lengths else 0.0
+        return index
+
+    def save(self, path: str) -> None:
+        """Write atomically, so readers never see a partial file."""
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "BM25Index":
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+def reciprocal_rank_fusion(rankings, k: int = 60, limit: int = None) -> list:
+    """
+    Fuse ranked lists of IDs: score(d) = sum over lists of 1 / (k + rank).
+
+    Returns:
+        list: (ID, fused score) pairs, best first
+    """
+    scores = defaultdict(float)
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, 1):
+            scores[item] += 1.0 / (k + rank)
+    fused = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    return fused[:limit] if limit else fused
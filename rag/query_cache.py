@@ -0,0 +1,130 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+
+
+def normalize_query(query: str) -> str:
+    """Lower-case, collapse whitespace and drop trailing punctuation."""
+    return re.sub(r"\s+", " ", query).strip().lower().rstrip("?!. ")
+
+
+class LRUCache:
+    """Bounded, thread-safe LRU cache whose entries expire after `ttl` seconds."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+class SemanticCache:
+    """
+    Result cache keyed by query embedding.
+
+    A lookup hits when a cached query embedding has cosine similarity of at
+    least `threshold` with the new one; the oldest entry is evicted once
+    `maxsize` is reached and entries expire after `ttl` seconds.
+    """
+
+    def __init__(self, maxsize: int = 512, threshold: float = 0.95, ttl: float = 3600.0):
+        self.maxsize = maxsize
+        self.threshold = threshold
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._vectors = None
+        self._expires = []
+        self._results = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _unit(vector):
+        import numpy as np
+
+        v = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(v)
+        return v / norm if norm else v
+
+    def lookup(self, vector):
+        """Return the cached result for the nearest query above threshold, or None."""
+        import numpy as np
+
+        v = self._unit(vector)
+        with self._lock:
+            if self._vectors is not None and len(self._results):
+                # Expired entries never match, so an expired nearest neighbour cannot hide a live one
+                live = np.array(self._expires) > time.monotonic()
+                scores = np.where(live, self._vectors @ v, -np.inf)
+                best = int(np.argmax(scores))
+                if scores[best] >= self.threshold:
+                    self.hits += 1
+                    return self._results[best]
+            self.misses += 1
+            return None
+
+    def add(self, vector, result) -> None:
+        import numpy as np
+
+        v = self._unit(vector)[None, :]
+        with self._lock:
+            now = time.monotonic()
+            keep = [i for i, expires in enumerate(self._expires) if expires > now]
+            keep = keep[-(self.maxsize - 1):] if self.maxsize > 1 else []
+            if self._vectors is not None and keep:
+                self._vectors = np.vstack([self._vectors[keep], v])
+            else:
+                self._vectors = v
+            self._expires = [self._expires[i] for i in keep] + [now + self.ttl]
+            self._results = [self._results[i] for i in keep] + [result]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._vectors = None
+            self._expires = []
+            self._results = []
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._results),
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
@@ -1,18 +1,329 @@
-from langchain_openai import OpenAIEmbeddings
-from langchain_community.vectorstores import FAISS
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import threading
+import time
+
 from dotenv import load_dotenv
-from langchain_community.document_loaders import PyPDFLoader
+from rag.compression import (
+    IndexSpec, add_spec_arguments, ensure_compressed, set_nprobe, spec_from_args, write_compressed,
+)
+from rag.lexical import BM25Index
 
 load_dotenv()
 
 file_path = "./document/hotel_faq_document.pdf"
+EMBEDDING_MODEL = "text-embedding-3-large"
+INDEX_DIR = os.getenv("FAQ_INDEX_DIR", "./.faq_index")
+CHUNK_SIZE = int(os.getenv("FAQ_CHUNK_SIZE", "800"))
+CHUNK_OVERLAP = int(os.getenv("FAQ_CHUNK_OVERLAP", "100"))
+# Published index versions kept on disk: the live one plus the one it replaced,
+# which workers that resolved the link just before a swap may still be reading
+FAQ_INDEX_KEEP_VERSIONS = int(os.getenv("FAQ_INDEX_KEEP_VERSIONS", "2"))
+VERSION_SEP = ".v-"
+
+_build_lock = threading.Lock()
+
+
+def index_key(path: str = file_path, model: str = EMBEDDING_MODEL) -> str:
+    """Hash the PDF bytes together with the embedding model name."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    digest.update(b"\0" + model.encode("utf-8"))
+    return digest.hexdigest()[:32]
+
+
+def get_embeddings(model: str = EMBEDDING_MODEL):
+    """Create the embeddings client used to build and query the FAQ index."""
+    from langchain_openai import OpenAIEmbeddings
+
+    return OpenAIEmbeddings(model=model, chunk_size=1000)
+
+
+def load_documents(path: str = file_path):
+    """Parse the FAQ PDF into one document per page."""
+    from langchain_community.document_loaders import PyPDFLoader
+
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"PDF file not found at {path}")
+
+    docs = PyPDFLoader(path).load()
+    print(f"Loaded {len(docs)} documents.")
+    return docs
+
+
+def chunk_id(text: str) -> str:
+    """Stable chunk ID derived from the chunk text, so unchanged chunks keep their vectors."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:24]
+
+
+def chunk_documents(docs, chunk_size: int = CHUNK_SIZE, chunk_overlap: int = CHUNK_OVERLAP):
+    """
+    Split page documents into retrieval-sized chunks keyed by content hash.
+
+    Chunks are split per page, so an edit only changes the chunks of the pages
+    it touches. Identical chunks (e.g. repeated headers) are kept once.
+
+    Returns:
+        dict: chunk ID -> Document, in document order
+    """
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    chunks = {}
+    for doc in splitter.split_documents(docs):
+        text = doc.page_content.strip()
+        if not text:
+            continue
+        cid = chunk_id(text)
+        if cid not in chunks:
+            doc.page_content = text
+            doc.metadata["chunk_id"] = cid
+            chunks[cid] = doc
+    return chunks
+
+
+def build_vectorstore(path: str = file_path, embeddings=None):
+    """Embed the chunked FAQ PDF into a fresh in-memory FAISS store."""
+    from langchain_community.vectorstores import FAISS
+
+    chunks = chunk_documents(load_documents(path))
+    return FAISS.from_documents(list(chunks.values()), embeddings or get_embeddings(),
+                                ids=list(chunks.keys()))
+
+
+def update_vectorstore(vectorstore, path: str = file_path):
+    """
+    Bring an existing store in line with the current PDF contents.
+
+    Only chunks that are new since the last build are embedded; chunks that
+    no longer appear in the document are deleted from the FAISS index.
+
+    Returns:
+        tuple: (number of chunks added, number of chunks removed)
+    """
+    chunks = chunk_documents(load_documents(path))
+    stored = set(vectorstore.index_to_docstore_id.values())
+
+    stale = [cid for cid in stored if cid not in chunks]
+    added = [cid for cid in chunks if cid not in stored]
+
+    if stale:
+        vectorstore.delete(ids=stale)
+    if added:
+        vectorstore.add_documents([chunks[cid] for cid in added], ids=added)
+    return len(added), len(stale)
+
+
+def _version_stamp(path: str) -> int:
+    try:
+        return int(path.rsplit(VERSION_SEP, 1)[1].split("-", 1)[0])
+    except (IndexError, ValueError):
+        return 0
+
+
+def _prune_versions(index_path: str, keep: int = FAQ_INDEX_KEEP_VERSIONS) -> None:
+    """Delete all but the newest `keep` versions of `index_path`, never the live one."""
+    parent, name = os.path.split(os.path.abspath(index_path))
+    try:
+        live = os.path.basename(os.readlink(index_path))
+        entries = os.listdir(parent)
+    except OSError:
+        return
+    versions = sorted((e for e in entries if e.startswith(name + VERSION_SEP)), key=_version_stamp, reverse=True)
+    for entry in versions[max(1, keep):]:
+        if entry != live:
+            shutil.rmtree(os.path.join(parent, entry), ignore_errors=True)
+
+
+def _publish(tmp_path: str, index_path: str) -> None:
+    """
+    Make the finished directory `tmp_path` the live index at `index_path`.
+
+    `index_path` is a symlink to a versioned sibling directory. The new
+    version is renamed into place under its own name, then the link is
+    swapped with a single rename, so readers see either the old index or the
+    new one and never a missing one. Older versions are pruned only after
+    the swap.
+    """
+    suffix = f"{os.getpid()}-{threading.get_ident()}"
+    version = f"{index_path}{VERSION_SEP}{time.time_ns()}-{suffix}"
+    os.rename(tmp_path, version)
+    link = f"{index_path}.link-{suffix}"
+    if os.path.lexists(link):
+        os.remove(link)
+    os.symlink(os.path.basename(version), link)
+    if os.path.isdir(index_path) and not os.path.islink(index_path):
+        # Indexes saved before versioning are plain directories: move it aside once
+        try:
+            os.rename(index_path, f"{index_path}{VERSION_SEP}0-{suffix}")
+        except OSError:
+            pass
+    os.replace(link, index_path)
+    _prune_versions(index_path)
+
+
+def save_vectorstore(vectorstore, index_path: str, manifest: dict, spec: IndexSpec = None) -> None:
+    """
+    Write the FAISS index, docstore, BM25 index and manifest as a new
+    version of `index_path`, plus the compressed copy for `spec`
+    (FAQ_INDEX_BACKEND by default, see rag/compression.py). The manifest
+    records which serving layout was written.
+
+    Files are written to a temporary sibling directory that is then published
+    with an atomic symlink swap (see `_publish`), so concurrent workers never
+    observe a half-written or missing index. Each version directory matches
+    the `FAISS.save_local` layout and can be read back with `load_local`.
+    """
+    import faiss
+
+    tmp_path = f"{index_path}.tmp-{os.getpid()}-{threading.get_ident()}"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    faiss.write_index(vectorstore.index, os.path.join(tmp_path, "index.faiss"))
+    spec = spec or IndexSpec()
+    write_compressed(vectorstore, tmp_path, spec)
+    manifest = {**manifest, "serving_index": spec.key, "nprobe": spec.nprobe}
+    with open(os.path.join(tmp_path, "index.pkl"), "wb") as f:
+        pickle.dump((vectorstore.docstore, vectorstore.index_to_docstore_id), f)
+    BM25Index.from_vectorstore(vectorstore).save(os.path.join(tmp_path, "lexical.json"))
+    with open(os.path.join(tmp_path, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    try:
+        _publish(tmp_path, index_path)
+    except BaseException:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+
+
+def load_vectorstore(index_path: str, embeddings=None, mmap: bool = True, spec: IndexSpec = None):
+    """
+    Load a saved FAISS store, memory-mapping the index when supported.
+
+    With a non-flat `spec` the store serves from the compressed copy of the
+    index (built on first use if missing) and can no longer be updated;
+    without one it loads the flat index that updates are applied to.
+    """
+    import faiss
+    from langchain_community.vectorstores import FAISS
+
+    # Resolve the published version once, so every file comes from the same one
+    index_path = os.path.realpath(index_path)
+    compressed = ensure_compressed(index_path, spec) if spec is not None else None
+    faiss_file = compressed or os.path.join(index_path, "index.faiss")
+    index = None
+    if mmap:
+        try:
+            index = faiss.read_index(faiss_file, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+        except (AttributeError, RuntimeError):
+            # Older FAISS builds can only mmap inverted lists, not flat codes.
+            index = None
+    if index is None:
+        index = faiss.read_index(faiss_file)
+    if compressed:
+        set_nprobe(index, spec.nprobe)
+
+    with open(os.path.join(index_path, "index.pkl"), "rb") as f:
+        docstore, index_to_docstore_id = pickle.load(f)
+
+    return FAISS(embeddings or get_embeddings(), index, docstore, index_to_docstore_id)
+
+
+def load_lexical_index(vectorstore, index_path: str) -> BM25Index:
+    """Load the BM25 index saved with the vectors, rebuilding it for indexes that predate it."""
+    lexical_path = os.path.join(index_path, "lexical.json")
+    try:
+        return BM25Index.load(lexical_path)
+    except (OSError, ValueError, KeyError):
+        lexical = BM25Index.from_vectorstore(vectorstore)
+        try:
+            lexical.save(lexical_path)
+        except OSError:
+            pass
+        return lexical
+
+
+def index_path_for(path: str = file_path, model: str = EMBEDDING_MODEL, index_dir: str = INDEX_DIR) -> str:
+    """Directory holding the cached index for one (source, model) pair."""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(index_dir, f"{stem}-{model}")
+
+
+def _read_manifest(index_path: str) -> dict:
+    try:
+        with open(os.path.join(index_path, "manifest.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def load_or_build_vectorstore(path: str = file_path, model: str = EMBEDDING_MODEL,
+                              index_dir: str = INDEX_DIR, force: bool = False, spec: IndexSpec = None):
+    """
+    Return the FAQ vectorstore, embedding only what changed since the last build.
+
+    Each (source, model) pair owns one index directory. When its manifest
+    matches the current PDF hash and chunking settings the index is loaded
+    as-is; otherwise the stored chunks are diffed against the new document
+    and only added chunks are embedded.
+
+    The returned store serves from the index layout in `spec` (FAQ_INDEX_BACKEND
+    by default).
+    """
+    spec = spec or IndexSpec()
+    key = index_key(path, model)
+    chunking = {"chunk_size": CHUNK_SIZE, "chunk_overlap": CHUNK_OVERLAP}
+    index_path = index_path_for(path, model, index_dir)
+    embeddings = get_embeddings(model)
+
+    with _build_lock:
+        manifest = {} if force else _read_manifest(index_path)
+        if manifest.get("key") == key and manifest.get("chunking") == chunking:
+            vectorstore = load_vectorstore(index_path, embeddings, spec=spec)
+            print(f"Loaded cached FAQ index {key} ({vectorstore.index.ntotal} vectors, {spec.key})")
+            return vectorstore
+
+        if manifest:
+            vectorstore = load_vectorstore(index_path, embeddings, mmap=False)
+            added, removed = update_vectorstore(vectorstore, path)
+            print(f"Updated FAQ index {key}: +{added} / -{removed} chunks")
+        else:
+            vectorstore = build_vectorstore(path, embeddings)
+            print(f"Built FAQ index {key} ({vectorstore.index.ntotal} vectors)")
+
+        os.makedirs(index_dir, exist_ok=True)
+        save_vectorstore(vectorstore, index_path, {
+            "key": key,
+            "source": os.path.abspath(path),
+            "model": model,
+            "chunking": chunking,
+            "vectors": vectorstore.index.ntotal,
+        }, spec)
+        if not spec.exact:
+            # Serve from the compressed copy just written, not the flat index used for updates
+            vectorstore = load_vectorstore(index_path, embeddings, spec=spec)
+        return vectorstore
+
+
+def main():
+    """Prebuild the FAQ index at deploy time so workers never embed on startup."""
+    parser = argparse.ArgumentParser(description="Build the cached FAQ FAISS index.")
+    parser.add_argument("--file", default=file_path, help="FAQ PDF to index")
+    parser.add_argument("--model", default=EMBEDDING_MODEL, help="Embedding model name")
+    parser.add_argument("--index-dir", default=INDEX_DIR, help="Directory holding cached indexes")
+    parser.add_argument("--force", action="store_true", help="Re-embed every chunk from scratch")
+    add_spec_arguments(parser)
+    args = parser.parse_args()
 
-   
+    load_or_build_vectorstore(args.file, args.model, args.index_dir, force=args.force, spec=spec_from_args(args))
 
-loader = PyPDFLoader(file_path)
-docs = loader.load()
-print(f"Loaded {len(docs)} documents.")
-print(f"Document metadata: {docs[0].metadata}")
 
-emb = OpenAIEmbeddings(model="text-embedding-3-large")
-vectorstore = FAISS.from_documents(docs, emb)
+if __name__ == "__main__":
+    main()
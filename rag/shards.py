@@ -0,0 +1,123 @@
+import json
+import os
+import re
+import threading
+from collections import namedtuple
+
+import rag.rag
+from rag.compression import IndexSpec
+from rag.rag import EMBEDDING_MODEL, INDEX_DIR, load_lexical_index, load_vectorstore
+
+# One property's FAQ: its FAISS store and the BM25 index saved next to it
+Shard = namedtuple("Shard", "name hotel vectorstore lexical")
+
+
+def slugify(name: str) -> str:
+    """Property key used for shard directories and hotel matching."""
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+
+def shards_dir(index_dir: str = INDEX_DIR) -> str:
+    return os.path.join(index_dir, "shards")
+
+
+def shard_path(name: str, model: str = EMBEDDING_MODEL, index_dir: str = INDEX_DIR) -> str:
+    """Directory holding one property's shard for one embedding model."""
+    return os.path.join(shards_dir(index_dir), f"{name}-{model}")
+
+
+class ShardedFAQIndex:
+    """
+    The per-property FAQ shards written by `rag.ingest`.
+
+    Shards are discovered from their manifests up front but only loaded
+    (memory-mapped) the first time they are searched, so a process serving
+    questions about a few hotels never reads the rest. All shards share one
+    embeddings client, so a query is embedded once however many shards it
+    fans out to.
+    """
+
+    def __init__(self, model: str = EMBEDDING_MODEL, index_dir: str = INDEX_DIR, embeddings=None,
+                 spec: IndexSpec = None):
+        self.model = model
+        self.index_dir = index_dir
+        self.spec = spec or IndexSpec()
+        self._embeddings = embeddings
+        self._manifests = {}
+        self._loaded = {}
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Re-read the shard manifests, picking up properties ingested since startup."""
+        manifests = {}
+        root = shards_dir(self.index_dir)
+        suffix = f"-{self.model}"
+        for entry in sorted(os.listdir(root)) if os.path.isdir(root) else ():
+            if not entry.endswith(suffix):
+                continue
+            try:
+                with open(os.path.join(root, entry, "manifest.json")) as f:
+                    manifest = json.load(f)
+            except (OSError, ValueError):
+                continue
+            name = manifest.get("property") if isinstance(manifest, dict) else None
+            if not name:
+                # Written by an older or interrupted ingest; re-running rag.ingest rewrites it
+                print(f"⚠️ Skipping FAQ shard {entry}: its manifest has no property name")
+                continue
+            manifests[name] = manifest
+        with self._lock:
+            self._manifests = manifests
+            self._loaded = {name: shard for name, shard in self._loaded.items()
+                            if name in manifests and shard is not None}
+
+    def __len__(self) -> int:
+        return len(self._manifests)
+
+    @property
+    def embeddings(self):
+        if self._embeddings is None:
+            self._embeddings = rag.rag.get_embeddings(self.model)
+        return self._embeddings
+
+    def names(self) -> list:
+        return list(self._manifests)
+
+    def hotels(self) -> dict:
+        """Property key -> display name."""
+        return {name: manifest.get("hotel", name) for name, manifest in self._manifests.items()}
+
+    def resolve(self, hotel: str):
+        """
+        Property key for a hotel name as a user or the LLM wrote it, or None.
+
+        Exact slug matches win; otherwise the longest property key contained
+        in the name (or containing it) is used.
+        """
+        wanted = slugify(hotel)
+        if not wanted:
+            return None
+        if wanted in self._manifests:
+            return wanted
+        candidates = [name for name in self._manifests if name in wanted or wanted in name]
+        return max(candidates, key=len) if candidates else None
+
+    def shard(self, name: str) -> Shard:
+        shard = self._loaded.get(name)
+        if shard is None:
+            with self._lock:
+                shard = self._loaded.get(name)
+                if shard is None:
+                    path = shard_path(name, self.model, self.index_dir)
+                    vectorstore = load_vectorstore(path, self.embeddings, spec=self.spec)
+                    shard = Shard(name, self._manifests[name].get("hotel", name), vectorstore,
+                                  load_lexical_index(vectorstore, path))
+                    self._loaded[name] = shard
+        return shard
+
+    def all(self) -> list:
+        return [self.shard(name) for name in self.names()]
+
+    def stats(self) -> dict:
+        return {"shards": len(self._manifests), "loaded": len(self._loaded)}
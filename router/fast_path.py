@@ -0,0 +1,183 @@
+import os
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from tools.output import is_error, render_for_user
+
+FAST_PATH_ENABLED = os.getenv("FAST_PATH_ENABLED", "1").lower() in ("1", "true", "yes")
+FAST_PATH_CLASSIFIER_THRESHOLD = float(os.getenv("FAST_PATH_CLASSIFIER_THRESHOLD", "0.9"))
+
+_ID = r"booking\s*(?:id|number|no\.?)?\s*#?\s*(?P<booking_id>\d+)"
+_STATUS = r"(?P<status>paid|unpaid|not\s+paid)"
+
+# Each pattern must match the whole message (minus trailing punctuation), so
+# anything beyond the simple request ("... and cancel it") falls back to the LLM.
+# Writes match imperative requests only: "booking 5 is paid?" reads like a
+# question or a report, and must not update anything without the LLM.
+PATTERNS = [
+    ("lookup_booking", re.compile(
+        rf"(?:please\s+)?(?:can\s+you\s+)?(?:show|get|find|look\s*up|check|view|display|pull\s+up)"
+        rf"(?:\s+me)?(?:\s+(?:the|my))?(?:\s+details\s+(?:of|for))?\s+{_ID}(?:\s+please)?", re.I)),
+    ("lookup_booking", re.compile(
+        rf"(?:what(?:'s|\s+is)|details\s+(?:of|for))\s+(?:the\s+|my\s+)?{_ID}", re.I)),
+    ("update_payment_status", re.compile(
+        rf"(?:please\s+)?(?:mark|set|update|change)\s+(?:the\s+|my\s+)?{_ID}"
+        rf"(?:\s+payment(?:\s+status)?|\s+status)?\s+(?:as|to)\s+{_STATUS}(?:\s+please)?", re.I)),
+]
+
+# Intents that change data; a trailing "?" makes the message a question, not a request
+WRITE_INTENTS = {"update_payment_status"}
+
+TEMPLATES = {
+    "lookup_booking": "Here are the details for booking {booking_id}:\n\n{result}",
+    "update_payment_status": "{result}",
+}
+
+
+def _args_for(intent: str, groups: dict):
+    """Tool arguments for a matched intent, or None if the slots are unusable."""
+    booking_id = str(groups.get("booking_id") or "").strip()
+    if not booking_id.isdigit():
+        return None
+    if intent == "lookup_booking":
+        return {"booking_id": booking_id}
+    if intent == "update_payment_status":
+        status = groups.get("status")
+        if isinstance(status, bool):
+            return {"booking_id": booking_id, "is_paid": status}
+        status = re.sub(r"\s+", " ", str(status or "")).lower()
+        if status not in ("paid", "unpaid", "not paid"):
+            return None
+        return {"booking_id": booking_id, "is_paid": status == "paid"}
+    return None
+
+
+class FastPathRouter:
+    """
+    Pre-LLM router that answers simple, structured booking requests directly.
+
+    Messages such as "show booking 3" or "mark booking 4 as paid" are matched
+    with anchored regexes (and, optionally, a cheap classifier), sent straight
+    to `lookup_booking` / `update_payment_status`, and answered from a
+    template. The tool call, its result and the answer are appended to the
+    conversation just as the LLM path would, so later turns see the same
+    history. Anything else goes to the chatbot unchanged.
+
+    `classifier(text)` may return `(intent, slots, confidence)` or None; it is
+    consulted only when no pattern matches, and its answer is used only above
+    `threshold`.
+    """
+
+    def __init__(self, tools: dict, classifier=None, threshold: float = FAST_PATH_CLASSIFIER_THRESHOLD,
+                 enabled: bool = FAST_PATH_ENABLED):
+        self.tools = tools
+        self.classifier = classifier
+        self.threshold = threshold
+        self.enabled = enabled
+        self.turns = 0
+        self.hits = Counter()
+        self.fast_path_ms = 0.0
+        self.llm_calls = 0
+        self.llm_ms = 0.0
+        self._lock = threading.Lock()
+
+    def match(self, text: str):
+        """Return (intent, tool args) for a high-confidence request, else None."""
+        text = text.strip().rstrip(".!").strip()
+        question = text.endswith("?")
+        for intent, pattern in PATTERNS:
+            if question and intent in WRITE_INTENTS:
+                continue
+            found = pattern.fullmatch(text.rstrip("?").strip())
+            if found and intent in self.tools:
+                args = _args_for(intent, found.groupdict())
+                if args is not None:
+                    return intent, args
+
+        if self.classifier is not None:
+            guess = self.classifier(text)
+            if guess:
+                intent, slots, confidence = guess
+                if question and intent in WRITE_INTENTS:
+                    return None
+                if confidence >= self.threshold and intent in self.tools:
+                    args = _args_for(intent, slots)
+                    if args is not None:
+                        return intent, args
+        return None
+
+    def _pending(self, state):
+        """The user message this turn, if the fast path should look at it."""
+        if not self.enabled:
+            return None
+        messages = state.get("messages", [])
+        if not messages or not isinstance(messages[-1], HumanMessage):
+            return None
+        with self._lock:
+            self.turns += 1
+        return self.match(messages[-1].content if isinstance(messages[-1].content, str) else "")
+
+    def _answer(self, intent: str, args: dict, result: str, started: float):
+        call_id = f"fast_{uuid.uuid4().hex[:12]}"
+        if is_error(result):
+            content = render_for_user(intent, result)
+        else:
+            content = TEMPLATES[intent].format(result=render_for_user(intent, result), **args)
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self.hits[intent] += 1
+            self.fast_path_ms += elapsed_ms
+
+        return {"messages": [
+            AIMessage(content="", tool_calls=[{"name": intent, "args": args, "id": call_id}]),
+            ToolMessage(content=result, tool_call_id=call_id, name=intent),
+            AIMessage(content=content),
+        ]}
+
+    def __call__(self, state):
+        matched = self._pending(state)
+        if matched is None:
+            return {}
+        started = time.perf_counter()
+        intent, args = matched
+        return self._answer(intent, args, self.tools[intent].invoke(args), started)
+
+    async def acall(self, state):
+        matched = self._pending(state)
+        if matched is None:
+            return {}
+        started = time.perf_counter()
+        intent, args = matched
+        return self._answer(intent, args, await self.tools[intent].ainvoke(args), started)
+
+    @staticmethod
+    def route(state):
+        """Conditional edge: end the turn if the fast path answered, otherwise go to the chatbot."""
+        last = state["messages"][-1]
+        return "answered" if isinstance(last, AIMessage) else "chatbot"
+
+    def record_llm_call(self, elapsed_ms: float):
+        """Record one chatbot LLM round trip, used to estimate the latency a hit saves."""
+        with self._lock:
+            self.llm_calls += 1
+            self.llm_ms += elapsed_ms
+
+    def stats(self) -> dict:
+        hits = sum(self.hits.values())
+        avg_fast = self.fast_path_ms / hits if hits else 0.0
+        avg_llm = self.llm_ms / self.llm_calls if self.llm_calls else 0.0
+        # The LLM path needs two round trips for these intents (choose tool, phrase answer)
+        saved = max(0.0, 2 * avg_llm - avg_fast) * hits if self.llm_calls else None
+        return {
+            "turns": self.turns,
+            "hits": hits,
+            "hit_rate": hits / self.turns if self.turns else 0.0,
+            "by_intent": dict(self.hits),
+            "avg_fast_path_ms": avg_fast,
+            "avg_llm_call_ms": avg_llm,
+            "estimated_ms_saved": saved,
+        }
@@ -0,0 +1,236 @@
+import asyncio
+import contextvars
+import json
+import re
+import sqlite3
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Future, InvalidStateError
+
+# Set by hedged duplicate requests: fetch upstream even if an identical
+# request is already in flight, and hand the result to its waiters.
+bypass_inflight = contextvars.ContextVar("search_cache_bypass_inflight", default=False)
+
+
+def _resolve(future, value=None, exception=None) -> None:
+    """Complete `future` unless a hedged request already did."""
+    try:
+        if future.done():
+            return
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(value)
+    except InvalidStateError:
+        pass
+
+
+class _LeaderCancelled(Exception):
+    """Set on a shared fetch whose leader was cancelled, so its waiters fetch again."""
+
+
+class SearchCache:
+    """
+    Shared TTL cache for search API responses with single-flight fetching.
+
+    Entries are keyed by query type, normalized query and request parameters.
+    Concurrent misses for the same key are coalesced: the first caller fetches
+    upstream and every other caller waits for that result. When `persist_path`
+    is set, entries are also written to a SQLite file so they survive restarts
+    and are shared between worker processes.
+    """
+
+    def __init__(self, ttls: dict = None, default_ttl: float = 900.0,
+                 maxsize: int = 2048, persist_path: str = None):
+        self.ttls = ttls or {}
+        self.default_ttl = default_ttl
+        self.maxsize = maxsize
+        self.persist_path = persist_path
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._data = OrderedDict()
+        self._inflight = {}
+        # Per event loop: an asyncio future can only be awaited on the loop that created it
+        self._ainflight = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self._db = None
+        if persist_path:
+            self._db = sqlite3.connect(persist_path, check_same_thread=False, timeout=5)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS search_cache "
+                "(key TEXT PRIMARY KEY, expires REAL, value TEXT)"
+            )
+            self._db.commit()
+
+    @staticmethod
+    def make_key(query_type: str, query: str, params: dict = None) -> str:
+        normalized = re.sub(r"\s+", " ", query).strip().lower()
+        return json.dumps([query_type, normalized, params or {}], sort_keys=True)
+
+    def ttl_for(self, query_type: str) -> float:
+        return self.ttls.get(query_type, self.default_ttl)
+
+    def _get(self, key):
+        entry = self._data.get(key)
+        if entry is not None and entry[0] > time.time():
+            self._data.move_to_end(key)
+            return entry[1]
+        if entry is not None:
+            del self._data[key]
+        if self._db is not None:
+            row = self._db.execute(
+                "SELECT expires, value FROM search_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row and row[0] > time.time():
+                value = json.loads(row[1])
+                self._put(key, value, row[0])
+                return value
+        return None
+
+    def _put(self, key, value, expires: float) -> None:
+        self._data[key] = (expires, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def _persist(self, key, value, expires: float) -> None:
+        if self._db is None:
+            return
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO search_cache (key, expires, value) VALUES (?, ?, ?)",
+                (key, expires, json.dumps(value)),
+            )
+            self._db.execute("DELETE FROM search_cache WHERE expires < ?", (time.time(),))
+            self._db.commit()
+
+    def get_or_fetch(self, key: str, fetch, ttl: float, cacheable=lambda value: True):
+        """
+        Return the cached value for `key`, or call `fetch()` once for all
+        concurrent callers and cache its result for `ttl` seconds.
+
+        Results rejected by `cacheable` (e.g. API errors) are shared with the
+        callers already waiting but not stored.
+        """
+        with self._lock:
+            value = self._get(key)
+            if value is not None:
+                self.hits += 1
+                return value
+            self.misses += 1
+            hedged = bypass_inflight.get()
+            future = self._inflight.get(key)
+            leader = future is None and not hedged
+            if leader:
+                future = self._inflight[key] = Future()
+            elif not hedged:
+                self.coalesced += 1
+
+        if hedged:
+            value = fetch()
+            self._share_hedged(key, value, ttl, cacheable, self._inflight)
+            return value
+        if not leader:
+            return future.result()
+
+        try:
+            value = fetch()
+        except BaseException as e:
+            _resolve(future, exception=e)
+            raise
+        else:
+            _resolve(future, value)
+            self._store(key, value, ttl, cacheable)
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _store(self, key: str, value, ttl: float, cacheable) -> None:
+        if cacheable(value):
+            expires = time.time() + ttl
+            with self._lock:
+                self._put(key, value, expires)
+            self._persist(key, value, expires)
+
+    def _share_hedged(self, key: str, value, ttl: float, cacheable, inflight: dict) -> None:
+        # A hedged request that wins also answers everyone waiting on the slow one
+        with self._lock:
+            future = inflight.get(key)
+        if future is not None:
+            _resolve(future, value)
+        self._store(key, value, ttl, cacheable)
+
+    async def aget_or_fetch(self, key: str, afetch, ttl: float, cacheable=lambda value: True):
+        """Async counterpart of `get_or_fetch`; coalesces concurrent misses per event loop."""
+        with self._lock:
+            value = self._get(key)
+            if value is not None:
+                self.hits += 1
+                return value
+            self.misses += 1
+            hedged = bypass_inflight.get()
+            loop = asyncio.get_running_loop()
+            inflight = self._ainflight.get(loop)
+            if inflight is None:
+                inflight = self._ainflight[loop] = {}
+            future = inflight.get(key)
+            leader = future is None and not hedged
+            if leader:
+                future = inflight[key] = loop.create_future()
+            elif not hedged:
+                self.coalesced += 1
+
+        if hedged:
+            value = await afetch()
+            self._share_hedged(key, value, ttl, cacheable, inflight)
+            return value
+        if not leader:
+            try:
+                return await asyncio.shield(future)
+            except _LeaderCancelled:
+                # The leader's caller gave up (timeout or hedge); this caller still wants the result
+                return await self.aget_or_fetch(key, afetch, ttl, cacheable)
+
+        try:
+            value = await afetch()
+        except asyncio.CancelledError:
+            # Never cancel the shared future: waiters from other requests must not see CancelledError
+            if not future.done():
+                future.set_exception(_LeaderCancelled())
+                future.exception()
+            raise
+        except BaseException as e:
+            if not future.done():
+                future.set_exception(e)
+                # Mark retrieved so a leader failure with no waiters is not logged
+                future.exception()
+            raise
+        else:
+            _resolve(future, value)
+            self._store(key, value, ttl, cacheable)
+            return value
+        finally:
+            with self._lock:
+                inflight.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM search_cache")
+                self._db.commit()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
@@ -1,18 +1,130 @@
+import asyncio
 import os
+import threading
+import weakref
 from dotenv import load_dotenv
-from serpapi import GoogleSearch
+from metrics.instrumentation import register_collector, span
+from search.cache import SearchCache
 
 load_dotenv()
 
+SERPAPI_URL = "https://serpapi.com/search.json"
+
+# Shared result cache for every SerpAPI caller in this process
+search_cache = SearchCache(
+    ttls={
+        "web": float(os.getenv("SEARCH_CACHE_TTL_WEB", "3600")),
+        "hotels": float(os.getenv("SEARCH_CACHE_TTL_HOTELS", "900")),
+        "flights": float(os.getenv("SEARCH_CACHE_TTL_FLIGHTS", "300")),
+    },
+    maxsize=int(os.getenv("SEARCH_CACHE_SIZE", "2048")),
+    persist_path=os.getenv("SEARCH_CACHE_PATH") or None,
+)
+register_collector("search_cache", search_cache.stats)
+
+# Keep-alive connection pools, created on first use and shared by all calls.
+# An AsyncClient is bound to the loop that first used it, so there is one per
+# event loop (the server's, and each asyncio.run of the CLI and benchmarks)
+_client = None
+_async_clients = weakref.WeakKeyDictionary()
+_client_lock = threading.Lock()
+
+def _pool_limits():
+    import httpx
+    return httpx.Limits(
+        max_connections=int(os.getenv("SERPAPI_MAX_CONNECTIONS", "100")),
+        max_keepalive_connections=int(os.getenv("SERPAPI_MAX_KEEPALIVE", "20")),
+    )
+
+def get_client():
+    """Return the shared synchronous HTTP client for SerpAPI."""
+    global _client
+    if _client is None:
+        import httpx
+        with _client_lock:
+            if _client is None:
+                _client = httpx.Client(limits=_pool_limits(), timeout=20.0)
+    return _client
+
+def get_async_client():
+    """Return the async HTTP client for SerpAPI shared by everything on the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        import httpx
+        with _client_lock:
+            client = _async_clients.get(loop)
+            if client is None:
+                client = _async_clients[loop] = httpx.AsyncClient(limits=_pool_limits(), timeout=20.0)
+    return client
+
+async def aclose_clients():
+    """Close the pooled clients; the async one of the running loop (call on server shutdown)."""
+    global _client
+    with _client_lock:
+        client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+    if _client is not None:
+        _client.close()
+        _client = None
+
+def _request_params(query, params):
+    # Same request GoogleSearch(...).get_dict() sends, minus its per-call connection
+    return {"engine": "google", "q": query, "api_key": os.getenv("SERPAPI_API_KEY", ""),
+            "output": "json", **params}
+
+def _search_params(num, gl, hl):
+    return {k: v for k, v in {"num": num, "gl": gl, "hl": hl}.items() if v is not None}
+
+def google_search(query, query_type="web", num=None, gl=None, hl=None):
+    """
+    Run a SerpAPI Google search through the shared cache.
+
+    Identical queries (after normalization) with the same `num`, `gl` and `hl`
+    are served from cache for the TTL of their query type, and concurrent
+    identical queries share a single upstream request.
+    """
+    params = _search_params(num, gl, hl)
+
+    def fetch():
+        with span("search_api", type=query_type):
+            response = get_client().get(SERPAPI_URL, params=_request_params(query, params))
+            # A 429 or 5xx raises, so it is retried by the caller and never cached
+            response.raise_for_status()
+            return response.json()
+
+    return search_cache.get_or_fetch(
+        SearchCache.make_key(query_type, query, params),
+        fetch,
+        ttl=search_cache.ttl_for(query_type),
+        cacheable=lambda data: "error" not in data,
+    )
+
+async def agoogle_search(query, query_type="web", num=None, gl=None, hl=None):
+    """Async counterpart of `google_search` over the shared async connection pool."""
+    params = _search_params(num, gl, hl)
+
+    async def afetch():
+        with span("search_api", type=query_type):
+            response = await get_async_client().get(SERPAPI_URL, params=_request_params(query, params))
+            response.raise_for_status()
+            return response.json()
+
+    return await search_cache.aget_or_fetch(
+        SearchCache.make_key(query_type, query, params),
+        afetch,
+        ttl=search_cache.ttl_for(query_type),
+        cacheable=lambda data: "error" not in data,
+    )
+
 # Search function using SerpAPI
 def search_fn(query):
-    data = GoogleSearch(
-        {"q": query, "api_key": os.getenv("SERPAPI_API_KEY", "")}
-    ).get_dict()
+    data = google_search(query)
     results = data.get("organic_results", [])[:5]
     return (
         "\n".join(
             f"{i+1}. {r.get('title')} — {r.get('link')}" for i, r in enumerate(results)
         )
         or "No results found."
-    )
\ No newline at end of file
+    )
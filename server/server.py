@@ -0,0 +1,213 @@
+"""
+Async multi-session HTTP server for the travel booking agent.
+
+Each client session maps to its own LangGraph thread_id. Turns run through
+`app.ainvoke`/`app.astream` on one event loop, with a global concurrency
+limit, strict per-session ordering and a bounded queue: once too many turns
+are waiting, new ones are rejected with 503 + Retry-After.
+
+Endpoints:
+    POST /sessions/{session_id}/messages   {"message": "..."} -> {"reply": "...", ...}
+    POST /sessions/{session_id}/stream     {"message": "..."} -> NDJSON token/tool events
+    GET  /health                           load and queue depth
+    GET  /metrics                          Prometheus text (?format=json for JSON)
+    GET  /traces                           recent per-turn span trees (METRICS_TRACE=1)
+
+Usage:
+    python main.py serve [--host 127.0.0.1] [--port 8080]
+"""
+import asyncio
+import json
+import os
+import time
+from contextlib import asynccontextmanager
+
+from aiohttp import web
+from langchain_core.messages import HumanMessage
+from metrics.instrumentation import export_json, export_prometheus, recent_traces, trace
+from streaming.events import stream_turn
+
+SERVER_MAX_CONCURRENCY = int(os.getenv("SERVER_MAX_CONCURRENCY", "64"))
+SERVER_MAX_PENDING = int(os.getenv("SERVER_MAX_PENDING", "512"))
+SERVER_RETRY_AFTER = int(os.getenv("SERVER_RETRY_AFTER", "1"))
+
+
+class Saturated(Exception):
+    """Raised when the server already has the maximum number of queued turns."""
+
+
+class SessionScheduler:
+    """
+    Admission control for agent turns.
+
+    At most `max_concurrency` turns execute at once, turns of the same session
+    run one at a time in arrival order, and at most `max_pending` turns may be
+    admitted (running or waiting) before new ones are refused.
+    """
+
+    def __init__(self, max_concurrency: int = SERVER_MAX_CONCURRENCY, max_pending: int = SERVER_MAX_PENDING):
+        self.max_concurrency = max_concurrency
+        self.max_pending = max_pending
+        self.pending = 0
+        self.running = 0
+        self.rejected = 0
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        # session_id -> [lock, number of admitted turns holding a reference]
+        self._sessions = {}
+
+    @asynccontextmanager
+    async def slot(self, session_id: str):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise Saturated()
+
+        self.pending += 1
+        entry = self._sessions.setdefault(session_id, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            # asyncio.Lock wakes waiters in FIFO order, preserving per-session ordering
+            async with entry[0]:
+                async with self._semaphore:
+                    self.running += 1
+                    try:
+                        yield
+                    finally:
+                        self.running -= 1
+        finally:
+            self.pending -= 1
+            entry[1] -= 1
+            if entry[1] == 0:
+                self._sessions.pop(session_id, None)
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "pending": self.pending,
+            "sessions": len(self._sessions),
+            "rejected": self.rejected,
+            "max_concurrency": self.max_concurrency,
+            "max_pending": self.max_pending,
+        }
+
+
+def _thread_config(session_id: str) -> dict:
+    return {"configurable": {"thread_id": f"session-{session_id}"}}
+
+
+async def _read_message(request) -> str:
+    try:
+        body = await request.json()
+    except json.JSONDecodeError:
+        raise web.HTTPBadRequest(text="Body must be JSON")
+    message = (body.get("message") or "").strip() if isinstance(body, dict) else ""
+    if not message:
+        raise web.HTTPBadRequest(text='Body must contain a non-empty "message"')
+    return message
+
+
+def _saturated_response() -> web.Response:
+    return web.json_response(
+        {"error": "Server is saturated, retry later."},
+        status=503,
+        headers={"Retry-After": str(SERVER_RETRY_AFTER)},
+    )
+
+
+async def handle_message(request):
+    session_id = request.match_info["session_id"]
+    message = await _read_message(request)
+    scheduler = request.app["scheduler"]
+    agent = request.app["agent"]
+
+    started = time.perf_counter()
+    try:
+        async with scheduler.slot(session_id):
+            queued_ms = (time.perf_counter() - started) * 1000
+            with trace("turn", session=session_id) as root:
+                result = await agent.ainvoke({"messages": [HumanMessage(content=message)]},
+                                             config=_thread_config(session_id))
+    except Saturated:
+        return _saturated_response()
+
+    body = {
+        "session_id": session_id,
+        "reply": result["messages"][-1].content,
+        "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+        "queued_ms": round(queued_ms, 1),
+    }
+    if root is not None and request.query.get("trace"):
+        body["trace"] = root.to_dict()
+    return web.json_response(body)
+
+
+async def handle_stream(request):
+    session_id = request.match_info["session_id"]
+    message = await _read_message(request)
+    scheduler = request.app["scheduler"]
+    agent = request.app["agent"]
+
+    response = None
+    try:
+        async with scheduler.slot(session_id):
+            response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+            await response.prepare(request)
+            with trace("turn", session=session_id, mode="stream"):
+                async for event in stream_turn(agent, message, _thread_config(session_id)):
+                    await response.write((json.dumps(event, default=str) + "\n").encode())
+    except Saturated:
+        return _saturated_response()
+
+    await response.write_eof()
+    return response
+
+
+async def handle_health(request):
+    report = {"status": "ok", **request.app["scheduler"].stats()}
+    if request.app["fast_path"] is not None:
+        report["fast_path"] = request.app["fast_path"].stats()
+    if request.app["tools"] is not None:
+        report["tools"] = request.app["tools"].stats()
+    return web.json_response(report)
+
+
+async def handle_metrics(request):
+    if request.query.get("format") == "json":
+        return web.Response(text=export_json(), content_type="application/json")
+    return web.Response(text=export_prometheus(),
+                        headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"})
+
+
+async def handle_traces(request):
+    return web.json_response(recent_traces(int(request.query.get("limit", "20"))))
+
+
+async def _on_cleanup(app):
+    from search.google_search import aclose_clients
+    await aclose_clients()
+
+
+def create_app(agent, scheduler: SessionScheduler = None, fast_path=None, tools=None) -> web.Application:
+    """
+    Build the aiohttp application around a compiled agent graph.
+
+    `fast_path` and `tools` are the router and tool scheduler the graph was
+    built with; /health reports their stats. They are passed in rather than
+    imported from main, which runs as __main__ under `python main.py serve`.
+    """
+    app = web.Application()
+    app["agent"] = agent
+    app["scheduler"] = scheduler or SessionScheduler()
+    app["fast_path"] = fast_path
+    app["tools"] = tools
+    app.router.add_post("/sessions/{session_id}/messages", handle_message)
+    app.router.add_post("/sessions/{session_id}/stream", handle_stream)
+    app.router.add_get("/health", handle_health)
+    app.router.add_get("/metrics", handle_metrics)
+    app.router.add_get("/traces", handle_traces)
+    app.on_cleanup.append(_on_cleanup)
+    return app
+
+
+def serve(agent, host: str = "127.0.0.1", port: int = 8080, fast_path=None, tools=None):
+    print(f"🌍 Travel Booking Assistant serving on http://{host}:{port}")
+    web.run_app(create_app(agent, fast_path=fast_path, tools=tools), host=host, port=port, print=None)
@@ -0,0 +1,168 @@
+import os
+from collections import deque
+from langchain_core.messages import HumanMessage, SystemMessage, ToolMessage, get_buffer_string
+from metrics.instrumentation import record_llm_usage
+from streaming.events import INTERNAL_TAG
+
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "3000"))
+HISTORY_KEEP_TURNS = int(os.getenv("HISTORY_KEEP_TURNS", "2"))
+HISTORY_TOOL_OUTPUT_CHARS = int(os.getenv("HISTORY_TOOL_OUTPUT_CHARS", "600"))
+
+SUMMARY_PROMPT = """Update the running summary of a conversation between a user and a travel booking assistant.
+Keep every booking ID, hotel, city, date, price and payment status that was mentioned, plus any open user requests.
+Be concise; return only the updated summary.
+
+Current summary:
+{summary}
+
+New messages:
+{messages}"""
+
+
+def _encoder(model: str):
+    try:
+        import tiktoken
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except ImportError:
+        return None
+
+
+class HistoryManager:
+    """
+    Keeps the prompt built from `AgentState` under a token budget.
+
+    Each turn, the prompt is assembled from the running summary plus the
+    messages that have not been summarized yet:
+
+    1. Tool outputs older than the last `keep_turns` turns are truncated.
+    2. If the prompt is still over budget, the oldest whole turns are folded
+       into the running summary. Cuts only happen at a user message, so an
+       AI tool call and its tool results are never separated.
+
+    The summary and the index it covers are stored in the graph state, so
+    earlier turns are summarized once rather than on every call.
+    """
+
+    def __init__(self, token_budget: int = HISTORY_TOKEN_BUDGET, keep_turns: int = HISTORY_KEEP_TURNS,
+                 tool_output_chars: int = HISTORY_TOOL_OUTPUT_CHARS, summarizer=None,
+                 model: str = "gpt-3.5-turbo"):
+        self.token_budget = token_budget
+        self.keep_turns = keep_turns
+        self.tool_output_chars = tool_output_chars
+        self.summarizer = summarizer
+        self.reports = deque(maxlen=1000)
+        self._encoding = _encoder(model)
+
+    def count_tokens(self, messages) -> int:
+        """Approximate chat prompt tokens (content, tool calls and per-message overhead)."""
+        total = 0
+        for message in messages:
+            text = message.content if isinstance(message.content, str) else str(message.content)
+            tool_calls = getattr(message, "tool_calls", None)
+            if tool_calls:
+                text += str(tool_calls)
+            total += 4 + (len(self._encoding.encode(text)) if self._encoding else len(text) // 4)
+        return total
+
+    def _truncate_tool_output(self, message):
+        if not isinstance(message, ToolMessage) or len(message.content) <= self.tool_output_chars:
+            return message
+        return message.model_copy(update={
+            "content": message.content[:self.tool_output_chars] + " …[truncated]"
+        })
+
+    def build_prompt(self, system_prompt: str, state) -> tuple:
+        """
+        Build the LLM prompt for this turn.
+
+        Returns:
+            tuple: (prompt messages, state updates for the summary, token report dict)
+        """
+        messages = [m for m in state["messages"] if not isinstance(m, SystemMessage)]
+        summary = state.get("summary") or ""
+        start = state.get("summarized_upto") or 0
+        # Raw tokens of messages[:start], so the report never re-tokenizes summarized history
+        summarized_tokens = earlier_tokens = state.get("summarized_tokens") or 0
+        tail_start = start
+
+        # Tokens per message object, kept alive so their ids are not reused within this call
+        counted = {}
+
+        def count(batch) -> int:
+            total = 0
+            for m in batch:
+                if id(m) not in counted:
+                    counted[id(m)] = (m, self.count_tokens([m]))
+                total += counted[id(m)][1]
+            return total
+
+        # Turn boundaries in the unsummarized tail; the latest turns stay verbatim
+        turn_starts = [i for i in range(start, len(messages)) if isinstance(messages[i], HumanMessage)]
+        protected_from = turn_starts[-self.keep_turns] if len(turn_starts) >= self.keep_turns else start
+
+        def assemble(summary, start):
+            system = system_prompt
+            if summary:
+                system += f"\n\nSummary of the earlier conversation:\n{summary}"
+            tail = [m if i >= protected_from else self._truncate_tool_output(m)
+                    for i, m in enumerate(messages[start:], start)]
+            return [SystemMessage(content=system)] + tail
+
+        prompt = assemble(summary, start)
+        tokens = count(prompt)
+        updates = {}
+
+        # Fold the oldest turns into the summary until the prompt fits
+        for cut in (i for i in turn_starts if start < i <= protected_from):
+            if tokens <= self.token_budget:
+                break
+            folded = messages[start:cut]
+            summary = self._summarize(summary, folded)
+            summarized_tokens += count(folded)
+            start = cut
+            prompt = assemble(summary, start)
+            tokens = count(prompt)
+            updates = {"summary": summary, "summarized_upto": start, "summarized_tokens": summarized_tokens}
+
+        report = {
+            "tokens_before": (earlier_tokens + self.count_tokens([SystemMessage(content=system_prompt)])
+                              + count(messages[tail_start:])),
+            "tokens_after": tokens,
+            "messages_before": len(messages) + 1,
+            "messages_after": len(prompt),
+        }
+        self.reports.append(report)
+        return prompt, updates, report
+
+    def _summarize(self, summary: str, messages) -> str:
+        if self.summarizer is None:
+            # No summarizer configured: older turns are simply dropped
+            return summary
+        return self.summarizer(summary, messages)
+
+    def stats(self) -> dict:
+        """Average prompt tokens per turn before and after history management."""
+        if not self.reports:
+            return {"turns": 0}
+        before = sum(r["tokens_before"] for r in self.reports)
+        after = sum(r["tokens_after"] for r in self.reports)
+        return {
+            "turns": len(self.reports),
+            "avg_tokens_before": before / len(self.reports),
+            "avg_tokens_after": after / len(self.reports),
+            "savings": 1 - after / before if before else 0.0,
+        }
+
+
+def llm_summarizer(llm):
+    """Summarizer that asks `llm` to extend the running summary with new messages."""
+    def summarize(summary: str, messages) -> str:
+        prompt = SUMMARY_PROMPT.format(summary=summary or "(none)", messages=get_buffer_string(messages))
+        # Tagged internal so streaming never shows summary tokens to the user
+        response = llm.invoke(prompt, config={"tags": [INTERNAL_TAG]})
+        record_llm_usage(response, getattr(llm, "model_name", "unknown"), purpose="summary")
+        return response.content.strip()
+    return summarize
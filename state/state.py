@@ -1,6 +1,11 @@
 from typing import Annotated
 from langgraph.graph.message import add_messages
-from typing_extensions import TypedDict
+from typing_extensions import NotRequired, TypedDict
 
 class AgentState(TypedDict):
-    messages: Annotated[list, add_messages]
\ No newline at end of file
+    messages: Annotated[list, add_messages]
+    # Running summary of messages[:summarized_upto], maintained by state.history.HistoryManager
+    summary: NotRequired[str]
+    summarized_upto: NotRequired[int]
+    # Prompt tokens of messages[:summarized_upto] before summarization, for the token report
+    summarized_tokens: NotRequired[int]
\ No newline at end of file
@@ -0,0 +1,67 @@
+from langchain_core.messages import HumanMessage
+
+# LLM calls tagged with this are internal (e.g. history summarization) and never surfaced
+INTERNAL_TAG = "internal"
+
+
+async def stream_turn(app, message: str, config: dict, nodes=("chatbot",), answer_nodes=("fast_path",)):
+    """
+    Run one agent turn and yield events as they happen.
+
+    Events are plain dicts:
+        {"type": "token", "content": str}           LLM token from a chatbot node
+        {"type": "tool_start", "name": str, "input": dict}
+        {"type": "tool_end", "name": str, "output": str}
+        {"type": "message", "content": str}         final assistant message
+        {"type": "done"}
+
+    Built on `app.astream_events`, so it works for any graph whose nodes call
+    chat models and tools through LangChain runnables. Answers produced
+    without an LLM by one of `answer_nodes` are emitted as a single token.
+    """
+    final = None
+    # Runs whose answer was already emitted, with their ancestors: the graph node and
+    # the runnable inside it can share a name, and both end with the same output
+    answered = set()
+    async for event in app.astream_events(
+        {"messages": [HumanMessage(content=message)]}, config=config, version="v2"
+    ):
+        kind = event["event"]
+        if INTERNAL_TAG in event.get("tags", []):
+            continue
+
+        if kind == "on_chat_model_stream":
+            if event.get("metadata", {}).get("langgraph_node") not in nodes:
+                continue
+            content = event["data"]["chunk"].content
+            if content:
+                yield {"type": "token", "content": content}
+
+        elif kind == "on_chat_model_end" and event.get("metadata", {}).get("langgraph_node") in nodes:
+            output = event["data"].get("output")
+            if output is not None and not getattr(output, "tool_calls", None):
+                final = output.content
+
+        elif kind == "on_chain_end" and event["name"] in answer_nodes \
+                and event.get("metadata", {}).get("langgraph_node") == event["name"]:
+            if event["run_id"] in answered:
+                continue
+            output = event["data"].get("output")
+            messages = output.get("messages") or [] if isinstance(output, dict) else []
+            if messages and messages[-1].type == "ai" and messages[-1].content:
+                answered.add(event["run_id"])
+                answered.update(event.get("parent_ids", []))
+                final = messages[-1].content
+                yield {"type": "token", "content": final}
+
+        elif kind == "on_tool_start":
+            yield {"type": "tool_start", "name": event["name"], "input": event["data"].get("input")}
+
+        elif kind == "on_tool_end":
+            output = event["data"].get("output")
+            yield {"type": "tool_end", "name": event["name"],
+                   "output": getattr(output, "content", output if isinstance(output, str) else str(output))}
+
+    if final is not None:
+        yield {"type": "message", "content": final}
+    yield {"type": "done"}
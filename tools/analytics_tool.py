@@ -0,0 +1,99 @@
+import os
+import re
+from typing import Optional
+from langchain_core.tools import tool
+from database.database import session_scope, async_session_scope
+from database.rollups import summarize
+from tools.output import compact, error_result, record
+
+ANALYTICS_MAX_ROWS = int(os.getenv("ANALYTICS_MAX_ROWS", "50"))
+
+_MONTH = re.compile(r"\d{4}-(0[1-9]|1[0-2])")
+
+
+def _parse_request(group_by, month_from, month_to):
+    """Dimensions and month bounds of a report; raises ValueError on malformed input."""
+    dimensions = tuple(d.strip().lower() for d in (group_by or "city").split(",") if d.strip())
+    for month in (month_from, month_to):
+        if month is not None and not _MONTH.fullmatch(month):
+            raise ValueError(f"Invalid month {month!r}, use YYYY-MM.")
+    return dimensions, month_from, month_to
+
+
+def _percent(share) -> str:
+    return "n/a" if share is None else f"{share:.1%}"
+
+
+def _format_report(report, dimensions) -> str:
+    if not report:
+        return "no bookings" if compact() else "📊 No bookings match these filters."
+    shown = report[:ANALYTICS_MAX_ROWS]
+    more = len(report) - len(shown)
+
+    if compact():
+        lines = [record(**{d: entry[d] for d in dimensions}, bookings=entry["bookings"],
+                        revenue=float(entry["revenue"]), paid=float(entry["paid_revenue"]),
+                        unpaid=float(entry["unpaid"]), unpaid_bookings=entry["unpaid_bookings"],
+                        room_nights=entry["room_nights"], occupancy=_percent(entry["occupancy"]))
+                 for entry in shown]
+        if more:
+            lines.append(record(more_rows=more))
+        return "\n".join(lines)
+
+    lines = []
+    for entry in shown:
+        label = " / ".join(str(entry[d]) for d in dimensions) or "All bookings"
+        lines.append(f"📊 **{label}:** {entry['bookings']} bookings, €{entry['revenue']:.2f} revenue "
+                     f"(€{entry['unpaid']:.2f} unpaid across {entry['unpaid_bookings']}), "
+                     f"{entry['room_nights']} room nights, {_percent(entry['occupancy'])} occupancy")
+    if more:
+        lines.append(f"➡️ {more} more rows; narrow the report with city, hotel or month filters.")
+    return "\n".join(lines)
+
+
+@tool
+def booking_analytics(group_by: str = "city", city: Optional[str] = None, hotel: Optional[str] = None,
+                      month_from: Optional[str] = None, month_to: Optional[str] = None) -> str:
+    """
+    Report revenue, unpaid balance and occupancy across bookings, grouped by city, hotel and/or month.
+    Use this for totals and trends instead of listing bookings.
+
+    Args:
+        group_by: Comma-separated dimensions to group by: city, hotel, month (e.g. "city,month")
+        city: Only include this city
+        hotel: Only include this hotel
+        month_from: First check-in month to include (format: YYYY-MM)
+        month_to: Last check-in month to include (format: YYYY-MM)
+
+    Returns:
+        str: One line per group with bookings, revenue, unpaid balance, room nights and occupancy
+    """
+    try:
+        dimensions, month_from, month_to = _parse_request(group_by, month_from, month_to)
+        with session_scope() as session:
+            report = summarize(session, dimensions, city, hotel, month_from, month_to)
+        return _format_report(report, dimensions)
+
+    except ValueError as e:
+        return error_result(str(e))
+    except Exception as e:
+        return error_result(f"Error building booking report: {str(e)}")
+
+async def _abooking_analytics(group_by: str = "city", city: Optional[str] = None, hotel: Optional[str] = None,
+                              month_from: Optional[str] = None, month_to: Optional[str] = None) -> str:
+    try:
+        dimensions, month_from, month_to = _parse_request(group_by, month_from, month_to)
+        async with async_session_scope() as session:
+            report = await session.run_sync(summarize, dimensions, city, hotel, month_from, month_to)
+        return _format_report(report, dimensions)
+
+    except ValueError as e:
+        return error_result(str(e))
+    except Exception as e:
+        return error_result(f"Error building booking report: {str(e)}")
+
+
+booking_analytics.coroutine = _abooking_analytics
+
+# Export tools for use in LangGraph
+analytics_tool = booking_analytics
@@ -1,56 +1,421 @@
+import io
 from langchain_core.tools import tool
-from database.database import session, Booking
+from pydantic import BaseModel, Field, ValidationError
+from sqlalchemy import select, insert, update, tuple_
+from database.database import session_scope, async_session_scope, Booking
+from database.availability import STAY_MAX_NIGHTS, RoomUnavailable, get_availability_index, reserve
+from database.rollups import record_created, record_payment
+from database.write_queue import run_write, arun_write
+from tools.output import compact, error_result, parse_record, record, register_renderer, value
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
+
+
+# Result formatting shared by the sync and async tool implementations.
+# Compact records go to the LLM; the pretty forms are for TOOL_OUTPUT_MODE=pretty
+# and for results shown to the user directly (see tools/output.py).
+
+def _booking_fields(booking) -> dict:
+    """A booking as wire-form strings, the input of both the compact and pretty renderings."""
+    return {
+        "id": value(booking.booking_id),
+        "hotel": value(booking.hotel_name),
+        "city": value(booking.hotel_city),
+        "country": value(booking.hotel_country),
+        "created": value(booking.created_date),
+        "checkin": value(booking.checkin_date),
+        "checkout": value(booking.checkout_date),
+        "price": value(float(booking.booking_price)),
+        "paid": value(booking.is_paid),
+    }
+
+def _pretty_booking_details(fields: dict) -> str:
+    payment_status = "✅ Paid" if fields["paid"] == "yes" else "❌ Unpaid"
+
+    def day(key):
+        return fields[key] if fields[key] != "-" else "N/A"
+
+    return f"""
+📋 **Booking Details** (ID: {fields['id']})
+🏨 **Hotel:** {fields['hotel']}
+📍 **Location:** {fields['city']}, {fields['country']}
+📅 **Created:** {day('created')}
+🔗 **Check-in:** {day('checkin')}
+🔚 **Check-out:** {day('checkout')}
+💰 **Price:** €{fields['price']}
+💳 **Payment:** {payment_status}
+    """.strip()
+
+def _format_booking_details(booking) -> str:
+    fields = _booking_fields(booking)
+    if compact():
+        return record("booking", **fields)
+    return _pretty_booking_details(fields)
+
+def _format_booking_confirmation(booking) -> str:
+    if compact():
+        fields = _booking_fields(booking)
+        del fields["created"]
+        return record("created", **fields)
+    return f"""
+✅ **Booking Created Successfully!**
+📋 **Booking ID:** {booking.booking_id}
+🏨 **Hotel:** {booking.hotel_name}
+📍 **Location:** {booking.hotel_city}, {booking.hotel_country}
+🔗 **Check-in:** {booking.checkin_date.strftime('%Y-%m-%d')}
+🔚 **Check-out:** {booking.checkout_date.strftime('%Y-%m-%d')}
+💰 **Total Price:** €{booking.booking_price:.2f}
+💳 **Payment Status:** Pending
+
+Your booking has been created. Please proceed with payment to confirm your reservation.
+    """.strip()
+
+def _pretty_payment_update(booking_id, paid: bool) -> str:
+    status = "✅ Paid" if paid else "❌ Unpaid"
+    return f"✅ Payment status updated for Booking {booking_id}: {status}"
+
+def _format_payment_update(bid, is_paid) -> str:
+    if compact():
+        return record("updated", id=bid, paid=is_paid)
+    return _pretty_payment_update(bid, is_paid)
+
+def _render_payment_update(result: str) -> str:
+    fields = parse_record(result)[1]
+    return _pretty_payment_update(fields["id"], fields["paid"] == "yes")
+
+# The fast path shows these results to the user without an LLM rewording them
+register_renderer("lookup_booking", lambda result: _pretty_booking_details(parse_record(result)[1]))
+register_renderer("update_payment_status", _render_payment_update)
+
+def _iter_booking_list_lines(bookings):
+    if compact():
+        for booking in bookings:
+            yield record(id=booking.booking_id, hotel=booking.hotel_name, city=booking.hotel_city,
+                         price=float(booking.booking_price), paid=booking.is_paid) + "\n"
+        return
+    for booking in bookings:
+        payment_status = "✅" if booking.is_paid else "❌"
+        yield f"{payment_status} **ID {booking.booking_id}:** {booking.hotel_name} ({booking.hotel_city}) - €{booking.booking_price:.2f}\n"
+
+def _format_booking_list(bookings, title="📋 **Recent Bookings:**", next_cursor=None) -> str:
+    """
+    Render bookings one line at a time into a buffer, so `bookings` can be a
+    lazily streamed result instead of a materialized list.
+    """
+    lines = _iter_booking_list_lines(bookings)
+    first = next(lines, None)
+    if first is None:
+        return "no bookings" if compact() else "📋 No bookings found."
+
+    out = io.StringIO()
+    if not compact():
+        out.write(f"{title}\n\n")
+    out.write(first)
+    for line in lines:
+        out.write(line)
+    if next_cursor:
+        if compact():
+            out.write(record(next_cursor=next_cursor))
+        else:
+            out.write(f"\n➡️ More results available: pass cursor=\"{next_cursor}\" for the next page.")
+    return out.getvalue()
+
+MAX_PAGE_SIZE = 100
+
+def _encode_cursor(booking) -> str:
+    return f"{booking.created_date.isoformat()}:{booking.booking_id}"
+
+def _decode_cursor(cursor: str):
+    created, bid = cursor.rsplit(":", 1)
+    return datetime.strptime(created, '%Y-%m-%d').date(), int(bid)
+
+def _booking_search_query(hotel_city=None, hotel_name=None, checkin_from=None, checkin_to=None,
+                          is_paid=None, cursor=None, limit=10):
+    """
+    Build a keyset-paginated booking query, newest first.
+
+    Pages continue strictly after the (created_date, booking_id) of the
+    previous page's last row, so every page is an index range scan no
+    matter how deep it is, unlike LIMIT/OFFSET.
+    """
+    query = select(Booking)
+    if hotel_city:
+        query = query.where(Booking.hotel_city == hotel_city)
+    if hotel_name:
+        query = query.where(Booking.hotel_name.ilike(f"%{hotel_name}%"))
+    if checkin_from:
+        query = query.where(Booking.checkin_date >= datetime.strptime(checkin_from, '%Y-%m-%d').date())
+    if checkin_to:
+        query = query.where(Booking.checkin_date <= datetime.strptime(checkin_to, '%Y-%m-%d').date())
+    if is_paid is not None:
+        query = query.where(Booking.is_paid == is_paid)
+    if cursor:
+        query = query.where(tuple_(Booking.created_date, Booking.booking_id) < _decode_cursor(cursor))
+    # Fetch one extra row to learn whether another page exists
+    return query.order_by(Booking.created_date.desc(), Booking.booking_id.desc()).limit(limit + 1)
+
+def _paginate(bookings, limit):
+    """Split an over-fetched page into (rows, next cursor or None)."""
+    if len(bookings) > limit:
+        return bookings[:limit], _encode_cursor(bookings[limit - 1])
+    return bookings, None
+
+def _new_booking(hotel_name, hotel_city, hotel_country, checkin_date, checkout_date, booking_price):
+    """
+    Validate the booking request and build an unsaved Booking.
+
+    Raises:
+        ValueError: if a date is malformed (message mentions the format)
+    Returns:
+        Booking, or an error message string when validation fails
+    """
+    # Parse dates
+    checkin = datetime.strptime(checkin_date, '%Y-%m-%d').date()
+    checkout = datetime.strptime(checkout_date, '%Y-%m-%d').date()
+
+    # Validate dates
+    if checkin >= checkout:
+        return "Check-in date must be before check-out date."
+
+    if checkin < datetime.now().date():
+        return "Check-in date cannot be in the past."
+
+    if (checkout - checkin).days > STAY_MAX_NIGHTS:
+        return f"Stays are limited to {STAY_MAX_NIGHTS} nights."
+
+    return Booking(
+        hotel_name=hotel_name,
+        hotel_city=hotel_city,
+        hotel_country=hotel_country,
+        checkin_date=checkin,
+        checkout_date=checkout,
+        booking_price=float(booking_price),
+        created_date=datetime.now().date(),
+        is_paid=False
+    )
+
+def _format_booking_line(booking) -> str:
+    if compact():
+        fields = _booking_fields(booking)
+        del fields["created"]
+        return record(**fields)
+    payment_status = "✅" if booking.is_paid else "❌"
+    return (f"ID {booking.booking_id}: {booking.hotel_name} ({booking.hotel_city}, {booking.hotel_country}) "
+            f"{booking.checkin_date} → {booking.checkout_date} €{booking.booking_price:.2f} {payment_status}")
+
+def _parse_booking_ids(booking_ids):
+    """Split raw IDs into unique integer IDs (in request order) and invalid entries."""
+    ids, invalid = [], []
+    for raw in booking_ids:
+        try:
+            bid = int(str(raw).strip())
+        except ValueError:
+            invalid.append(str(raw))
+            continue
+        if bid not in ids:
+            ids.append(bid)
+    return ids, invalid
+
+def _format_batch_lookup(ids, invalid, found) -> str:
+    if compact():
+        lines = [_format_booking_line(found[bid]) if bid in found else record(id=bid, status="not_found")
+                 for bid in ids]
+        lines += [record(id=raw, status="invalid") for raw in invalid]
+        return record(found=f"{len(found)}/{len(ids) + len(invalid)}") + "\n" + "\n".join(lines)
+    lines = [_format_booking_line(found[bid]) if bid in found else f"ID {bid}: ❌ not found" for bid in ids]
+    lines += [f"{raw}: ❌ invalid booking ID" for raw in invalid]
+    return f"📋 {len(found)}/{len(ids) + len(invalid)} bookings found:\n" + "\n".join(lines)
+
+def _format_batch_payment(ids, invalid, updated, is_paid) -> str:
+    if compact():
+        lines = [record(id=bid, paid=is_paid) if bid in updated else record(id=bid, status="not_found")
+                 for bid in ids]
+        lines += [record(id=raw, status="invalid") for raw in invalid]
+        return record(updated=f"{len(updated)}/{len(ids) + len(invalid)}") + "\n" + "\n".join(lines)
+    status = "✅ Paid" if is_paid else "❌ Unpaid"
+    lines = [f"ID {bid}: {status}" if bid in updated else f"ID {bid}: ❌ not found" for bid in ids]
+    lines += [f"{raw}: ❌ invalid booking ID" for raw in invalid]
+    return f"💳 {len(updated)}/{len(ids) + len(invalid)} bookings updated:\n" + "\n".join(lines)
+
+# Write operations, run either in their own transaction or in a group commit
+
+def _insert_booking(new_booking):
+    def op(session):
+        # Raises RoomUnavailable, rolling the write back, if the last room went meanwhile
+        reserve(session, new_booking)
+        session.add(new_booking)
+        session.flush()
+        record_created(session, [new_booking])
+        return new_booking
+    return op
+
+def _set_payment_status(bid, is_paid):
+    def op(session):
+        # Row lock, so concurrent pay/unpay calls cannot both apply the rollup delta from the same old state
+        booking = session.scalars(
+            select(Booking).where(Booking.booking_id == bid).with_for_update()
+            .execution_options(populate_existing=True)
+        ).first()
+        if booking:
+            record_payment(session, [booking], is_paid)
+            booking.is_paid = is_paid
+        return booking
+    return op
+
+def _insert_bookings(new_bookings):
+    """
+    Reserve rooms for many bookings, then insert the ones that fit with a
+    single executemany INSERT ... RETURNING.
+
+    Returns (created Bookings, error lines for the stays that were full).
+    """
+    def op(session):
+        accepted, rejected = [], []
+        for booking in new_bookings:
+            try:
+                reserve(session, booking, accepted)
+                accepted.append(booking)
+            except RoomUnavailable as e:
+                rejected.append(error_result(str(e)))
+        if not accepted:
+            return accepted, rejected
+        rows = [
+            {column.key: getattr(b, column.key) for column in Booking.__table__.columns if column.key != "booking_id"}
+            for b in accepted
+        ]
+        booking_ids = session.scalars(
+            insert(Booking).returning(Booking.booking_id, sort_by_parameter_order=True), rows
+        ).all()
+        for booking, booking_id in zip(accepted, booking_ids):
+            booking.booking_id = booking_id
+        record_created(session, accepted)
+        return accepted, rejected
+    return op
+
+def _set_payment_statuses(ids, is_paid):
+    """Update many bookings with one UPDATE ... WHERE booking_id IN (...)."""
+    def op(session):
+        rows = session.execute(select(
+            Booking.booking_id, Booking.hotel_name, Booking.hotel_city, Booking.checkin_date,
+            Booking.booking_price, Booking.is_paid,
+        ).where(Booking.booking_id.in_(ids)).order_by(Booking.booking_id).with_for_update()).all()
+        found = {row.booking_id for row in rows}
+        if found:
+            record_payment(session, rows, is_paid)
+            session.execute(update(Booking).where(Booking.booking_id.in_(found)).values(is_paid=is_paid))
+        return found
+    return op
+
+
+class BookingRequest(BaseModel):
+    """One booking in a batch create request."""
+    hotel_name: str = Field(description="Name of the hotel")
+    hotel_city: str = Field(description="City where the hotel is located")
+    hotel_country: str = Field(description="Country where the hotel is located")
+    checkin_date: str = Field(description="Check-in date (format: YYYY-MM-DD)")
+    checkout_date: str = Field(description="Check-out date (format: YYYY-MM-DD)")
+    booking_price: float = Field(description="Total booking price in euros")
+
+def _validate_batch(bookings):
+    """Validate every requested booking, returning (valid Bookings, per-item error lines)."""
+    valid, errors = [], []
+    for i, spec in enumerate(bookings, 1):
+        hotel = spec.get("hotel_name") if isinstance(spec, dict) else spec.hotel_name
+        try:
+            if isinstance(spec, dict):
+                spec = BookingRequest(**spec)
+            new_booking = _new_booking(spec.hotel_name, spec.hotel_city, spec.hotel_country,
+                                       spec.checkin_date, spec.checkout_date, spec.booking_price)
+        except ValidationError as e:
+            fields = sorted({str(error["loc"][0]) for error in e.errors() if error["loc"]})
+            new_booking = f"Missing or invalid fields: {', '.join(fields)}."
+        except ValueError:
+            new_booking = "Invalid date format, use YYYY-MM-DD."
+        if isinstance(new_booking, str):
+            errors.append(record(item=i, hotel=hotel, error=new_booking) if compact()
+                          else f"#{i} {hotel}: ❌ {new_booking}")
+        else:
+            valid.append(new_booking)
+    return valid, errors
+
+def _format_availability(hotel_name, hotel_city, checkin, checkout, availability) -> str:
+    if compact():
+        return record("availability", hotel=hotel_name, city=hotel_city, checkin=checkin, checkout=checkout,
+                      rooms=availability.rooms, free=availability.available)
+    if availability.available:
+        return (f"✅ **{hotel_name}** ({hotel_city}) has {availability.available} of {availability.rooms} rooms "
+                f"free every night from {checkin} to {checkout}.")
+    return (f"❌ **{hotel_name}** ({hotel_city}) is fully booked on some nights between {checkin} and {checkout} "
+            f"({availability.rooms} rooms).")
+
+def _parse_stay(checkin_date, checkout_date):
+    """Parse and order-check a stay; raises ValueError on a malformed or empty range."""
+    checkin = datetime.strptime(checkin_date, '%Y-%m-%d').date()
+    checkout = datetime.strptime(checkout_date, '%Y-%m-%d').date()
+    if checkin >= checkout:
+        raise ValueError("check-in must be before check-out")
+    return checkin, checkout
+
+def _format_batch_create(created, errors) -> str:
+    if compact():
+        lines = [_format_booking_line(b) for b in created] + errors
+        return record(created=f"{len(created)}/{len(created) + len(errors)}", paid="no") + "\n" + "\n".join(lines)
+    lines = [f"✅ {_format_booking_line(b)}" for b in created] + errors
+    return f"🏨 {len(created)}/{len(created) + len(errors)} bookings created (payment pending):\n" + "\n".join(lines)
+
 
 @tool
 def lookup_booking(booking_id: str) -> str:
     """
     Look up booking details by booking ID.
-    
+
     Args:
         booking_id: The booking ID to search for (will be converted to integer)
-        
+
     Returns:
         str: Detailed booking information including hotel, dates, price, and payment status
     """
     try:
         # Convert booking_id to integer
         bid = int(booking_id.strip())
-        
+
         # Query the database for the booking
-        booking = session.query(Booking).filter_by(booking_id=bid).first()
-        
+        with session_scope() as session:
+            booking = session.query(Booking).filter_by(booking_id=bid).first()
+
         if booking:
-            # Format the booking details
-            payment_status = "✅ Paid" if booking.is_paid else "❌ Unpaid"
-            
-            booking_details = f"""
-📋 **Booking Details** (ID: {booking.booking_id})
-🏨 **Hotel:** {booking.hotel_name}
-📍 **Location:** {booking.hotel_city}, {booking.hotel_country}
-📅 **Created:** {booking.created_date.strftime('%Y-%m-%d') if booking.created_date else 'N/A'}
-🔗 **Check-in:** {booking.checkin_date.strftime('%Y-%m-%d') if booking.checkin_date else 'N/A'}
-🔚 **Check-out:** {booking.checkout_date.strftime('%Y-%m-%d') if booking.checkout_date else 'N/A'}
-💰 **Price:** €{booking.booking_price:.2f}
-💳 **Payment:** {payment_status}
-            """.strip()
-            
-            return booking_details
+            return _format_booking_details(booking)
         else:
-            return f"❌ No booking found for ID {bid}. Please check the booking ID and try again."
-            
+            return error_result(f"No booking found for ID {bid}. Please check the booking ID and try again.")
+
     except ValueError:
-        return "❌ Invalid booking ID format. Booking ID must be a number."
+        return error_result("Invalid booking ID format. Booking ID must be a number.")
     except Exception as e:
-        return f"❌ Error looking up booking: {str(e)}"
+        return error_result(f"Error looking up booking: {str(e)}")
+
+async def _alookup_booking(booking_id: str) -> str:
+    try:
+        bid = int(booking_id.strip())
+
+        async with async_session_scope() as session:
+            booking = await session.get(Booking, bid)
+
+        if booking:
+            return _format_booking_details(booking)
+        else:
+            return error_result(f"No booking found for ID {bid}. Please check the booking ID and try again.")
+
+    except ValueError:
+        return error_result("Invalid booking ID format. Booking ID must be a number.")
+    except Exception as e:
+        return error_result(f"Error looking up booking: {str(e)}")
 
 @tool
-def create_booking(hotel_name: str, hotel_city: str, hotel_country: str, 
+def create_booking(hotel_name: str, hotel_city: str, hotel_country: str,
                   checkin_date: str, checkout_date: str, booking_price: float) -> str:
     """
     Create a new hotel booking.
-    
+
     Args:
         hotel_name: Name of the hotel
         hotel_city: City where the hotel is located
@@ -58,121 +423,338 @@ def create_booking(hotel_name: str, hotel_city: str, hotel_country: str,
         checkin_date: Check-in date (format: YYYY-MM-DD)
         checkout_date: Check-out date (format: YYYY-MM-DD)
         booking_price: Total booking price in euros
-        
+
     Returns:
         str: Confirmation message with booking ID and details
     """
     try:
-        # Parse dates
-        checkin = datetime.strptime(checkin_date, '%Y-%m-%d').date()
-        checkout = datetime.strptime(checkout_date, '%Y-%m-%d').date()
-        
-        # Validate dates
-        if checkin >= checkout:
-            return "❌ Check-in date must be before check-out date."
-        
-        if checkin < datetime.now().date():
-            return "❌ Check-in date cannot be in the past."
-        
-        # Create new booking
-        new_booking = Booking(
-            hotel_name=hotel_name,
-            hotel_city=hotel_city,
-            hotel_country=hotel_country,
-            checkin_date=checkin,
-            checkout_date=checkout,
-            booking_price=float(booking_price),
-            created_date=datetime.now().date(),
-            is_paid=False
-        )
-        
+        new_booking = _new_booking(hotel_name, hotel_city, hotel_country,
+                                   checkin_date, checkout_date, booking_price)
+        if isinstance(new_booking, str):
+            return error_result(new_booking)
+
+        # Turn away stays the in-memory index already knows are full, without taking the write lock
+        index = get_availability_index()
+        availability = index.check(hotel_name, hotel_city, new_booking.checkin_date, new_booking.checkout_date)
+        if not availability.available:
+            return _format_availability(hotel_name, hotel_city, checkin_date, checkout_date, availability)
+
         # Add to database
-        session.add(new_booking)
-        session.commit()
-        
-        booking_confirmation = f"""
-✅ **Booking Created Successfully!**
-📋 **Booking ID:** {new_booking.booking_id}
-🏨 **Hotel:** {hotel_name}
-📍 **Location:** {hotel_city}, {hotel_country}
-🔗 **Check-in:** {checkin_date}
-🔚 **Check-out:** {checkout_date}
-💰 **Total Price:** €{booking_price:.2f}
-💳 **Payment Status:** Pending
+        run_write(_insert_booking(new_booking))
+        index.add(new_booking)
 
-Your booking has been created. Please proceed with payment to confirm your reservation.
-        """.strip()
-        
-        return booking_confirmation
-        
+        return _format_booking_confirmation(new_booking)
+
+    except RoomUnavailable as e:
+        return error_result(str(e))
     except ValueError as e:
-        return f"❌ Invalid date format. Please use YYYY-MM-DD format. Error: {str(e)}"
+        return error_result(f"Invalid date format. Please use YYYY-MM-DD format. Error: {str(e)}")
     except Exception as e:
-        session.rollback()
-        return f"❌ Error creating booking: {str(e)}"
+        return error_result(f"Error creating booking: {str(e)}")
+
+async def _acreate_booking(hotel_name: str, hotel_city: str, hotel_country: str,
+                           checkin_date: str, checkout_date: str, booking_price: float) -> str:
+    try:
+        new_booking = _new_booking(hotel_name, hotel_city, hotel_country,
+                                   checkin_date, checkout_date, booking_price)
+        if isinstance(new_booking, str):
+            return error_result(new_booking)
+
+        index = get_availability_index()
+        availability = await index.acheck(hotel_name, hotel_city, new_booking.checkin_date, new_booking.checkout_date)
+        if not availability.available:
+            return _format_availability(hotel_name, hotel_city, checkin_date, checkout_date, availability)
+
+        await arun_write(_insert_booking(new_booking))
+        index.add(new_booking)
+
+        return _format_booking_confirmation(new_booking)
+
+    except RoomUnavailable as e:
+        return error_result(str(e))
+    except ValueError as e:
+        return error_result(f"Invalid date format. Please use YYYY-MM-DD format. Error: {str(e)}")
+    except Exception as e:
+        return error_result(f"Error creating booking: {str(e)}")
 
 @tool
 def update_payment_status(booking_id: str, is_paid: bool) -> str:
     """
     Update the payment status of a booking.
-    
+
     Args:
         booking_id: The booking ID to update
         is_paid: True if payment is completed, False otherwise
-        
+
     Returns:
         str: Confirmation message of payment status update
     """
     try:
         bid = int(booking_id.strip())
-        
-        booking = session.query(Booking).filter_by(booking_id=bid).first()
-        
+
+        booking = run_write(_set_payment_status(bid, is_paid))
+
         if booking:
-            booking.is_paid = is_paid
-            session.commit()
-            
-            status = "✅ Paid" if is_paid else "❌ Unpaid"
-            return f"✅ Payment status updated for Booking {bid}: {status}"
+            return _format_payment_update(bid, is_paid)
+        else:
+            return error_result(f"No booking found for ID {bid}.")
+
+    except ValueError:
+        return error_result("Invalid booking ID format. Booking ID must be a number.")
+    except Exception as e:
+        return error_result(f"Error updating payment status: {str(e)}")
+
+async def _aupdate_payment_status(booking_id: str, is_paid: bool) -> str:
+    try:
+        bid = int(booking_id.strip())
+
+        booking = await arun_write(_set_payment_status(bid, is_paid))
+
+        if booking:
+            return _format_payment_update(bid, is_paid)
         else:
-            return f"❌ No booking found for ID {bid}."
-            
+            return error_result(f"No booking found for ID {bid}.")
+
     except ValueError:
-        return "❌ Invalid booking ID format. Booking ID must be a number."
+        return error_result("Invalid booking ID format. Booking ID must be a number.")
     except Exception as e:
-        session.rollback()
-        return f"❌ Error updating payment status: {str(e)}"
+        return error_result(f"Error updating payment status: {str(e)}")
 
 @tool
 def list_user_bookings(limit: int = 10) -> str:
     """
     List recent bookings (useful for admin or user overview).
-    
+
     Args:
         limit: Maximum number of bookings to return (default: 10)
-        
+
     Returns:
         str: List of recent bookings with basic details
     """
     try:
-        bookings = session.query(Booking).order_by(Booking.created_date.desc()).limit(limit).all()
-        
-        if not bookings:
-            return "📋 No bookings found."
-        
-        booking_list = "📋 **Recent Bookings:**\n\n"
-        
-        for booking in bookings:
-            payment_status = "✅" if booking.is_paid else "❌"
-            booking_list += f"{payment_status} **ID {booking.booking_id}:** {booking.hotel_name} ({booking.hotel_city}) - €{booking.booking_price:.2f}\n"
-        
-        return booking_list
-        
+        with session_scope() as session:
+            bookings = session.query(Booking).order_by(Booking.created_date.desc(), Booking.booking_id.desc()).limit(limit).all()
+
+        return _format_booking_list(bookings)
+
+    except Exception as e:
+        return error_result(f"Error retrieving bookings: {str(e)}")
+
+async def _alist_user_bookings(limit: int = 10) -> str:
+    try:
+        async with async_session_scope() as session:
+            result = await session.scalars(
+                select(Booking).order_by(Booking.created_date.desc(), Booking.booking_id.desc()).limit(limit)
+            )
+            bookings = result.all()
+
+        return _format_booking_list(bookings)
+
+    except Exception as e:
+        return error_result(f"Error retrieving bookings: {str(e)}")
+
+@tool
+def search_bookings(hotel_city: Optional[str] = None, hotel_name: Optional[str] = None,
+                    checkin_from: Optional[str] = None, checkin_to: Optional[str] = None,
+                    is_paid: Optional[bool] = None, cursor: Optional[str] = None, limit: int = 10) -> str:
+    """
+    Search bookings with filters, newest first, one page at a time.
+
+    Args:
+        hotel_city: Only bookings in this city (exact match)
+        hotel_name: Only bookings whose hotel name contains this text
+        checkin_from: Earliest check-in date (format: YYYY-MM-DD)
+        checkin_to: Latest check-in date (format: YYYY-MM-DD)
+        is_paid: Only paid (True) or unpaid (False) bookings
+        cursor: Cursor from a previous page to fetch the next one
+        limit: Page size (default: 10, max: 100)
+
+    Returns:
+        str: Matching bookings and, if there are more, the cursor for the next page
+    """
+    try:
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        query = _booking_search_query(hotel_city, hotel_name, checkin_from, checkin_to, is_paid, cursor, limit)
+
+        with session_scope() as session:
+            bookings, next_cursor = _paginate(session.scalars(query).all(), limit)
+
+        return _format_booking_list(bookings, "📋 **Matching Bookings:**", next_cursor)
+
+    except ValueError:
+        return error_result("Invalid date or cursor. Dates must use YYYY-MM-DD format.")
+    except Exception as e:
+        return error_result(f"Error searching bookings: {str(e)}")
+
+async def _asearch_bookings(hotel_city: Optional[str] = None, hotel_name: Optional[str] = None,
+                            checkin_from: Optional[str] = None, checkin_to: Optional[str] = None,
+                            is_paid: Optional[bool] = None, cursor: Optional[str] = None, limit: int = 10) -> str:
+    try:
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        query = _booking_search_query(hotel_city, hotel_name, checkin_from, checkin_to, is_paid, cursor, limit)
+
+        async with async_session_scope() as session:
+            result = await session.scalars(query)
+            bookings, next_cursor = _paginate(result.all(), limit)
+
+        return _format_booking_list(bookings, "📋 **Matching Bookings:**", next_cursor)
+
+    except ValueError:
+        return error_result("Invalid date or cursor. Dates must use YYYY-MM-DD format.")
+    except Exception as e:
+        return error_result(f"Error searching bookings: {str(e)}")
+
+@tool
+def lookup_bookings(booking_ids: List[str]) -> str:
+    """
+    Look up several bookings at once (one database query for all IDs).
+
+    Args:
+        booking_ids: The booking IDs to look up
+
+    Returns:
+        str: One compact line per requested ID with hotel, dates, price and payment status
+    """
+    try:
+        ids, invalid = _parse_booking_ids(booking_ids)
+
+        with session_scope() as session:
+            found = {b.booking_id: b for b in session.query(Booking).filter(Booking.booking_id.in_(ids))} if ids else {}
+
+        return _format_batch_lookup(ids, invalid, found)
+
+    except Exception as e:
+        return error_result(f"Error looking up bookings: {str(e)}")
+
+async def _alookup_bookings(booking_ids: List[str]) -> str:
+    try:
+        ids, invalid = _parse_booking_ids(booking_ids)
+
+        found = {}
+        if ids:
+            async with async_session_scope() as session:
+                result = await session.scalars(select(Booking).where(Booking.booking_id.in_(ids)))
+                found = {b.booking_id: b for b in result}
+
+        return _format_batch_lookup(ids, invalid, found)
+
+    except Exception as e:
+        return error_result(f"Error looking up bookings: {str(e)}")
+
+@tool
+def create_bookings(bookings: List[BookingRequest]) -> str:
+    """
+    Create several hotel bookings at once (e.g. for group travel) in a single transaction.
+
+    Args:
+        bookings: The bookings to create, each with hotel name, city, country, check-in/check-out dates and price
+
+    Returns:
+        str: One line per requested booking with its new booking ID or the reason it was rejected
+    """
+    try:
+        valid, errors = _validate_batch(bookings)
+        created, full = run_write(_insert_bookings(valid)) if valid else ([], [])
+        for booking in created:
+            get_availability_index().add(booking)
+        return _format_batch_create(created, errors + full)
+
+    except Exception as e:
+        return error_result(f"Error creating bookings: {str(e)}")
+
+async def _acreate_bookings(bookings: List[BookingRequest]) -> str:
+    try:
+        valid, errors = _validate_batch(bookings)
+        created, full = await arun_write(_insert_bookings(valid)) if valid else ([], [])
+        for booking in created:
+            get_availability_index().add(booking)
+        return _format_batch_create(created, errors + full)
+
     except Exception as e:
-        return f"❌ Error retrieving bookings: {str(e)}"
+        return error_result(f"Error creating bookings: {str(e)}")
+
+@tool
+def check_availability(hotel_name: str, hotel_city: str, checkin_date: str, checkout_date: str) -> str:
+    """
+    Check whether a hotel has a free room on every night of a stay, before booking it.
+
+    Args:
+        hotel_name: Name of the hotel
+        hotel_city: City where the hotel is located
+        checkin_date: Check-in date (format: YYYY-MM-DD)
+        checkout_date: Check-out date (format: YYYY-MM-DD)
+
+    Returns:
+        str: How many rooms are free for the whole stay, or that the hotel is fully booked
+    """
+    try:
+        checkin, checkout = _parse_stay(checkin_date, checkout_date)
+        availability = get_availability_index().check(hotel_name, hotel_city, checkin, checkout)
+        return _format_availability(hotel_name, hotel_city, checkin_date, checkout_date, availability)
+
+    except ValueError:
+        return error_result("Invalid stay. Use YYYY-MM-DD dates with check-in before check-out.")
+    except Exception as e:
+        return error_result(f"Error checking availability: {str(e)}")
+
+async def _acheck_availability(hotel_name: str, hotel_city: str, checkin_date: str, checkout_date: str) -> str:
+    try:
+        checkin, checkout = _parse_stay(checkin_date, checkout_date)
+        availability = await get_availability_index().acheck(hotel_name, hotel_city, checkin, checkout)
+        return _format_availability(hotel_name, hotel_city, checkin_date, checkout_date, availability)
+
+    except ValueError:
+        return error_result("Invalid stay. Use YYYY-MM-DD dates with check-in before check-out.")
+    except Exception as e:
+        return error_result(f"Error checking availability: {str(e)}")
+
+@tool
+def update_payment_statuses(booking_ids: List[str], is_paid: bool) -> str:
+    """
+    Update the payment status of several bookings at once (one database update for all IDs).
+
+    Args:
+        booking_ids: The booking IDs to update
+        is_paid: True if payment is completed, False otherwise
+
+    Returns:
+        str: One line per requested ID with its new payment status or why it was not updated
+    """
+    try:
+        ids, invalid = _parse_booking_ids(booking_ids)
+        updated = run_write(_set_payment_statuses(ids, is_paid)) if ids else set()
+        return _format_batch_payment(ids, invalid, updated, is_paid)
+
+    except Exception as e:
+        return error_result(f"Error updating payment statuses: {str(e)}")
+
+async def _aupdate_payment_statuses(booking_ids: List[str], is_paid: bool) -> str:
+    try:
+        ids, invalid = _parse_booking_ids(booking_ids)
+        updated = await arun_write(_set_payment_statuses(ids, is_paid)) if ids else set()
+        return _format_batch_payment(ids, invalid, updated, is_paid)
+
+    except Exception as e:
+        return error_result(f"Error updating payment statuses: {str(e)}")
+
+# Native async implementations, awaited by the tool node under app.ainvoke/astream
+lookup_booking.coroutine = _alookup_booking
+create_booking.coroutine = _acreate_booking
+update_payment_status.coroutine = _aupdate_payment_status
+list_user_bookings.coroutine = _alist_user_bookings
+search_bookings.coroutine = _asearch_bookings
+lookup_bookings.coroutine = _alookup_bookings
+create_bookings.coroutine = _acreate_bookings
+update_payment_statuses.coroutine = _aupdate_payment_statuses
+check_availability.coroutine = _acheck_availability
 
 # Export tools for use in LangGraph
 booking_lookup_tool = lookup_booking
 booking_create_tool = create_booking
 payment_update_tool = update_payment_status
-booking_list_tool = list_user_bookings
\ No newline at end of file
+booking_list_tool = list_user_bookings
+booking_search_tool = search_bookings
+batch_lookup_tool = lookup_bookings
+batch_create_tool = create_bookings
+batch_payment_update_tool = update_payment_statuses
+availability_tool = check_availability
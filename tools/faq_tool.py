@@ -1,62 +1,290 @@
+import asyncio
 import os
+from collections import Counter
+from typing import Optional
 from dotenv import load_dotenv
-from langchain_openai import OpenAIEmbeddings
-from langchain_community.vectorstores import FAISS
-from langchain_community.document_loaders import PyPDFLoader
 from langchain_core.tools import tool
+from metrics.instrumentation import register_collector, span
+from rag.lexical import reciprocal_rank_fusion
+from rag.rag import index_path_for, load_lexical_index, load_or_build_vectorstore
+from rag.shards import Shard, ShardedFAQIndex
+from rag.query_cache import LRUCache, SemanticCache, normalize_query
+from tools.output import compact, error_result, output_mode
 
 
 load_dotenv()
 
-# Global vectorstore variable
+FAQ_FILE = "./document/hotel_faq_document.pdf"
+FAQ_TOP_K = int(os.getenv("FAQ_TOP_K", "3"))
+# Candidates per retriever before reciprocal rank fusion
+FAQ_CANDIDATES = int(os.getenv("FAQ_CANDIDATES", "10"))
+FAQ_HYBRID = os.getenv("FAQ_HYBRID", "1").lower() in ("1", "true", "yes")
+FAQ_LEXICAL_FAST_PATH = os.getenv("FAQ_LEXICAL_FAST_PATH", "1").lower() in ("1", "true", "yes")
+
+# Global vectorstore and the BM25 index built alongside it
 _vectorstore = None
+_lexical_index = None
+
+# Per-property shards from `python -m rag.ingest`; when present they replace the single FAQ index
+_shards = None
+
+# Queries, lexical fast-path answers and remote embedding calls
+_retrieval_stats = Counter()
+
+FAQ_CACHE_TTL = float(os.getenv("FAQ_CACHE_TTL", "3600"))
+FAQ_SEMANTIC_THRESHOLD = float(os.getenv("FAQ_SEMANTIC_THRESHOLD", "0.95"))
+
+# Query caches: normalized query -> embedding, and embedding -> top-k results
+_query_embeddings = LRUCache(
+    maxsize=int(os.getenv("FAQ_EMBEDDING_CACHE_SIZE", "2048")),
+    ttl=FAQ_CACHE_TTL,
+)
+# Result caches per (property, or None for every property, tool output mode);
+# results are rendered for one mode, so each mode has its own
+_result_caches = {}
+
+def _initialize_shards():
+    """Discover the per-property FAQ shards, returning None when none have been ingested."""
+    global _shards
+    if _shards is None:
+        _shards = ShardedFAQIndex()
+        if len(_shards):
+            print(f"Found FAQ shards for {len(_shards)} properties")
+    return _shards if len(_shards) else None
 
 def _initialize_vectorstore():
-    """Initialize the vectorstore if not already done."""
-    global _vectorstore
+    """Initialize the vectorstore if not already done, reusing the on-disk index cache."""
+    global _vectorstore, _lexical_index
     if _vectorstore is None:
-        file_path = "./document/hotel_faq_document.pdf"
-        
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"PDF file not found at {file_path}")
-        
-        loader = PyPDFLoader(file_path)
-        docs = loader.load()
-        print(f"Loaded {len(docs)} documents for FAQ tool.")
-        
-        emb = OpenAIEmbeddings(model="text-embedding-3-large", chunk_size=1000)
-        _vectorstore = FAISS.from_documents(docs, emb)
+        vectorstore = load_or_build_vectorstore(FAQ_FILE)
+        _lexical_index = load_lexical_index(vectorstore, index_path_for(FAQ_FILE))
+        _vectorstore = vectorstore
+        for (name, _), cache in list(_result_caches.items()):
+            if name is None:
+                cache.clear()
         print(f"Vectorstore initialized with {_vectorstore.index.ntotal} vectors")
-    
+
     return _vectorstore
 
+def _embed_query(vectorstore, query: str):
+    """Embed a query, reusing the embedding of any identical normalized query."""
+    key = normalize_query(query)
+    embedding = _query_embeddings.get(key)
+    if embedding is None:
+        _retrieval_stats["embedding_calls"] += 1
+        with span("embedding", op="query"):
+            embedding = vectorstore.embeddings.embed_query(key)
+        _query_embeddings.put(key, embedding)
+    return embedding
+
+async def _aembed_query(vectorstore, query: str):
+    key = normalize_query(query)
+    embedding = _query_embeddings.get(key)
+    if embedding is None:
+        _retrieval_stats["embedding_calls"] += 1
+        with span("embedding", op="query"):
+            embedding = await vectorstore.embeddings.aembed_query(key)
+        _query_embeddings.put(key, embedding)
+    return embedding
+
+def initialize_index():
+    """Load the FAQ index up front: the shard list if properties were ingested, else the single FAQ store."""
+    if _initialize_shards() is None:
+        _initialize_vectorstore()
+
+def _result_cache(name: Optional[str] = None) -> SemanticCache:
+    """Result cache for one property's queries (or, with no name, every property's) in the current output mode."""
+    key = (name, output_mode())
+    cache = _result_caches.get(key)
+    if cache is None:
+        if name is None:
+            maxsize = int(os.getenv("FAQ_RESULT_CACHE_SIZE", "512"))
+        else:
+            maxsize = int(os.getenv("FAQ_PROPERTY_RESULT_CACHE_SIZE", "64"))
+        cache = _result_caches.setdefault(key, SemanticCache(
+            maxsize=maxsize, threshold=FAQ_SEMANTIC_THRESHOLD, ttl=FAQ_CACHE_TTL,
+        ))
+    return cache
+
+def _targets(hotel: Optional[str] = None):
+    """
+    The shards a query searches, the result cache for that scope, and a
+    note for the answer.
+
+    With per-property shards, a query naming a known hotel searches only
+    that hotel's shard; any other query fans out across every property.
+    Without shards, the single FAQ store acts as the only shard.
+
+    Returns:
+        tuple: (list of Shard, SemanticCache, note prefix)
+    """
+    index = _initialize_shards()
+    if index is None:
+        vectorstore = _initialize_vectorstore()
+        return [Shard("faq", None, vectorstore, _lexical_index)], _result_cache(), ""
+    note = ""
+    if hotel:
+        name = index.resolve(hotel)
+        if name is not None:
+            return [index.shard(name)], _result_cache(name), ""
+        note = f"No FAQ found for {hotel}; showing results across all properties.\n\n"
+    return index.all(), _result_cache(), note
+
+def _join_chunks(shards, keys) -> str:
+    """Text of the (shard position, chunk ID) keys, labelled with their hotel when several shards were searched."""
+    parts, seen = [], set()
+    for position, cid in keys:
+        shard = shards[position]
+        doc = shard.vectorstore.docstore.search(cid)
+        if doc is None or isinstance(doc, str):
+            continue
+        text = doc.page_content
+        if compact():
+            # PDF extraction leaves runs of spaces and line breaks, and overlapping chunks repeat
+            text = " ".join(text.split())
+            if text in seen:
+                continue
+            seen.add(text)
+        parts.append(f"[{shard.hotel}] {text}" if len(shards) > 1 else text)
+    return "\n\n".join(parts)
+
+def _lexical_fast_path(shards, query: str):
+    """
+    BM25 candidates for `query`, plus the answer itself when the keyword match
+    is confident enough to skip the embedding call entirely.
+
+    BM25 scores are only comparable within one shard, so the fast path is
+    taken for single-shard searches only. Fan-out queries merge the shards'
+    rankings by rank (reciprocal rank fusion), not by raw score.
+
+    Returns:
+        tuple: (result or None, BM25 hits as ((shard position, chunk ID), score),
+            where the score is BM25 for one shard and the fused rank score for several)
+    """
+    _retrieval_stats["queries"] += 1
+    rankings = []
+    with span("lexical_search"):
+        for position, shard in enumerate(shards):
+            if shard.lexical is not None:
+                ranking = shard.lexical.search(query, FAQ_CANDIDATES)
+                rankings.append([((position, cid), score) for cid, score in ranking])
+    if len(rankings) == 1:
+        hits = rankings[0][:FAQ_CANDIDATES]
+    else:
+        hits = reciprocal_rank_fusion([[key for key, _ in ranking] for ranking in rankings], limit=FAQ_CANDIDATES)
+    if FAQ_LEXICAL_FAST_PATH and len(shards) == 1 and hits and shards[0].lexical.confident(query, hits):
+        _retrieval_stats["lexical_fast_path"] += 1
+        return _join_chunks(shards, [key for key, _ in hits[:FAQ_TOP_K]]), hits
+    return None, hits
+
+def _vector_result(shards, cache, embedding, hits) -> str:
+    """Top chunks for a query embedding across `shards`, fused with the BM25 ranking when hybrid retrieval is on."""
+    # Reuse the answer of a semantically equivalent earlier query
+    result = cache.lookup(embedding)
+    if result is not None:
+        return result
+
+    hybrid = FAQ_HYBRID and bool(hits)
+    k = FAQ_CANDIDATES if hybrid else FAQ_TOP_K
+    scored = []
+    # In-memory FAISS search is CPU-bound and fast; no need for a thread hop
+    with span("vector_search"):
+        for position, shard in enumerate(shards):
+            for doc, distance in shard.vectorstore.similarity_search_with_score_by_vector(embedding, k=k):
+                scored.append((distance, (position, doc.metadata.get("chunk_id"))))
+    # Every shard is embedded with the same model, so L2 distances compare across shards
+    scored.sort(key=lambda item: item[0])
+    vector_keys = [key for _, key in scored[:k]]
+
+    if not vector_keys:
+        return "No relevant FAQ information found for your query."
+
+    if hybrid:
+        keys = [key for key, _ in reciprocal_rank_fusion([vector_keys, [key for key, _ in hits]], limit=FAQ_TOP_K)]
+    else:
+        keys = vector_keys[:FAQ_TOP_K]
+    result = _join_chunks(shards, keys)
+    cache.add(embedding, result)
+
+    return result
+
+def faq_retrieval_stats() -> dict:
+    """How many FAQ queries were answered without a remote embedding call."""
+    queries = _retrieval_stats["queries"]
+    return {
+        "queries": queries,
+        "lexical_fast_path": _retrieval_stats["lexical_fast_path"],
+        "embedding_calls": _retrieval_stats["embedding_calls"],
+        "served_without_network": 1 - _retrieval_stats["embedding_calls"] / queries if queries else 0.0,
+    }
+
+def faq_cache_stats() -> dict:
+    """Hit/miss counters for the FAQ query caches, for tuning the semantic threshold."""
+    def totals(caches):
+        hits, misses = sum(cache.hits for cache in caches), sum(cache.misses for cache in caches)
+        return {
+            "caches": len(caches),
+            "size": sum(cache.stats()["size"] for cache in caches),
+            "threshold": FAQ_SEMANTIC_THRESHOLD,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+        }
+
+    caches = list(_result_caches.items())
+    return {
+        "embeddings": _query_embeddings.stats(),
+        "results": totals([cache for (name, _), cache in caches if name is None]),
+        "property_results": totals([cache for (name, _), cache in caches if name is not None]),
+        "retrieval": faq_retrieval_stats(),
+        "shards": _shards.stats() if _shards is not None else {},
+    }
+
+register_collector("faq_cache", faq_cache_stats)
+
 @tool
-def search_hotel_faq(query: str) -> str:
+def search_hotel_faq(query: str, hotel: Optional[str] = None) -> str:
     """
     Search hotel FAQ documents for relevant information.
-    
+
     Args:
         query: The question or topic to search for in the FAQ documents
-        
+        hotel: Name of the hotel the question is about; omit to search every property's FAQ
+
     Returns:
         str: Relevant FAQ content that answers the query
     """
     try:
-        vectorstore = _initialize_vectorstore()
-        
-        # Search for relevant documents
-        relevant_docs = vectorstore.similarity_search(query, k=3)
-        
-        if not relevant_docs:
-            return "No relevant FAQ information found for your query."
-        
-        # Combine the content from relevant documents
-        result = "\n\n".join([doc.page_content for doc in relevant_docs])
-        
-        return result
-        
+        shards, cache, note = _targets(hotel)
+        result, hits = _lexical_fast_path(shards, query)
+        if result is not None:
+            return note + result
+
+        embedding = _embed_query(shards[0].vectorstore, query)
+        return note + _vector_result(shards, cache, embedding, hits)
+
     except Exception as e:
-        return f"Error searching FAQ: {str(e)}"
+        return error_result(f"Error searching FAQ: {str(e)}")
+
+async def _asearch_hotel_faq(query: str, hotel: Optional[str] = None) -> str:
+    try:
+        # Loading the index (or a shard) touches disk, so keep it off the event loop
+        if _vectorstore is not None:
+            shards, cache, note = _targets(hotel)
+        else:
+            shards, cache, note = await asyncio.to_thread(_targets, hotel)
+        result, hits = _lexical_fast_path(shards, query)
+        if result is not None:
+            return note + result
+
+        embedding = await _aembed_query(shards[0].vectorstore, query)
+        return note + _vector_result(shards, cache, embedding, hits)
+
+    except Exception as e:
+        return error_result(f"Error searching FAQ: {str(e)}")
+
+# Native async implementation, awaited by the tool node under app.ainvoke/astream
+search_hotel_faq.coroutine = _asearch_hotel_faq
 
 # Export the tool for use in LangGraph
-faq_tool = search_hotel_faq
\ No newline at end of file
+faq_tool = search_hotel_faq
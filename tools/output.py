@@ -0,0 +1,137 @@
+"""
+How tools render their results.
+
+Tool results are fed back into the prompt of every later LLM call in the
+turn, and into the conversation history. By default tools therefore return
+a compact, machine-oriented form:
+- one `key=value` record per line, and `error=...` for failures;
+- search snippets truncated;
+- duplicate links dropped.
+
+TOOL_OUTPUT_MODE=pretty restores the emoji-decorated markdown. When a tool
+result is shown to the user without going through the LLM (the fast path),
+`render_for_user` turns the compact form back into the pretty one.
+"""
+import json
+import os
+import re
+import shlex
+from datetime import date, datetime
+from urllib.parse import urlsplit
+
+TOOL_OUTPUT_MODE = os.getenv("TOOL_OUTPUT_MODE", "compact")
+TOOL_SNIPPET_CHARS = int(os.getenv("TOOL_SNIPPET_CHARS", "160"))
+
+MODES = ("compact", "pretty")
+
+_mode = TOOL_OUTPUT_MODE if TOOL_OUTPUT_MODE in MODES else "compact"
+_renderers = {}
+
+
+def set_output_mode(mode: str) -> None:
+    """Switch every tool between "compact" and "pretty" results at runtime."""
+    global _mode
+    if mode not in MODES:
+        raise ValueError(f"Unknown tool output mode {mode!r}, expected one of {', '.join(MODES)}")
+    _mode = mode
+
+
+def output_mode() -> str:
+    return _mode
+
+
+def compact() -> bool:
+    return _mode == "compact"
+
+
+def value(v) -> str:
+    """Wire form of one field: yes/no, 2-decimal amounts, ISO dates, '-' for missing."""
+    if v is None:
+        return "-"
+    if isinstance(v, bool):
+        return "yes" if v else "no"
+    if isinstance(v, float):
+        return f"{v:.2f}"
+    if isinstance(v, datetime):
+        return v.date().isoformat()
+    if isinstance(v, date):
+        return v.isoformat()
+    return str(v)
+
+
+def _quote(text: str) -> str:
+    if text and not re.search(r'[\s"\'=\\]', text):
+        return text
+    return json.dumps(text, ensure_ascii=False)
+
+
+def record(kind: str = None, **fields) -> str:
+    """One result as `kind key=value ...`, quoting values that contain spaces."""
+    parts = [kind] if kind else []
+    parts += [f"{key}={_quote(value(v))}" for key, v in fields.items()]
+    return " ".join(parts)
+
+
+def error_result(message: str) -> str:
+    """A failed tool result: an `error=...` record, or "❌ message" in pretty mode."""
+    if compact():
+        return record(error=message)
+    return f"❌ {message}"
+
+
+def is_error(result: str) -> bool:
+    """Whether a tool result is an `error_result`, in either mode."""
+    return result.startswith(("❌", "error="))
+
+
+def parse_record(line: str):
+    """
+    Inverse of `record`.
+
+    Returns:
+        tuple: (kind or None, dict of field -> string)
+    """
+    kind, fields = None, {}
+    for token in shlex.split(line):
+        key, sep, val = token.partition("=")
+        if sep:
+            fields[key] = val
+        elif kind is None and not fields:
+            kind = token
+    return kind, fields
+
+
+def truncate(text: str, limit: int = TOOL_SNIPPET_CHARS) -> str:
+    """Collapse whitespace and cut at a word boundary, marking the cut with an ellipsis."""
+    text = " ".join((text or "").split())
+    if len(text) <= limit:
+        return text
+    cut = text[:limit].rsplit(" ", 1)[0]
+    return cut.rstrip(",.;:") + "…"
+
+
+def link_key(url: str) -> str:
+    """Host and path of a link, so http/https, www. and trailing-slash variants count as one."""
+    parts = urlsplit(url or "")
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    return host + parts.path.rstrip("/")
+
+
+def register_renderer(tool_name: str, render) -> None:
+    """Register `render(compact result) -> pretty text` for a tool's results shown to the user."""
+    _renderers[tool_name] = render
+
+
+def render_for_user(tool_name: str, result: str) -> str:
+    """Pretty form of a tool result; already-pretty results pass through unchanged."""
+    if result.startswith("error="):
+        return f"❌ {parse_record(result)[1]['error']}"
+    render = _renderers.get(tool_name)
+    if render is None or not compact() or is_error(result):
+        return result
+    try:
+        return render(result)
+    except (ValueError, KeyError):
+        return result
@@ -0,0 +1,308 @@
+import asyncio
+import contextvars
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from langchain_core.messages import ToolMessage
+from metrics.instrumentation import span
+from search.cache import bypass_inflight
+from tools.output import error_result
+
+TOOL_TURN_BUDGET = float(os.getenv("TOOL_TURN_BUDGET", "20"))
+TOOL_DEFAULT_TIMEOUT = float(os.getenv("TOOL_DEFAULT_TIMEOUT", "10"))
+TOOL_SEARCH_TIMEOUT = float(os.getenv("TOOL_SEARCH_TIMEOUT", "8"))
+TOOL_SEARCH_HEDGE_AFTER = float(os.getenv("TOOL_SEARCH_HEDGE_AFTER", "2"))
+TOOL_RETRY_BACKOFF = float(os.getenv("TOOL_RETRY_BACKOFF", "0.25"))
+TOOL_MAX_WORKERS = int(os.getenv("TOOL_MAX_WORKERS", "32"))
+
+
+class ToolPolicy:
+    """
+    How one tool is scheduled.
+
+    Args:
+        timeout: Seconds a single attempt may take.
+        retries: Extra attempts after a timeout or error (only if `idempotent`).
+        hedge_after: Seconds after which a duplicate request is raced against
+            a slow first attempt, or None to never hedge.
+        idempotent: Whether repeating the call is safe. Non-idempotent tools
+            (booking creation) are never retried or hedged.
+    """
+
+    def __init__(self, timeout: float = TOOL_DEFAULT_TIMEOUT, retries: int = 0,
+                 hedge_after: float = None, idempotent: bool = True):
+        self.timeout = timeout
+        self.retries = retries if idempotent else 0
+        self.hedge_after = hedge_after if idempotent else None
+        self.idempotent = idempotent
+
+
+DEFAULT_POLICIES = {
+    "search_travel_info": ToolPolicy(TOOL_SEARCH_TIMEOUT, retries=1, hedge_after=TOOL_SEARCH_HEDGE_AFTER),
+    "search_hotels": ToolPolicy(TOOL_SEARCH_TIMEOUT, retries=1, hedge_after=TOOL_SEARCH_HEDGE_AFTER),
+    "search_flights": ToolPolicy(TOOL_SEARCH_TIMEOUT, retries=1, hedge_after=TOOL_SEARCH_HEDGE_AFTER),
+    "search_hotel_faq": ToolPolicy(6.0, retries=1),
+    "lookup_booking": ToolPolicy(5.0, retries=1),
+    "lookup_bookings": ToolPolicy(5.0, retries=1),
+    "list_user_bookings": ToolPolicy(5.0, retries=1),
+    "search_bookings": ToolPolicy(5.0, retries=1),
+    "update_payment_status": ToolPolicy(5.0, retries=1),
+    "update_payment_statuses": ToolPolicy(5.0, retries=1),
+    "check_availability": ToolPolicy(5.0, retries=1),
+    "booking_analytics": ToolPolicy(5.0, retries=1),
+    "create_booking": ToolPolicy(10.0, idempotent=False),
+    "create_bookings": ToolPolicy(15.0, idempotent=False),
+}
+
+
+def _backoff(attempt: int) -> float:
+    # Exponential backoff with full jitter
+    return random.uniform(0, TOOL_RETRY_BACKOFF * 2 ** attempt)
+
+
+def _hedged(func, *args):
+    # Runs in its own context copy, so only this request skips search coalescing
+    bypass_inflight.set(True)
+    return func(*args)
+
+
+async def _ahedged(coro_func, *args):
+    bypass_inflight.set(True)
+    return await coro_func(*args)
+
+
+class ToolScheduler:
+    """
+    Graph node that executes the tool calls of the last AI message.
+
+    Replaces `ToolNode` with scheduling suited to slow external APIs:
+
+    - all calls of a turn run concurrently, each with its own timeout, and
+      none may run past the overall turn budget;
+    - idempotent tools are retried after an error or timeout, with jittered
+      exponential backoff, while budget remains;
+    - search tools can be hedged: if the first request is still running after
+      `hedge_after` seconds, a duplicate is started and the first answer wins;
+    - a call that misses its deadline or keeps failing still gets a
+      ToolMessage explaining what happened, so the LLM can answer with the
+      results that did arrive.
+
+    The async path cancels late attempts; the sync path runs tools on a
+    thread pool and abandons them at the deadline (threads cannot be killed).
+    """
+
+    def __init__(self, tools, policies: dict = None, turn_budget: float = TOOL_TURN_BUDGET,
+                 max_workers: int = TOOL_MAX_WORKERS):
+        self.tools = {t.name: t for t in tools}
+        self.policies = {**DEFAULT_POLICIES, **(policies or {})}
+        self.turn_budget = turn_budget
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool")
+        self._stats = defaultdict(lambda: defaultdict(float))
+        self._lock = threading.Lock()
+
+    def policy(self, name: str) -> ToolPolicy:
+        return self.policies.get(name) or ToolPolicy()
+
+    def _count(self, name: str, key: str, amount: float = 1) -> None:
+        with self._lock:
+            self._stats[name][key] += amount
+
+    @staticmethod
+    def _tool_calls(state):
+        messages = state.get("messages", [])
+        return getattr(messages[-1], "tool_calls", None) or [] if messages else []
+
+    def _message(self, call, content: str, status: str = "success") -> ToolMessage:
+        return ToolMessage(content=content, tool_call_id=call["id"], name=call["name"], status=status)
+
+    def _unknown(self, call) -> ToolMessage:
+        return self._message(
+            call, error_result(f"{call['name']} is not a valid tool, try one of [{', '.join(self.tools)}]."), "error"
+        )
+
+    def _failure(self, call, policy: ToolPolicy, error) -> ToolMessage:
+        name = call["name"]
+        if isinstance(error, TimeoutError):
+            self._count(name, "timeouts")
+            content = f"⏱️ {name} did not respond in time; no results are available from it for this request."
+            if not policy.idempotent:
+                content += " The operation may still have completed, so check before trying again."
+        else:
+            self._count(name, "errors")
+            content = error_result(f"{name} failed: {error}")
+        return self._message(call, content, "error")
+
+    def _attempt_timeout(self, policy: ToolPolicy, deadline: float):
+        return min(policy.timeout, deadline - time.monotonic())
+
+    # Sync path (app.invoke)
+
+    def _race(self, name: str, policy: ToolPolicy, args, config, timeout: float):
+        started = time.monotonic()
+        tool = self.tools[name]
+        futures = [self._executor.submit(contextvars.copy_context().run, tool.invoke, args, config)]
+        if policy.hedge_after is not None and policy.hedge_after < timeout:
+            done, _ = wait(futures, timeout=policy.hedge_after)
+            if not done:
+                self._count(name, "hedges")
+                futures.append(self._executor.submit(
+                    contextvars.copy_context().run, _hedged, tool.invoke, args, config
+                ))
+
+        error = TimeoutError()
+        pending = set(futures)
+        while pending:
+            remaining = timeout - (time.monotonic() - started)
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.cancelled():
+                    continue
+                if future.exception() is None:
+                    if future is not futures[0]:
+                        self._count(name, "hedge_wins")
+                    for other in pending:
+                        other.cancel()
+                    return future.result()
+                error = future.exception()
+        for future in pending:
+            future.cancel()
+        raise error
+
+    def _run_call(self, call, config, deadline: float) -> ToolMessage:
+        with span("tool", tool=call["name"]) as timing:
+            message = self._execute(call, config, deadline)
+            timing.labels["status"] = message.status
+        return message
+
+    def _execute(self, call, config, deadline: float) -> ToolMessage:
+        name = call["name"]
+        if name not in self.tools:
+            return self._unknown(call)
+        policy = self.policy(name)
+        started = time.monotonic()
+        self._count(name, "calls")
+
+        error = TimeoutError()
+        for attempt in range(policy.retries + 1):
+            timeout = self._attempt_timeout(policy, deadline)
+            if timeout <= 0:
+                break
+            if attempt:
+                self._count(name, "retries")
+            try:
+                content = self._race(name, policy, call["args"], config, timeout)
+                self._count(name, "ok")
+                self._count(name, "latency_ms", (time.monotonic() - started) * 1000)
+                return self._message(call, str(content))
+            except ValueError as e:
+                # Bad arguments: retrying will not help
+                error = e
+                break
+            except Exception as e:
+                error = e
+            if attempt < policy.retries:
+                time.sleep(min(_backoff(attempt), max(0.0, deadline - time.monotonic())))
+        return self._failure(call, policy, error)
+
+    def __call__(self, state, config=None):
+        calls = self._tool_calls(state)
+        deadline = time.monotonic() + self.turn_budget
+        if len(calls) == 1:
+            return {"messages": [self._run_call(calls[0], config, deadline)]}
+        with ThreadPoolExecutor(max_workers=max(1, len(calls)), thread_name_prefix="tool-call") as pool:
+            # Copy the context into each thread so tool spans join the request's trace
+            futures = [pool.submit(contextvars.copy_context().run, self._run_call, call, config, deadline)
+                       for call in calls]
+            messages = [future.result() for future in futures]
+        return {"messages": messages}
+
+    # Async path (app.ainvoke / astream)
+
+    async def _arace(self, name: str, policy: ToolPolicy, args, config, timeout: float):
+        started = time.monotonic()
+        tool = self.tools[name]
+        primary = asyncio.create_task(tool.ainvoke(args, config))
+        tasks = [primary]
+        if policy.hedge_after is not None and policy.hedge_after < timeout:
+            done, _ = await asyncio.wait(tasks, timeout=policy.hedge_after)
+            if not done:
+                self._count(name, "hedges")
+                tasks.append(asyncio.create_task(_ahedged(tool.ainvoke, args, config)))
+
+        error = TimeoutError()
+        pending = set(tasks)
+        try:
+            while pending:
+                remaining = timeout - (time.monotonic() - started)
+                if remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.cancelled():
+                        continue
+                    if task.exception() is None:
+                        if task is not primary:
+                            self._count(name, "hedge_wins")
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _arun_call(self, call, config, deadline: float) -> ToolMessage:
+        with span("tool", tool=call["name"]) as timing:
+            message = await self._aexecute(call, config, deadline)
+            timing.labels["status"] = message.status
+        return message
+
+    async def _aexecute(self, call, config, deadline: float) -> ToolMessage:
+        name = call["name"]
+        if name not in self.tools:
+            return self._unknown(call)
+        policy = self.policy(name)
+        started = time.monotonic()
+        self._count(name, "calls")
+
+        error = TimeoutError()
+        for attempt in range(policy.retries + 1):
+            timeout = self._attempt_timeout(policy, deadline)
+            if timeout <= 0:
+                break
+            if attempt:
+                self._count(name, "retries")
+            try:
+                content = await self._arace(name, policy, call["args"], config, timeout)
+                self._count(name, "ok")
+                self._count(name, "latency_ms", (time.monotonic() - started) * 1000)
+                return self._message(call, str(content))
+            except ValueError as e:
+                error = e
+                break
+            except Exception as e:
+                error = e
+            if attempt < policy.retries:
+                await asyncio.sleep(min(_backoff(attempt), max(0.0, deadline - time.monotonic())))
+        return self._failure(call, policy, error)
+
+    async def acall(self, state, config=None):
+        calls = self._tool_calls(state)
+        deadline = time.monotonic() + self.turn_budget
+        messages = await asyncio.gather(*(self._arun_call(call, config, deadline) for call in calls))
+        return {"messages": list(messages)}
+
+    def stats(self) -> dict:
+        """Per-tool calls, successes, timeouts, errors, retries, hedges and average latency."""
+        with self._lock:
+            report = {}
+            for name, counters in self._stats.items():
+                entry = {key: int(value) for key, value in counters.items() if key != "latency_ms"}
+                ok = counters.get("ok", 0)
+                entry["avg_latency_ms"] = counters.get("latency_ms", 0.0) / ok if ok else 0.0
+                report[name] = entry
+            return report